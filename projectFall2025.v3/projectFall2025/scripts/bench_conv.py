@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+bench_conv.py — Where each conv2d_i8 algorithm is fastest.
+
+For every kernel size, stride and dilation the shift-add loop, im2col
+(as_strided window view x matmul), FFT and (4x4, stride 1 only) the
+conv_plan engines are timed on a random int8 image. Every result is checked
+against the others first. The table marks the fastest algorithm and the one
+conv_algo picks ("auto"); a mismatch (*) means the SHIFT_NS / IM2COL_NS /
+FFT_NS cost model in conv.py is off for this machine.
+
+Kernels are random int8 taps, or --kernel trinary for {-1,0,1} taps like
+the img2svmem presets (shift skips zero taps and multiplies, so it favours
+those).
+
+Examples
+  python3 bench_conv.py
+  python3 bench_conv.py --dims 2048x2048 --sizes 3,5,7,9,11,15 --strides 1 --kernel trinary
+"""
+
+import argparse
+import numpy as np
+
+import conv
+
+ALGOS = ("engine4", "shift", "im2col", "fft")
+
+def int_list(s: str):
+    return [int(p) for p in s.split(",") if p.strip()]
+
+def main():
+    ap = argparse.ArgumentParser(description="Time conv2d_i8's algorithms per kernel size, stride and dilation.")
+    ap.add_argument("--dims", type=conv.parse_dims, default=(1024, 1024), help="image WxH (default 1024x1024)")
+    ap.add_argument("--sizes", type=int_list, default=[3, 4, 5, 7, 9, 11, 15, 21, 31],
+                    help="comma list of kernel sizes K (default 3,4,5,7,9,11,15,21,31)")
+    ap.add_argument("--strides", type=int_list, default=[1, 2], help="comma list of strides (default 1,2)")
+    ap.add_argument("--dilations", type=int_list, default=[1], help="comma list of dilations (default 1)")
+    ap.add_argument("--kernel", choices=["int8", "trinary"], default="int8", help="random tap values (default int8)")
+    ap.add_argument("--repeat", type=int, default=3, help="best of N runs (default 3)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    H, W = args.dims
+    rng = np.random.default_rng(args.seed)
+    img = rng.integers(-128, 128, (H, W)).astype(np.int8)
+
+    print(f"image {W}x{H}, {args.kernel} kernels, best of {args.repeat}, times in ms")
+    print(f"{'K':>3s} {'s':>2s} {'d':>2s} " + " ".join(f"{a:>9s}" for a in ALGOS) + f" {'fastest':>8s} {'auto':>8s}")
+    for K in args.sizes:
+        if args.kernel == "trinary":
+            k = rng.integers(-1, 2, (K, K)).astype(np.int8)
+        else:
+            k = rng.integers(-128, 128, (K, K)).astype(np.int8)
+        for s in args.strides:
+            for d in args.dilations:
+                if d * (K - 1) + 1 > min(H, W):
+                    continue
+                algos = [a for a in ALGOS if a != "engine4" or (K, s, d) == (4, 1, 1)]
+                ref = conv.conv2d_i8(img, k, s, d, algo="im2col")
+                for a in algos:
+                    if not np.array_equal(ref, conv.conv2d_i8(img, k, s, d, algo=a)):
+                        raise SystemExit(f"K={K} s={s} d={d}: {a} differs from im2col")
+                ms = {a: conv.best_time(lambda: conv.conv2d_i8(img, k, s, d, algo=a), args.repeat) * 1e3 for a in algos}
+                auto = conv.conv_algo(k, ref.shape, img.shape, s, d)
+                fastest = min(ms, key=ms.get)
+                cells = " ".join(f"{ms[a]:9.2f}" if a in ms else f"{'-':>9s}" for a in ALGOS)
+                print(f"{K:3d} {s:2d} {d:2d} {cells} {fastest:>8s} {auto:>8s}" + ("" if auto == fastest else "  *"))
+
+if __name__ == "__main__":
+    main()
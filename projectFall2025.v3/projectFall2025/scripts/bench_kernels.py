@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+bench_kernels.py — Time conv.py's 4x4 engines on each img2svmem preset.
+
+For every preset the generic 16-tap multiply-add is timed against the engine
+conv_plan picks (box -> doubling window sums, edge -> separable, sharpen/emboss
+-> trinary add/subtract), both on the full-frame conv and on the fused
+conv→lrelu→pool path. Results are checked for equality before timing.
+
+Examples
+  python3 bench_kernels.py
+  python3 bench_kernels.py --dims 4096x4096 --repeat 3 --presets box,edge
+"""
+
+import argparse
+import numpy as np
+
+import conv
+def main():
+    ap = argparse.ArgumentParser(description="Per-preset speed of conv.py's kernel-specialized engines.")
+    ap.add_argument("--dims", type=conv.parse_dims, default=(1024, 1024), help="image WxH (default 1024x1024)")
+    ap.add_argument("--presets", default=",".join(conv.KERNEL_PRESETS), help="comma list of presets")
+    ap.add_argument("--repeat", type=int, default=5, help="best of N runs (default 5)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    H, W = args.dims
+    img = np.random.default_rng(args.seed).integers(-128, 128, (H, W)).astype(np.int8)
+    pad = 1 if (H - 3) % 2 else 0
+
+    print(f"image {W}x{H}, best of {args.repeat}")
+    print(f"{'preset':8s} {'engine':10s} {'zeros':>5s} {'conv generic':>13s} {'conv engine':>12s} {'x':>6s}"
+          f" {'fused generic':>14s} {'fused engine':>13s} {'x':>6s}")
+    for name in [p.strip() for p in args.presets.split(",") if p.strip()]:
+        k = conv.preset_kernel_i8(name)
+        engine = conv.conv_plan(k)["engine"]
+
+        ref = conv.conv4x4_valid_i8_i8(img, k, engine="generic")
+        if not np.array_equal(ref, conv.conv4x4_valid_i8_i8(img, k)):
+            raise SystemExit(f"{name}: {engine} engine differs from generic")
+        fused = lambda e: conv.fused_conv_act_pool(img, k, "lrelu", pad, engine=e)
+        if not np.array_equal(fused("generic"), fused("auto")):
+            raise SystemExit(f"{name}: fused {engine} engine differs from generic")
+
+        cg = conv.best_time(lambda: conv.conv4x4_valid_i8_i8(img, k, engine="generic"), args.repeat)
+        ce = conv.best_time(lambda: conv.conv4x4_valid_i8_i8(img, k), args.repeat)
+        fg = conv.best_time(lambda: fused("generic"), args.repeat)
+        fe = conv.best_time(lambda: fused("auto"), args.repeat)
+        print(f"{name:8s} {engine:10s} {int((k == 0).sum()):5d} {cg*1e3:10.1f} ms {ce*1e3:9.1f} ms {cg/ce:5.1f}x"
+              f" {fg*1e3:11.1f} ms {fe*1e3:10.1f} ms {fg/fe:5.1f}x")
+
+if __name__ == "__main__":
+    main()
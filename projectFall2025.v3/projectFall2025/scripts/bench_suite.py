@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+bench_suite.py — Time and memory benchmarks for the conv.py / img2svmem.py
+hot paths, checked against a stored baseline.
+
+On synthetic int8 images (32x32 up to 4096x4096 by default) each stage of
+the regression flow is timed (best of --repeat) and run once more under
+tracemalloc for its peak allocation:
+  hexwrite  img2svmem.save_addr8_with_kernel  (kernel header + image .dat)
+  parse     conv.load_hexdump_u8_little        (no parse cache)
+  conv      conv.conv4x4_valid_i8_i8           (once per kernel preset)
+  act       conv.apply_activation, lrelu       (per preset)
+  pool      conv.zero_pad + avg_pool_4x4_stride4_valid_i32 (per preset)
+  png       conv.write_png_clipped_int8        (final map)
+  dat       conv.write_mem_addr8_from_i8       (final map)
+
+--save writes the results as a baseline file (JSON, BASELINE_VERSION, plus
+host, Python/NumPy versions and git revision). Without --save the run is
+compared against the baseline: a case fails when its time grows by more
+than --threshold (and by at least --min-ms, so 32x32 jitter is ignored) or
+its peak memory by more than --mem-threshold. Exit status is 1 on any
+regression.
+
+Examples
+  # Record a baseline on this machine
+  python3 bench_suite.py --save
+
+  # After a change: compare, fail beyond +20% time
+  python3 bench_suite.py --threshold 0.20
+
+  # Quick subset
+  python3 bench_suite.py --sizes 32,1024 --presets box,edge --stages conv,pool
+"""
+
+import argparse, json, os, platform, subprocess, sys, tempfile, time, tracemalloc
+import numpy as np
+
+import conv
+from conv import kernel_preset, kernel_to_i8_bytes
+from img2svmem import save_addr8_with_kernel
+
+BASELINE_VERSION = 1
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(SCRIPT_DIR, "bench_baseline.json")
+
+STAGES = ("hexwrite", "parse", "conv", "act", "pool", "png", "dat")
+SIZES = (32, 256, 1024, 4096)
+
+# ----------------------------
+# Measurement
+# ----------------------------
+
+def measure(fn, repeat: int):
+    """(best wall seconds of `repeat` runs, tracemalloc peak bytes of one more run, its result)."""
+    best = conv.best_time(fn, repeat)
+    tracemalloc.start()
+    try:
+        out = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, out
+
+def bench_size(n: int, presets, stages, repeat: int, seed: int, tmp: str) -> dict:
+    """Results for one n x n image: {case name: {"time_s", "peak_bytes"}}."""
+    res = {}
+    want = set(stages)
+
+    def run(case, stage, fn):
+        if stage not in want:
+            return fn()
+        t, peak, out = measure(fn, repeat)
+        res[case] = {"time_s": t, "peak_bytes": peak}
+        return out
+
+    size = f"{n}x{n}"
+    img_u8 = np.random.default_rng(seed).integers(0, 256, (n, n), dtype=np.uint8)
+    dat = os.path.join(tmp, f"in{n}.dat")
+    run(f"{size}/hexwrite", "hexwrite", lambda: save_addr8_with_kernel(
+        img_u8, dat, "little", kernel_to_i8_bytes(kernel_preset("box"))))
+    buf = run(f"{size}/parse", "parse", lambda: conv.load_hexdump_u8_little(dat))
+    img_i8 = buf[0x10:0x10 + n * n].view(np.int8).reshape(n, n)
+    pad = 1 if (n - 3) % 2 else 0
+
+    final = None
+    for name in presets:
+        k = conv.preset_kernel_i8(name)
+        c = run(f"{size}/conv/{name}", "conv", lambda: conv.conv4x4_valid_i8_i8(img_i8, k).astype(np.int32))
+        a = run(f"{size}/act/{name}", "act", lambda: conv.apply_activation(c, "lrelu", 0.01))
+        final = run(f"{size}/pool/{name}", "pool",
+                    lambda: conv.avg_pool_4x4_stride4_valid_i32(conv.zero_pad(a, pad)))
+    if final is None:
+        return res
+    final_i8 = np.clip(final, -128, 127).astype(np.int8)
+    run(f"{size}/png", "png", lambda: conv.write_png_clipped_int8(os.path.join(tmp, "out.png"), final))
+    run(f"{size}/dat", "dat", lambda: conv.write_mem_addr8_from_i8(final_i8, os.path.join(tmp, "out.dat")))
+    return res
+
+# ----------------------------
+# Baseline
+# ----------------------------
+
+def git_rev() -> str:
+    try:
+        return subprocess.run(["git", "-C", SCRIPT_DIR, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def save_baseline(path: str, results: dict, args):
+    data = {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_rev(),
+        "host": {"node": platform.node(), "machine": platform.machine(), "cpus": os.cpu_count(),
+                 "python": platform.python_version(), "numpy": np.__version__},
+        "repeat": args.repeat, "seed": args.seed,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+        f.write("\n")
+
+def load_baseline(path: str) -> dict:
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        raise SystemExit(f"{path}: baseline version {data.get('version')} != {BASELINE_VERSION}; "
+                         "re-record it with --save")
+    return data
+
+def compare(results: dict, base: dict, threshold: float, mem_threshold: float, min_ms: float) -> int:
+    """Print each case against the baseline; returns the number of regressions."""
+    old = base["results"]
+    print(f"{'case':28s} {'ms':>10s} {'base ms':>10s} {'x':>6s} {'peak MiB':>9s} {'base':>9s} {'x':>6s}")
+    bad = 0
+    for case, r in results.items():
+        t, m = r["time_s"], r["peak_bytes"]
+        b = old.get(case)
+        if b is None:
+            print(f"{case:28s} {t*1e3:10.2f} {'-':>10s} {'':6s} {m/2**20:9.2f} {'-':>9s}        new")
+            continue
+        tx = t / b["time_s"] if b["time_s"] else 1.0
+        mx = m / b["peak_bytes"] if b["peak_bytes"] else 1.0
+        flags = []
+        if tx > 1 + threshold and (t - b["time_s"]) * 1e3 >= min_ms:
+            flags.append("TIME")
+        if mx > 1 + mem_threshold and m - b["peak_bytes"] > 4096:
+            flags.append("MEM")
+        bad += bool(flags)
+        print(f"{case:28s} {t*1e3:10.2f} {b['time_s']*1e3:10.2f} {tx:5.2f}x {m/2**20:9.2f} "
+              f"{b['peak_bytes']/2**20:9.2f} {mx:5.2f}x {' '.join(flags)}")
+    return bad
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def csv_list(s: str):
+    return [p.strip() for p in s.split(",") if p.strip()]
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the conv.py / img2svmem.py hot paths against a baseline.")
+    ap.add_argument("--sizes", type=csv_list, default=[str(n) for n in SIZES],
+                    help="comma list of square image sizes (default 32,256,1024,4096)")
+    ap.add_argument("--presets", type=csv_list, default=list(conv.KERNEL_PRESETS), help="comma list of kernel presets")
+    ap.add_argument("--stages", type=csv_list, default=list(STAGES), help="comma list of " + ",".join(STAGES))
+    ap.add_argument("--repeat", type=int, default=5, help="best of N timed runs (default 5)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file (default bench_baseline.json)")
+    ap.add_argument("--save", action="store_true", help="write the results as the new baseline instead of comparing")
+    ap.add_argument("--threshold", type=float, default=0.25,
+                    help="allowed time growth as a fraction (default 0.25 = +25%%)")
+    ap.add_argument("--mem-threshold", type=float, default=0.10, help="allowed peak-memory growth (default 0.10)")
+    ap.add_argument("--min-ms", type=float, default=1.0,
+                    help="ignore time growth smaller than this many ms (default 1)")
+    args = ap.parse_args()
+
+    for s in args.stages:
+        if s not in STAGES:
+            ap.error(f"unknown stage '{s}'")
+    sizes = [int(s) for s in args.sizes]
+    if any(n < 8 for n in sizes):
+        ap.error("sizes must be at least 8")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_suite.") as tmp:
+        for n in sizes:
+            t0 = time.perf_counter()
+            results.update(bench_size(n, args.presets, args.stages, args.repeat, args.seed, tmp))
+            print(f"[{n}x{n}] {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    if args.save:
+        save_baseline(args.baseline, results, args)
+        for case, r in results.items():
+            print(f"{case:28s} {r['time_s']*1e3:10.2f} ms {r['peak_bytes']/2**20:9.2f} MiB")
+        print(f"=== {len(results)} cases saved to {args.baseline} ===")
+        return
+    if not os.path.isfile(args.baseline):
+        raise SystemExit(f"{args.baseline}: no baseline (record one with --save)")
+    base = load_baseline(args.baseline)
+    bad = compare(results, base, args.threshold, args.mem_threshold, args.min_ms)
+    print(f"=== {len(results) - bad}/{len(results)} cases within threshold "
+          f"(baseline {base.get('git') or '?'} from {base.get('created', '?')}) ===")
+    sys.exit(1 if bad else 0)
+
+if __name__ == "__main__":
+    main()
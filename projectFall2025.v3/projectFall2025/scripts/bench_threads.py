@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+bench_threads.py — Thread scaling of conv.py's fused kernel (--threads).
+
+fused_conv_act_pool splits the conv rows into one even-aligned span per
+thread; each span reads its rows plus the 3-row halo and writes its own
+slice of the output. For each thread count the result is checked against the
+serial run before timing, then speedup and parallel efficiency (speedup /
+threads) are reported per preset and activation.
+
+Examples
+  python3 bench_threads.py
+  python3 bench_threads.py --dims 4096x4096 --threads 1,2,4,8 --presets box,emboss
+"""
+
+import argparse, os
+import numpy as np
+
+import conv
+def main():
+    cpus = os.cpu_count() or 1
+    default_threads = sorted({1, 2, 4, cpus} | {t for t in (8, 16) if t <= cpus})
+    ap = argparse.ArgumentParser(description="Speedup of the fused kernel from 1 to N threads.")
+    ap.add_argument("--dims", type=conv.parse_dims, default=(2048, 2048), help="image WxH (default 2048x2048)")
+    ap.add_argument("--threads", default=",".join(map(str, default_threads)),
+                    help=f"comma list of thread counts (default {','.join(map(str, default_threads))})")
+    ap.add_argument("--presets", default=",".join(conv.KERNEL_PRESETS), help="comma list of presets")
+    ap.add_argument("--acts", default="none,lrelu", help="comma list of activations (default none,lrelu)")
+    ap.add_argument("--repeat", type=int, default=5, help="best of N runs (default 5)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    H, W = args.dims
+    img = np.random.default_rng(args.seed).integers(-128, 128, (H, W)).astype(np.int8)
+    pad = 1 if (H - 3) % 2 else 0
+    counts = sorted({max(1, int(t)) for t in args.threads.split(",") if t.strip()} | {1})
+
+    print(f"image {W}x{H}, best of {args.repeat}, {cpus} CPU(s)")
+    print(f"{'preset':8s} {'act':6s} {'threads':>7s} {'ms':>9s} {'speedup':>8s} {'eff':>6s}")
+    for name in [p.strip() for p in args.presets.split(",") if p.strip()]:
+        k = conv.preset_kernel_i8(name)
+        for act in [a.strip() for a in args.acts.split(",") if a.strip()]:
+            p = pad if act != "none" else 0
+            fused = lambda t: conv.fused_conv_act_pool(img, k, act, p, threads=t)
+            ref = fused(1)
+            base = None
+            for t in counts:
+                if t > 1 and not np.array_equal(ref, fused(t)):
+                    raise SystemExit(f"{name}/{act}: {t} threads differ from serial")
+                ms = conv.best_time(lambda: fused(t), args.repeat) * 1e3
+                base = base or ms
+                print(f"{name:8s} {act:6s} {t:7d} {ms:9.2f} {base / ms:7.2f}x {base / ms / t:6.2f}")
+
+if __name__ == "__main__":
+    main()
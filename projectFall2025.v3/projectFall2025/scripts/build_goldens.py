@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+build_goldens.py — Incremental images/ -> inputs/ -> outputs/ regeneration.
+
+Every manifest line is one build node: a script (img2svmem.py or conv.py,
+default conv.py) and its command line. A node's key hashes
+  - the command line,
+  - the content of the script and the local modules it imports,
+  - the content of every file it reads (image, input .dat, kernel CSV).
+A node runs only if its key changed since the last build or one of its
+outputs is missing or was touched. Keys of downstream nodes are computed
+after their producers finish, so a rebuilt .dat that comes out identical
+does not cascade into the goldens.
+
+Independent stale nodes run in parallel on a process pool (conv_batch.run_job).
+State lives in .build_state.json next to the first manifest; file hashes are
+cached by (size, mtime) so a no-op build only stats files.
+
+Examples
+  # Default manifests: inputs.manifest then goldens.manifest
+  python3 build_goldens.py
+
+  # What would run, without running it
+  python3 build_goldens.py --dry-run
+
+  # Rebuild everything
+  python3 build_goldens.py --force -j 4
+
+Exit status is 1 if any node fails.
+"""
+
+import os, sys, json, shlex, hashlib, argparse, time, tempfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional
+
+import conv
+import img2svmem
+from conv_batch import run_job
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# script -> (main, local modules whose source feeds the key)
+TOOLS = {
+    "conv.py": (conv.main, ["conv.py"]),
+    "img2svmem.py": (img2svmem.main, ["img2svmem.py", "conv.py"]),
+}
+
+# ----------------------------
+# Graph
+# ----------------------------
+
+class Node:
+    def __init__(self, tool: str, argv: List[str]):
+        self.tool = tool
+        self.argv = argv
+        self.deps: List[str] = []       # files read
+        self.outputs: List[str] = []    # files written
+        self.modules = list(TOOLS[tool][1])
+        if tool == "conv.py":
+            self._conv()
+        else:
+            self._img2svmem()
+        self.id = self.outputs[0]
+
+    def _conv(self):
+        a = conv.build_arg_parser().parse_args(self.argv)
+        self.deps = [a.input]
+        if a.presets:
+            self.modules.append("img2svmem.py")
+        self.outputs = conv.output_paths(a)
+
+    def _img2svmem(self):
+        a = img2svmem.build_arg_parser().parse_args(self.argv)
+        if not a.out or len(a.inputs) != 1:
+            raise ValueError("img2svmem.py nodes need one input and -o: " + shlex.join(self.argv))
+        self.deps = [a.inputs[0]] + ([a.kernel_csv] if a.kernel_csv else [])
+        self.outputs = [a.out]
+
+def read_build_manifest(path: str) -> List[Node]:
+    """One command line per line; a leading script name selects the tool (default conv.py)."""
+    nodes = []
+    with open(path, "r") as f:
+        for raw in f:
+            argv = shlex.split(raw, comments=True)
+            if not argv:
+                continue
+            while argv and argv[0].startswith("python"):
+                argv = argv[1:]
+            tool = os.path.basename(argv[0]) if argv and argv[0].endswith(".py") else "conv.py"
+            if argv and argv[0].endswith(".py"):
+                argv = argv[1:]
+            if tool not in TOOLS:
+                raise ValueError(f"{path}: unknown script '{tool}'")
+            nodes.append(Node(tool, argv))
+    return nodes
+
+# ----------------------------
+# State
+# ----------------------------
+
+class State:
+    """Build keys per node plus a (size, mtime_ns) -> digest cache per file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, list] = {}
+        self.nodes: Dict[str, dict] = {}
+        if os.path.isfile(path):
+            with open(path, "r") as f:
+                data = json.load(f)
+            self.files, self.nodes = data.get("files", {}), data.get("nodes", {})
+
+    def stat(self, path: str) -> Optional[list]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def digest(self, path: str) -> Optional[str]:
+        path = os.path.abspath(path)
+        st = self.stat(path)
+        if st is None:
+            return None
+        rec = self.files.get(path)
+        if rec and rec[:2] == st:
+            return rec[2]
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        self.files[path] = st + [h.hexdigest()]
+        return h.hexdigest()
+
+    def key(self, node: Node) -> Optional[str]:
+        parts = [node.tool, shlex.join(node.argv)]
+        for m in node.modules:
+            parts.append(self.digest(os.path.join(SCRIPT_DIR, m)))
+        for d in node.deps:
+            dg = self.digest(d)
+            if dg is None:
+                return None                 # a missing input: let the run report it
+            parts.append(dg)
+        return hashlib.blake2b("\0".join(parts).encode(), digest_size=16).hexdigest()
+
+    def fresh(self, node: Node, key: Optional[str]) -> bool:
+        rec = self.nodes.get(os.path.abspath(node.id))
+        if not rec or key is None or rec["key"] != key:
+            return False
+        return all(self.stat(p) == rec["outputs"].get(os.path.abspath(p)) for p in node.outputs)
+
+    def record(self, node: Node, key: str):
+        outs = {os.path.abspath(p): self.stat(p) for p in node.outputs}
+        for p in node.outputs:
+            self.digest(p)
+        self.nodes[os.path.abspath(node.id)] = {"key": key, "outputs": outs}
+
+    def save(self):
+        d = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=d, prefix=".build_state.")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"files": self.files, "nodes": self.nodes}, f)
+        os.replace(tmp, self.path)
+
+# ----------------------------
+# Build
+# ----------------------------
+
+def build(nodes: List[Node], state: State, jobs: int, force: bool = False,
+          dry_run: bool = False, verbose: bool = False) -> int:
+    """Run stale nodes as soon as their producers are done; returns the failure count."""
+    producer = {}
+    for n in nodes:
+        for p in n.outputs:
+            producer[os.path.abspath(p)] = n
+    ups = {n.id: {producer[os.path.abspath(d)].id for d in n.deps if os.path.abspath(d) in producer}
+           for n in nodes}
+    by_id = {n.id: n for n in nodes}
+
+    status: Dict[str, str] = {}         # id -> fresh | built | failed | skipped | stale (dry run)
+    running = {}
+    pool = None
+    n_fail = 0
+    try:
+        while len(status) < len(nodes):
+            progressed = False
+            for n in nodes:
+                if n.id in status or n.id in running.values():
+                    continue
+                up = [status.get(u) for u in ups[n.id]]
+                if any(s is None for s in up):
+                    continue
+                progressed = True
+                if any(s in ("failed", "skipped") for s in up):
+                    status[n.id] = "skipped"
+                    print(f"[SKIP] {n.tool} {shlex.join(n.argv)}")
+                    continue
+                key = state.key(n)
+                if not force and "stale" not in up and state.fresh(n, key):
+                    status[n.id] = "fresh"
+                    if verbose:
+                        print(f"[FRESH] {n.id}")
+                    continue
+                if dry_run:
+                    status[n.id] = "stale"
+                    print(f"[STALE] {n.tool} {shlex.join(n.argv)}")
+                    continue
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=max(1, jobs))
+                running[pool.submit(run_job, n.argv, TOOLS[n.tool][0])] = n.id
+            if not running:
+                if not progressed:
+                    raise RuntimeError("dependency cycle between manifest nodes")
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                n = by_id[running.pop(fut)]
+                try:
+                    ok, dt, text = fut.result()
+                except Exception as e:      # worker died
+                    ok, dt, text = False, 0.0, repr(e)
+                if ok:
+                    state.record(n, state.key(n))
+                    status[n.id] = "built"
+                else:
+                    status[n.id] = "failed"
+                    n_fail += 1
+                print(f"[{'OK' if ok else 'FAIL'}] {dt:6.2f}s  {n.tool} {shlex.join(n.argv)}")
+                if text and (verbose or not ok):
+                    print("       " + text.rstrip().replace("\n", "\n       "))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    counts = {s: list(status.values()).count(s) for s in ("built", "fresh", "stale", "failed", "skipped")}
+    print("=== " + ", ".join(f"{v} {k}" for k, v in counts.items() if v) + " ===")
+    return n_fail
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Rebuild stale inputs/*.dat and outputs/ goldens.")
+    ap.add_argument("manifest", nargs="*", default=["inputs.manifest", "goldens.manifest"],
+                    help="build manifests in dependency order (default: inputs.manifest goldens.manifest)")
+    ap.add_argument("--state", default=None, help="state file (default: .build_state.json next to the first manifest)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    ap.add_argument("--force", action="store_true", help="rebuild every node")
+    ap.add_argument("-n", "--dry-run", action="store_true", help="list stale nodes without running them")
+    ap.add_argument("-v", "--verbose", action="store_true", help="print fresh nodes and each job's output")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    nodes = []
+    for m in args.manifest:
+        nodes.extend(read_build_manifest(m))
+    seen = {}
+    for n in nodes:
+        for p in n.outputs:
+            if os.path.abspath(p) in seen:
+                ap.error(f"{p} is produced by two nodes")
+            seen[os.path.abspath(p)] = n
+    state = State(args.state or os.path.join(os.path.dirname(os.path.abspath(args.manifest[0])),
+                                             ".build_state.json"))
+    failed = build(nodes, state, args.jobs, force=args.force, dry_run=args.dry_run, verbose=args.verbose)
+    if not args.dry_run:
+        state.save()
+    print(f"=== {len(nodes)} nodes in {time.perf_counter() - t0:.2f}s ===")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+compare_out.py — Diff a simulation output dump against a conv.py golden and
+localize every mismatch to output pixels.
+
+tb.sv dumps DRAM1 with $writememh and passes only if every golden word exists
+in the dump with the same value and the dump holds no extra words. This does
+the same check on whole arrays, then maps each failing 64-bit word back to
+(row, col) of the final map using the pad_cols_to_multiple_of_8 layout:
+byte address = row * cols_padded + col.
+
+Reported:
+  - word counts: compared / mismatched / missing in dump / extra in dump / x or z
+  - pixel counts: in the frame, in the pad columns, past the last row
+  - the first N mismatching pixels (address, row, col, golden, dut)
+  - rows with the most errors and a histogram of (dut - golden)
+  - optional heatmap PNG (errors per tile) and full-res |diff| PNG
+
+Both the golden '@ADDR HEX' layout and $writememh output ('@addr' on its own
+line, one word per line, x/z digits) are accepted.
+
+Examples
+  python3 compare_out.py sim/output3.dat ../outputs/output3.564.dat --config 564
+  python3 compare_out.py sim/output0.dat ../outputs/output0.464.dat --config 464 \
+      --heatmap diff0.heat.png --diff-png diff0.png --first 50
+
+Exit status is 0 on a match, 1 on any mismatch.
+"""
+
+import re, sys, time, argparse
+from typing import Tuple
+import numpy as np
+
+import conv
+from conv_batch import parse_config
+
+# ----------------------------
+# Loading
+# ----------------------------
+
+_COMMENT_RE = re.compile(r"//[^\n]*")
+
+def load_memh_words(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    $readmemh-style tokens: '@addr' sets the byte address, each data token is
+    one 64-bit word and advances it by 8. Words with x/z digits are returned
+    as zeros and flagged in the unknown mask.
+    """
+    with open(path, "r", errors="ignore") as f:
+        tokens = _COMMENT_RE.sub("", f.read()).split()
+    addrs, data, unknown = [], [], []
+    addr = 0
+    for tok in tokens:
+        if tok[0] == "@":
+            addr = int(tok[1:], 16)
+            continue
+        tok = tok.replace("_", "")
+        bad = re.search(r"[^0-9A-Fa-f]", tok) is not None
+        addrs.append(addr)
+        data.append("0" * 16 if bad else tok.zfill(16)[-16:])
+        unknown.append(bad)
+        addr += 8
+    if not addrs:
+        raise ValueError(f"{path}: no words found")
+    words = np.frombuffer(bytes.fromhex("".join(data)), dtype=np.uint8).reshape(-1, 8)[:, ::-1]
+    return np.asarray(addrs, np.uint64), words, np.asarray(unknown, bool)
+
+def load_words(path: str):
+    """(addr, words, unknown) for either dump layout."""
+    try:
+        addr, words = conv.load_hexdump_words(path)
+        return addr, words, np.zeros(addr.shape[0], bool)
+    except ValueError:
+        return load_memh_words(path)
+
+def _dedupe(widx, words, unknown):
+    """Last write to each word wins, like the tb's associative array."""
+    widx = widx.astype(np.int64)
+    if widx.size > 1 and np.any(widx[1:] <= widx[:-1]):
+        uniq, first_rev = np.unique(widx[::-1], return_index=True)
+        keep = widx.size - 1 - first_rev
+        return uniq, words[keep], unknown[keep]
+    return widx, words, unknown
+
+# ----------------------------
+# Compare
+# ----------------------------
+
+def compare_words(gold, dut):
+    """
+    Align both dumps on the union of word indices.
+    Returns keys, golden/dut words (n, 8) and presence/unknown masks.
+    """
+    g_idx, g_w, g_x = _dedupe(gold[0] // 8, gold[1], gold[2])
+    d_idx, d_w, d_x = _dedupe(dut[0] // 8, dut[1], dut[2])
+    keys = np.union1d(g_idx, d_idx)
+    n = keys.size
+    G = np.zeros((n, 8), np.uint8); D = np.zeros((n, 8), np.uint8)
+    gp = np.zeros(n, bool); dp = np.zeros(n, bool)
+    gx = np.zeros(n, bool); dx = np.zeros(n, bool)
+    gi = np.searchsorted(keys, g_idx); di = np.searchsorted(keys, d_idx)
+    G[gi], gp[gi], gx[gi] = g_w, True, g_x
+    D[di], dp[di], dx[di] = d_w, True, d_x
+    return keys, G, D, gp, dp, gx, dx
+
+def compare(gold_path: str, dut_path: str, rows: int, cols: int):
+    """All the numbers the report prints; cols is the unpadded final width."""
+    cols_p = -(-cols // 8) * 8
+    keys, G, D, gp, dp, gx, dx = compare_words(load_words(gold_path), load_words(dut_path))
+    both = gp & dp
+    missing = gp & ~dp
+    extra = dp & ~gp
+    unknown = both & (gx | dx)
+
+    byte_bad = (G != D) & both[:, None]
+    byte_bad |= (missing | extra | unknown)[:, None]
+    bad_words = byte_bad.any(axis=1)
+
+    w_i, b_i = np.nonzero(byte_bad)                 # row-major: sorted by address
+    addr = keys[w_i] * 8 + b_i
+    r, c = addr // cols_p, addr % cols_p
+    in_rows = r < rows
+    in_frame = in_rows & (c < cols)
+
+    g8 = G[w_i, b_i].view(np.int8).astype(np.int16)
+    d8 = D[w_i, b_i].view(np.int8).astype(np.int16)
+    valued = both[w_i] & ~unknown[w_i]
+    kind = np.where(missing[w_i], "missing", np.where(extra[w_i], "extra",
+                    np.where(unknown[w_i], "x/z", "value")))
+
+    return {
+        "rows": rows, "cols": cols, "cols_padded": cols_p,
+        "words_golden": int(gp.sum()), "words_dut": int(dp.sum()),
+        "words_bad": int(bad_words.sum()), "words_missing": int(missing.sum()),
+        "words_extra": int(extra.sum()), "words_unknown": int(unknown.sum()),
+        "addr": addr, "row": r, "col": c, "gold": g8, "dut": d8, "kind": kind,
+        "valued": valued, "in_frame": in_frame, "in_rows": in_rows,
+    }
+
+# ----------------------------
+# Reporting
+# ----------------------------
+
+def error_map(res) -> np.ndarray:
+    """(rows, cols_padded) uint8 |dut - golden|, 255 for missing/extra/x words."""
+    m = np.zeros((res["rows"], res["cols_padded"]), np.uint8)
+    sel = res["in_rows"]
+    diff = np.where(res["valued"], np.abs(res["dut"] - res["gold"]), 255)
+    m[res["row"][sel], res["col"][sel]] = np.clip(diff[sel], 1, 255)
+    return m
+
+def save_heatmap(path: str, res, bins: int, size: int = 512):
+    rows, cols = res["rows"], res["cols_padded"]
+    by, bx = min(bins, rows), min(bins, cols)
+    sel = res["in_rows"]
+    tile = (res["row"][sel] * by // rows) * bx + res["col"][sel] * bx // cols
+    counts = np.bincount(tile, minlength=by * bx).reshape(by, bx)
+    img = np.zeros_like(counts, dtype=np.uint8)
+    if counts.max():
+        img = (counts * 255 // counts.max()).astype(np.uint8)
+        img[(counts > 0) & (img == 0)] = 1
+    scale = max(1, size // max(by, bx))
+    conv.save_png_u8(path, np.kron(img, np.ones((scale, scale), np.uint8)))
+
+def print_report(res, first: int, top_rows: int):
+    print("=== compare ===")
+    print(f"frame          : {res['rows']}x{res['cols']} (cols padded to {res['cols_padded']})")
+    print(f"words          : golden {res['words_golden']}, dut {res['words_dut']}")
+    print(f"bad words      : {res['words_bad']} (missing {res['words_missing']}, "
+          f"extra {res['words_extra']}, x/z {res['words_unknown']})")
+    n = res["addr"].size
+    n_frame = int(res["in_frame"].sum())
+    n_pad = int((res["in_rows"] & ~res["in_frame"]).sum())
+    print(f"bad pixels     : {n} (frame {n_frame}, pad cols {n_pad}, past last row {n - n_frame - n_pad})")
+    if not n:
+        return
+
+    print(f"first {min(first, n)} errors:")
+    print("      addr    row    col  golden     dut  kind")
+    for i in range(min(first, n)):
+        g = str(res["gold"][i]) if res["kind"][i] != "extra" else "--"
+        d = str(res["dut"][i]) if res["kind"][i] in ("value", "extra") else "--"
+        print(f"  {res['addr'][i]:08x} {res['row'][i]:6d} {res['col'][i]:6d} {g:>7} {d:>7}  {res['kind'][i]}")
+
+    sel = res["in_rows"]
+    if sel.any():
+        per_row = np.bincount(res["row"][sel], minlength=res["rows"])
+        worst = np.argsort(-per_row, kind="stable")[:top_rows]
+        worst = worst[per_row[worst] > 0]
+        print("worst rows     : " + ", ".join(f"{r} ({per_row[r]})" for r in worst))
+        per_col = np.bincount(res["col"][sel], minlength=res["cols_padded"])
+        print(f"bad cols       : {int((per_col > 0).sum())} distinct, first {int(np.argmax(per_col > 0))}")
+
+    v = res["valued"]
+    if v.any():
+        diff = (res["dut"][v] - res["gold"][v]).astype(np.int64)
+        hist = np.bincount(diff + 255, minlength=511)
+        top = np.argsort(-hist, kind="stable")[:10]
+        top = top[hist[top] > 0]
+        print("dut - golden   : " + ", ".join(f"{d - 255:+d} x{hist[d]}" for d in top))
+        print(f"|diff|         : max {int(np.abs(diff).max())}, mean {np.abs(diff).mean():.3f}")
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare a DUT output dump against a conv.py golden.")
+    ap.add_argument("dut", help="simulation dump (tb.sv $writememh output%%d.dat)")
+    ap.add_argument("golden", help="golden DAT from conv.py")
+    ap.add_argument("--dims", type=conv.parse_dims, default=(1024, 1024), help="input image WxH (default 1024x1024)")
+    ap.add_argument("--config", type=parse_config, default=parse_config("564"),
+                    help='pipeline config of the golden: 464, 564 or NAME="conv.py flags" (default 564)')
+    ap.add_argument("--cols", type=int, default=None, help="override final map width (unpadded)")
+    ap.add_argument("--rows", type=int, default=None, help="override final map height")
+    ap.add_argument("--first", type=int, default=20, help="list the first N mismatching pixels (default 20)")
+    ap.add_argument("--top-rows", type=int, default=5, help="list the N rows with the most errors")
+    ap.add_argument("--heatmap", default=None, help="write an errors-per-tile heatmap PNG")
+    ap.add_argument("--heatmap-bins", type=int, default=64, help="heatmap tiles per side (default 64)")
+    ap.add_argument("--diff-png", default=None, help="write a full-res |dut - golden| PNG")
+    args = ap.parse_args()
+
+    H, W = args.dims
+    flags = conv.build_arg_parser().parse_args(["-", "-o", "-", "--dims", f"{W}x{H}"] + args.config[1])
+    rows, cols = conv.final_shape(H, W, flags.act, flags.padding)
+    rows = args.rows or rows
+    cols = args.cols or cols
+
+    t0 = time.perf_counter()
+    res = compare(args.golden, args.dut, rows, cols)
+    dt = time.perf_counter() - t0
+
+    print_report(res, args.first, args.top_rows)
+    if args.heatmap:
+        save_heatmap(args.heatmap, res, args.heatmap_bins)
+        print("heatmap        :", args.heatmap)
+    if args.diff_png:
+        conv.save_png_u8(args.diff_png, error_map(res))
+        print("diff PNG       :", args.diff_png)
+    ok = res["addr"].size == 0
+    print(f"result         : {'PASS' if ok else 'FAIL'} ({dt * 1e3:.0f} ms)")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
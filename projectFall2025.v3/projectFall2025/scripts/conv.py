@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import argparse, os, re
+import argparse, contextlib, hashlib, json, mmap, os, re, struct, tempfile, time, tracemalloc, zlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 from pathlib import Path
 
@@ -89,13 +90,313 @@ def _reverse_per8(b: bytes) -> bytes:
         out[i:i+8] = chunk[::-1]
     return bytes(out)
 
-def load_hexdump_u8_little(path: str) -> np.ndarray:
+# Bulk parser: the first @ADDR line fixes the column template, every other
+# line is checked against it with array ops (see load_hexdump_u8_little).
+_HEXLINE_HEAD = re.compile(r'^([ \t]*)@([0-9A-Fa-f]+)([ \t]+)([0-9A-Fa-f]{16})')
+
+
+def _line_record(raw: str):
+    """Per-line reference semantics: (addr, hex digits) or None if skipped."""
+    line = raw.split("//", 1)[0].strip()
+    m = _HEXLINE.match(line) if line else None
+    if not m:
+        return None
+    return int(m.group(1), 16), ''.join(m.group(2).split())
+
+
+def _is_blank(cols: np.ndarray) -> np.ndarray:
+    """Row mask: every byte in cols is a space, tab or CR."""
+    return ((cols == 0x20) | (cols == 0x09) | (cols == 0x0D)).all(axis=1)
+
+
+def load_hexdump_u8_little(path: str, cache: "HexdumpCache" = None) -> np.ndarray:
     """
     Read @ADDR HEX hexdump where each line is a 64-bit word shown big-endian.
     Convert to a byte buffer in LITTLE-endian (reverse each 8B chunk).
+
+    Files where every record is one 8-byte word are decoded in bulk: the text
+    is viewed as a (lines, columns) byte matrix, the hex columns go through a
+    single bytes.fromhex, the per-word swap is a [:, ::-1] view and records
+    are scattered straight into the returned buffer. Sparse, out-of-order and
+    repeated addresses behave as before (gaps are zero, the last write wins).
+    Anything irregular falls back to the per-line parser.
+
+    With a HexdumpCache the parsed buffer is kept as a .npy sidecar and later
+    calls return a read-only np.memmap of it without touching the text.
+    SVMB binary images (see write_svmb) are read directly, without the cache.
+    """
+    if is_svmb(path):
+        return load_svmb_u8(path)
+    if cache is not None:
+        hit = cache.lookup(path)
+        if hit is not None:
+            return hit
+
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    if cache is not None:
+        digest = cache.digest(raw)
+        hit = cache.lookup(path, digest)
+        if hit is not None:
+            return hit
+
+    buf = _load_hexdump_u8_little_bulk(raw)
+    if buf is None:
+        buf = _load_hexdump_u8_little_lines(raw.decode("utf-8", errors="ignore"))
+    if cache is not None:
+        cache.store(path, digest, buf)
+    return buf
+
+
+class BlobCache:
+    """
+    Directory of <key>.npy blobs, written atomically and evicted
+    least-recently-used (by mtime) once it exceeds max_bytes. With root=None
+    it is a `subdir` directory next to each source file.
+    """
+
+    subdir = ".blobcache"
+
+    def __init__(self, root: str = None, max_bytes: int = 512 << 20):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _dir(self, path: str) -> str:
+        return self.root or os.path.join(os.path.dirname(os.path.abspath(path)), self.subdir)
+
+    def _write_blob(self, path: str, key: str, arr: np.ndarray) -> str:
+        """Write <key>.npy for source path, then evict; raises OSError (callers run uncached)."""
+        d = self._dir(path)
+        os.makedirs(d, exist_ok=True)
+        blob = os.path.join(d, key + ".npy")
+        fd, tmp = tempfile.mkstemp(dir=d, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(arr, dtype=np.uint8), allow_pickle=False)
+            os.replace(tmp, blob)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)              # evict() only sees .npy, so never leave a .tmp behind
+            raise
+        self.evict(d, keep=blob)
+        return blob
+
+    def evict(self, d: str, keep: str = None):
+        """Drop least-recently-used blobs until the directory fits max_bytes."""
+        blobs = []
+        for name in os.listdir(d):
+            if name.endswith(".npy"):
+                p = os.path.join(d, name)
+                st = os.stat(p)
+                blobs.append((st.st_mtime, st.st_size, p))
+        total = sum(b[1] for b in blobs)
+        for _, size, p in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            if p != keep:
+                os.remove(p)        # index entries pointing here just miss
+                total -= size
+
+
+class HexdumpCache(BlobCache):
+    """
+    Parsed-DRAM-image cache: one .npy blob per distinct file content plus a
+    small JSON index entry per source path recording (size, mtime, digest).
+
+    lookup() trusts a matching stat and memory-maps the blob; when the stat
+    changed it needs the content digest, so a touched-but-identical file
+    still hits. Blobs are evicted least-recently-used once the directory
+    exceeds max_bytes. With root=None the cache is a '.hexcache' directory
+    next to each input file.
+    """
+
+    subdir = ".hexcache"
+
+    def _index_path(self, path: str) -> str:
+        key = hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=8).hexdigest()
+        return os.path.join(self._dir(path), key + ".json")
+
+    @staticmethod
+    def digest(raw: bytes) -> str:
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def lookup(self, path: str, digest: str = None):
+        """Return a read-only memmap of the parsed buffer, or None on a miss."""
+        refresh = digest is not None
+        try:
+            st = os.stat(path)
+            if digest is None:
+                with open(self._index_path(path)) as f:
+                    meta = json.load(f)
+                if (meta["size"], meta["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+                    return None
+                digest = meta["digest"]
+            blob = os.path.join(self._dir(path), digest + ".npy")
+            buf = np.load(blob, mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(blob)                  # LRU clock for eviction
+            if refresh:
+                self._write_index(path, st, digest)
+        except OSError:
+            pass
+        return buf
+
+    def store(self, path: str, digest: str, buf: np.ndarray):
+        try:
+            self._write_blob(path, digest, buf)
+            self._write_index(path, os.stat(path), digest)
+        except OSError:
+            pass                            # read-only tree: just run uncached
+
+    def _write_index(self, path: str, st, digest: str):
+        meta = {"path": os.path.abspath(path), "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns, "digest": digest}
+        idx = self._index_path(path)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(idx), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, idx)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+
+
+def _load_hexdump_u8_little_bulk(raw: bytes):
+    """Array-level parser; returns None when the file needs the line parser."""
+    recs = _parse_hexdump_words(raw)
+    if recs is None:
+        return None
+    addr, words = recs
+    n = words.shape[0]
+    widx = (addr // 8).astype(np.int64)
+    buf = np.zeros(int(widx.max() + 1) * 8, dtype=np.uint8)
+    words_out = buf.reshape(-1, 8)
+    if n > 1 and np.any(widx[1:] <= widx[:-1]):
+        # Out of order or repeated: keep the last record written to each word
+        uniq, first_rev = np.unique(widx[::-1], return_index=True)
+        words_out[uniq] = words[n - 1 - first_rev]
+    elif widx[-1] - widx[0] == n - 1:
+        words_out[widx[0]:] = words      # contiguous: a single block copy
+    else:
+        words_out[widx] = words
+    return buf
+
+
+def _parse_hexdump_words(raw: bytes):
+    """
+    Decode the one-word-per-line records of a hexdump (or a whole-line chunk
+    of one) to (addresses, (n, 8) little-endian words), in file order.
+    Returns None when the text needs the per-line parser.
+    """
+    a = np.frombuffer(raw, dtype=np.uint8)
+    ends = np.flatnonzero(a == 0x0A)
+    if ends.size == 0 or ends[-1] != a.size - 1:
+        ends = np.append(ends, a.size)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    lens = ends - starts
+
+    # Column template from the first @ADDR line
+    head = None
+    for s0, e0 in zip(starts[:64].tolist(), ends[:64].tolist()):
+        head = _HEXLINE_HEAD.match(raw[s0:e0].decode("utf-8", errors="ignore"))
+        if head:
+            break
+    if head is None:
+        return None
+    lead, addr_w, gap = len(head.group(1)), len(head.group(2)), len(head.group(3))
+    if addr_w > 16:
+        return None
+    c_addr = lead + 1
+    c_gap = c_addr + addr_w
+    c_data = c_gap + gap
+    width = c_data + 16
+
+    # (lines, columns) window onto the text: a reshaped view when every line
+    # has the same length (the files our writers produce), a gather otherwise.
+    L = int(lens[0]) + 1
+    if np.all(lens == lens[0]) and L - 1 >= width:
+        padded = a if a.size == L * lens.size else np.append(a, np.uint8(0x0A))
+        win = padded.reshape(-1, L)
+        ok = _is_blank(win[:, width:L - 1]) if L - 1 > width else np.ones(lens.size, dtype=bool)
+    else:
+        ok = lens >= width
+        win = np.zeros((lens.size, width), dtype=np.uint8)
+        win[ok] = a[starts[ok, None] + np.arange(width)]
+        ok &= lens == width
+
+    ok &= ((win[:, lead] == ord("@"))
+           & _is_blank(win[:, :lead])
+           & _is_blank(win[:, c_gap:c_data]))
+
+    # Lines that miss the template, or carry a trailing comment, are
+    # re-checked with the per-line rules.
+    for i in np.flatnonzero(~ok).tolist():
+        rec = _line_record(raw[starts[i]:ends[i]].decode("utf-8", errors="ignore"))
+        if rec is None:
+            continue
+        line = bytes(win[i]).decode("utf-8", errors="ignore")
+        addr_txt = line[c_addr:c_gap]
+        if lens[i] < width or (line[c_addr - 1], line[c_data:]) != ("@", rec[1]) \
+                or not re.fullmatch(r'[0-9A-Fa-f]+', addr_txt) or int(addr_txt, 16) != rec[0]:
+            return None         # a real record the template can't express
+        ok[i] = True
+    if not ok.any():
+        return None
+
+    sel = win if ok.all() else win[ok]
+    n = sel.shape[0]
+    addr_txt = np.full((n, 16), ord("0"), dtype=np.uint8)
+    addr_txt[:, 16 - addr_w:] = sel[:, c_addr:c_gap]
+    try:
+        words = np.frombuffer(bytes.fromhex(sel[:, c_data:width].tobytes().decode("ascii")),
+                              dtype=np.uint8).reshape(n, 8)[:, ::-1]   # BE text -> LE bytes
+        addr = np.frombuffer(bytes.fromhex(addr_txt.tobytes().decode("ascii")), dtype=">u8")
+    except ValueError:
+        return None             # a non-hex digit somewhere; let the line parser skip it
+    if np.any(addr % 8):
+        return None
+    return addr, words
+
+
+def load_hexdump_words(path: str):
+    """
+    Records of a hexdump as (byte addresses uint64, (n, 8) little-endian words),
+    in file order and without filling gaps, so callers can tell a missing word
+    from a zero one. Multi-word lines are split into consecutive words.
     """
+    if is_svmb(path):
+        return load_svmb_words(path)
     with open(path, "rb") as f:
-        lines = f.read().decode("utf-8", errors="ignore").splitlines()
+        raw = f.read()
+    recs = _parse_hexdump_words(raw)
+    if recs is not None:
+        return recs
+    addrs, words = [], []
+    for line in raw.decode("utf-8", errors="ignore").splitlines():
+        rec = _line_record(line)
+        if rec is None:
+            continue
+        addr, hex_str = rec
+        if len(hex_str) % 16:
+            raise ValueError("Partial 64-bit word at line: {}".format(line))
+        data = np.frombuffer(bytes.fromhex(hex_str), dtype=np.uint8).reshape(-1, 8)[:, ::-1]
+        addrs.append(addr + 8 * np.arange(data.shape[0], dtype=np.uint64))
+        words.append(data)
+    if not addrs:
+        raise ValueError("No @ADDR HEX lines found.")
+    return np.concatenate(addrs), np.concatenate(words)
+
+
+def _load_hexdump_u8_little_lines(text: str) -> np.ndarray:
+    """Line-by-line parser for irregular hexdumps (mixed widths, unaligned)."""
+    lines = text.splitlines()
 
     recs = []
     max_end = 0
@@ -123,22 +424,77 @@ def load_hexdump_u8_little(path: str) -> np.ndarray:
     buf = bytearray(max_end)
     for addr, data_le in recs:
         buf[addr:addr+len(data_le)] = data_le
-    return np.frombuffer(bytes(buf), dtype=np.uint8)
+    return np.frombuffer(buf, dtype=np.uint8)
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def format_addr8_lines(rows_u8: np.ndarray, start_addr: int = 0, addr_digits: int = 16,
+                       prefix: str = " @", sep: str = " ") -> np.ndarray:
+    """
+    Render @ADDR HEX text for a (lines, bytes_per_line) matrix of bytes that is
+    already in display order (i.e. per-word swapped). Returns a
+    (lines, chars) uint8 ASCII matrix, newline included, so callers can
+    write it with one .tobytes(). Addresses step by bytes_per_line.
+    """
+    rows_u8 = np.asarray(rows_u8, dtype=np.uint8)
+    n, nbytes = rows_u8.shape
+    p, s = prefix.encode("ascii"), sep.encode("ascii")
+    c_addr = len(p)
+    c_data = c_addr + addr_digits + len(s)
+    out = np.empty((n, c_data + 2 * nbytes + 1), dtype=np.uint8)
+    out[:, :c_addr] = np.frombuffer(p, dtype=np.uint8)
+    out[:, c_addr + addr_digits:c_data] = np.frombuffer(s, dtype=np.uint8)
+    out[:, -1] = ord("\n")
+
+    last = start_addr + max(n - 1, 0) * nbytes
+    if last >> (4 * addr_digits):
+        raise ValueError("address 0x{:x} does not fit in {} hex digits".format(last, addr_digits))
+    addr = np.uint64(start_addr) + np.arange(n, dtype=np.uint64) * np.uint64(nbytes)
+    shifts = np.arange(4 * (addr_digits - 1), -1, -4, dtype=np.uint64)
+    out[:, c_addr:c_addr + addr_digits] = _HEX_DIGITS[(addr[:, None] >> shifts) & np.uint64(0xF)]
+    out[:, c_data:-1:2] = _HEX_DIGITS[rows_u8 >> 4]
+    out[:, c_data + 1:-1:2] = _HEX_DIGITS[rows_u8 & 0xF]
+    return out
+
+
+def write_addr8_hex(path: str, rows_u8: np.ndarray, start_addr: int = 0, addr_digits: int = 16,
+                    prefix: str = " @", sep: str = " ", comment: str = ""):
+    """
+    Write format_addr8_lines() text in a single buffered write; comment goes on line 0.
+    A .bin path writes the same words as an SVMB binary image instead (no comment).
+    """
+    if is_svmb_path(path):
+        write_svmb(path, [(start_addr, display_to_little(rows_u8))], svmb_style(addr_digits, prefix, sep))
+        return
+    text = format_addr8_lines(rows_u8, start_addr, addr_digits, prefix, sep)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        if comment and len(text):
+            f.write(text[0, :-1].tobytes() + "  // {}\n".format(comment).encode("utf-8"))
+            text = text[1:]
+        f.write(text.tobytes())
+
+
+def words_for_display(flat_u8: np.ndarray, endian: str = "little") -> np.ndarray:
+    """
+    Split a flat byte stream into 8-byte words as printed on each @ADDR line:
+    reversed within the word for little-endian, and a short final word
+    padded with 0x00 after the (reversed) data bytes.
+    """
+    flat = np.asarray(flat_u8, dtype=np.uint8).reshape(-1)
+    nfull = flat.size // 8
+    rows = np.zeros((-(-flat.size // 8), 8), dtype=np.uint8)
+    full = flat[:nfull * 8].reshape(nfull, 8)
+    rows[:nfull] = full[:, ::-1] if endian == "little" else full
+    tail = flat[nfull * 8:]
+    if tail.size:
+        rows[nfull, :tail.size] = tail[::-1] if endian == "little" else tail
+    return rows
+
 
 def write_mem_addr8_from_u8(u8: np.ndarray, path: str, endian: str = "little"):
-    flat = u8.reshape(-1).astype(np.uint8)
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w") as f:
-        addr = 0
-        for i in range(0, flat.size, 8):
-            chunk = flat[i:i+8]
-            data = chunk[::-1] if endian == "little" else chunk
-            if data.size < 8:
-                pad = np.zeros(8 - data.size, dtype=np.uint8)
-                data = np.concatenate([data, pad], axis=0)
-            hexstr = "".join(f"{int(b):02x}" for b in data.tolist())
-            f.write(f" @{addr:016x} {hexstr}\n")
-            addr += 8
+    write_addr8_hex(path, words_for_display(u8, endian), addr_digits=16, prefix=" @", sep=" ")
 
 def write_mem_addr8_from_i8(i8: np.ndarray, path: str, endian: str = "little"):
     write_mem_addr8_from_u8(i8.view(np.uint8), path, endian=endian)
@@ -155,31 +511,159 @@ def write_hexdump_from_little(path: str, start_addr: int, raw_le: bytes,
     if bytes_per_line % 8 != 0:
         raise ValueError("bytes_per_line must be a multiple of 8 (got {})".format(bytes_per_line))
 
-    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        addr = start_addr
-        n = len(raw_le)
-        for i in range(0, n, bytes_per_line):
-            line_le = raw_le[i:i+bytes_per_line]
-            # Pad tail with zeros to full bytes_per_line in MEMORY (little-endian):
-            if len(line_le) < bytes_per_line:
-                line_le = b"\x00" * (bytes_per_line - len(line_le)) + line_le 
-
-            # Build big-endian text per 8-byte WORD (don’t reverse the whole line):
-            be_hex_parts = []
-            for w in range(0, len(line_le), 8):
-                word_le = line_le[w:w+8]
-                be_hex_parts.append(word_le[::-1].hex())  # reverse 8B only
-
-            hexs = ''.join(be_hex_parts)
-            line = " @{addr:016x} {hexs}".format(addr=addr, hexs=hexs)
-            if comment and i == 0:
-                line += "  // " + comment
-            f.write(line + "\n")
-            addr += bytes_per_line
+    raw = np.frombuffer(raw_le, dtype=np.uint8) if isinstance(raw_le, (bytes, bytearray, memoryview)) \
+        else np.asarray(raw_le, dtype=np.uint8).reshape(-1)
+    n = raw.size
+    nfull = n // bytes_per_line
+    rows = np.zeros((-(-n // bytes_per_line), bytes_per_line), dtype=np.uint8)
+    rows[:nfull] = raw[:nfull * bytes_per_line].reshape(nfull, bytes_per_line)
+    rem = n - nfull * bytes_per_line
+    if rem:
+        # Pad tail with zeros to full bytes_per_line in MEMORY (little-endian):
+        rows[nfull, bytes_per_line - rem:] = raw[nfull * bytes_per_line:]
+    # Big-endian text per 8-byte WORD (don’t reverse the whole line):
+    rows = rows.reshape(rows.shape[0], bytes_per_line // 8, 8)[:, :, ::-1].reshape(rows.shape[0], bytes_per_line)
+    write_addr8_hex(path, rows, start_addr=start_addr, addr_digits=16, prefix=" @", sep=" ",
+                    comment=comment)
 
 
 
+# =========================
+# SVMB binary DRAM images
+# =========================
+# The words of a hexdump as raw little-endian memory, ~3.6x smaller than
+# the text and loadable with np.memmap here and $fread in tb.sv:
+#   0x00  "SVMB", u16 version, u16 header size, u32 segment count,
+#         u32 text style, u64 payload bytes, u64 reserved
+#   0x20  segment table: u64 base address, u64 length (whole 8-byte words)
+#   then each segment's bytes in table order
+# The text style records which @ADDR layout the file came from so svmb.py
+# converts back to the identical text. Chosen by a .bin extension.
+SVMB_MAGIC = b"SVMB"
+SVMB_VERSION = 1
+SVMB_HEADER = struct.Struct("<4sHHIIQQ")
+SVMB_SEGMENT = struct.Struct("<QQ")
+SVMB_STYLES = (dict(addr_digits=8, prefix="@", sep="  "),       # img2svmem.py inputs
+               dict(addr_digits=16, prefix=" @", sep=" "))      # conv.py goldens
+
+def is_svmb_path(path: str) -> bool:
+    return str(path).lower().endswith(".bin")
+
+def is_svmb(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == SVMB_MAGIC
+    except OSError:
+        return False
+
+def svmb_style(addr_digits: int = 16, prefix: str = " @", sep: str = " ") -> int:
+    fmt = dict(addr_digits=addr_digits, prefix=prefix, sep=sep)
+    return SVMB_STYLES.index(fmt) if fmt in SVMB_STYLES else 1
+
+def display_to_little(rows_u8: np.ndarray) -> np.ndarray:
+    """(lines, 8k) display-order bytes -> flat memory bytes (inverse of the per-word swap)."""
+    rows_u8 = np.asarray(rows_u8, dtype=np.uint8)
+    n, nbytes = rows_u8.shape
+    if nbytes % 8:
+        raise ValueError("SVMB lines must be whole 8-byte words")
+    return rows_u8.reshape(n, nbytes // 8, 8)[:, :, ::-1].reshape(-1)
+
+def svmb_header(style: int, segments) -> bytes:
+    """Header + segment table for [(base, length)]."""
+    total = sum(n for _, n in segments)
+    return (SVMB_HEADER.pack(SVMB_MAGIC, SVMB_VERSION, SVMB_HEADER.size, len(segments), style, total, 0)
+            + b"".join(SVMB_SEGMENT.pack(b, n) for b, n in segments))
+
+def write_svmb(path: str, segments, style: int = 1):
+    """segments: [(base address, flat little-endian bytes)]; bases/lengths must be word aligned."""
+    segs = [(int(b), np.ascontiguousarray(d, dtype=np.uint8).reshape(-1)) for b, d in segments]
+    if any(b % 8 or d.size % 8 for b, d in segs):
+        raise ValueError("SVMB segments must start and end on 8-byte words")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(svmb_header(style, [(b, d.size) for b, d in segs]))
+        for _, d in segs:
+            f.write(d.tobytes())
+
+def read_svmb_header(path: str):
+    """(style, [(base, length, file offset)]) of an SVMB file."""
+    with open(path, "rb") as f:
+        head = f.read(SVMB_HEADER.size)
+        if len(head) < SVMB_HEADER.size:
+            raise ValueError("{}: truncated SVMB header".format(path))
+        magic, version, hsize, nseg, style, total, _ = SVMB_HEADER.unpack(head)
+        if magic != SVMB_MAGIC:
+            raise ValueError("{}: not an SVMB image".format(path))
+        if version != SVMB_VERSION:
+            raise ValueError("{}: SVMB version {} (expected {})".format(path, version, SVMB_VERSION))
+        f.seek(hsize)
+        table = f.read(SVMB_SEGMENT.size * nseg)
+    segs, off = [], hsize + SVMB_SEGMENT.size * nseg
+    for i in range(nseg):
+        base, n = SVMB_SEGMENT.unpack_from(table, SVMB_SEGMENT.size * i)
+        segs.append((base, n, off))
+        off += n
+    if off - hsize - SVMB_SEGMENT.size * nseg != total or os.path.getsize(path) < off:
+        raise ValueError("{}: SVMB payload length does not match its segment table".format(path))
+    return style, segs
+
+def load_svmb_u8(path: str) -> np.ndarray:
+    """Flat little-endian buffer from address 0 (gaps are zero); a memmap for one segment at 0."""
+    _, segs = read_svmb_header(path)
+    if len(segs) == 1 and segs[0][0] == 0:
+        return np.memmap(path, dtype=np.uint8, mode="r", offset=segs[0][2], shape=(segs[0][1],))
+    buf = np.zeros(max((b + n for b, n, _ in segs), default=0), dtype=np.uint8)
+    for b, n, off in segs:
+        buf[b:b + n] = np.fromfile(path, dtype=np.uint8, count=n, offset=off)
+    return buf
+
+def iter_svmb_words(path: str, chunk_bytes: int = 1 << 20):
+    """Yield (addresses, (n, 8) LE words) in chunks of about chunk_bytes of payload."""
+    _, segs = read_svmb_header(path)
+    step = max(8, chunk_bytes // 8 * 8)
+    for b, n, off in segs:
+        for lo in range(0, n, step):
+            cnt = min(step, n - lo)
+            words = np.fromfile(path, dtype=np.uint8, count=cnt, offset=off + lo).reshape(-1, 8)
+            yield np.uint64(b + lo) + np.arange(words.shape[0], dtype=np.uint64) * np.uint64(8), words
+
+def load_svmb_words(path: str):
+    """load_hexdump_words() for an SVMB image."""
+    recs = list(iter_svmb_words(path, 1 << 62))
+    if not recs:
+        return np.zeros(0, np.uint64), np.zeros((0, 8), np.uint8)
+    return np.concatenate([a for a, _ in recs]), np.concatenate([w for _, w in recs])
+
+def hexdump_style(path: str) -> int:
+    """SVMB text style of an @ADDR hexdump, from its first record line."""
+    with open(path, "r", errors="ignore") as f:
+        for _, line in zip(range(64), f):
+            m = _HEXLINE_HEAD.match(line)
+            if m:
+                return svmb_style(len(m.group(2)), m.group(1) + "@", m.group(3))
+    return 1
+
+def hexdump_to_svmb(src: str, dst: str):
+    """Text -> SVMB. Contiguous runs become segments; repeated addresses keep the last word."""
+    addr, words = load_hexdump_words(src)
+    widx = (addr // 8).astype(np.int64)
+    if widx.size > 1 and np.any(widx[1:] <= widx[:-1]):
+        widx, first_rev = np.unique(widx[::-1], return_index=True)
+        words = words[::-1][first_rev]
+    cuts = np.flatnonzero(np.diff(widx) != 1) + 1
+    segs = [(int(i[0]) * 8, w.reshape(-1)) for i, w in zip(np.split(widx, cuts), np.split(words, cuts))]
+    write_svmb(dst, segs, hexdump_style(src))
+
+def svmb_to_hexdump(src: str, dst: str):
+    """SVMB -> text in the style the image was made from."""
+    style, segs = read_svmb_header(src)
+    fmt = SVMB_STYLES[style] if style < len(SVMB_STYLES) else SVMB_STYLES[1]
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    with open(dst, "wb") as f:
+        for b, n, off in segs:
+            le = np.fromfile(src, dtype=np.uint8, count=n, offset=off).reshape(-1, 8)
+            f.write(format_addr8_lines(le[:, ::-1], start_addr=b, **fmt).tobytes())
+
 # =========================
 # Utilities
 # =========================
@@ -195,32 +679,274 @@ def parse_hex_or_int(v: str):
     v = v.strip().lower()
     return int(v, 16) if v.startswith("0x") else int(v, 10)
 
+def final_shape(H: int, W: int, act: str = "none", padding: int = 0):
+    """(rows, cols) of the final map before pad_cols_to_multiple_of_8 (see finish_map)."""
+    h, w = H - 3, W - 3
+    if act != "none":
+        h, w = h + max(0, padding), w + max(0, padding)
+        h, w = h // 2, w // 2
+    return h, w
+
 def read_kernel_i8(buf_u8: np.ndarray, kernel_offset: int) -> np.ndarray:
     end = kernel_offset + 16
     if end > buf_u8.size:
         raise ValueError("kernel past EOF (need 16 bytes at 0x{:x})".format(kernel_offset))
+    if bytes(buf_u8[kernel_offset:kernel_offset + 4]) == KHDR_MAGIC:
+        raise ValueError("extended kernel header at 0x{:x}: only the in-memory pipeline reads it "
+                         "(not --stream / --out-of-core / --frames)".format(kernel_offset))
     return buf_u8[kernel_offset:end].view(np.int8).reshape(4, 4)
 
+# Extended kernel header (img2svmem.py --kernel-size / --stride / --dilation / --conv-pad):
+#   kernel + 0x00  "KRN" 01 | K | stride | dilation | padding      (one 8-byte word)
+#   kernel + 0x08  K*K int8 taps, row-major, zero-filled to a word boundary
+#   then the image.
+# A legacy 4x4 kernel starts with taps in {00, 01, FF}; 'K' (0x4B) is never one of them,
+# so files without the magic read exactly as before.
+KHDR_MAGIC = b"KRN\x01"
+LEGACY_IMAGE_OFFSET = 0x10
+
+def kernel_header_bytes(K: int, stride: int = 1, dilation: int = 1, padding: int = 0) -> bytes:
+    """The 8-byte extended header word for a KxK kernel."""
+    if not (1 <= K <= 255 and 1 <= stride <= 255 and 1 <= dilation <= 255 and 0 <= padding <= 255):
+        raise ValueError("kernel header fields out of range (K, stride, dilation 1..255; padding 0..255)")
+    return KHDR_MAGIC + bytes((K, stride, dilation, padding))
+
+def read_kernel_header(buf_u8: np.ndarray, kernel_offset: int):
+    """
+    (kernel int8 KxK, (stride, dilation, padding), image offset that follows it)
+    at kernel_offset. A legacy header gives the 4x4 kernel, (1, 1, 0) and 0x10.
+    """
+    if bytes(buf_u8[kernel_offset:kernel_offset + 4]) != KHDR_MAGIC:
+        return read_kernel_i8(buf_u8, kernel_offset), (1, 1, 0), LEGACY_IMAGE_OFFSET
+    K, stride, dilation, padding = (int(b) for b in buf_u8[kernel_offset + 4:kernel_offset + 8])
+    start = kernel_offset + 8
+    end = start + K * K
+    if K < 1 or stride < 1 or dilation < 1:
+        raise ValueError("bad extended kernel header at 0x{:x}".format(kernel_offset))
+    if end > buf_u8.size:
+        raise ValueError("kernel past EOF (need {} bytes at 0x{:x})".format(K * K, start))
+    return buf_u8[start:end].view(np.int8).reshape(K, K), (stride, dilation, padding), start + -(-K * K // 8) * 8
+
 def read_image_i8(buf_u8: np.ndarray, img_offset: int, H: int, W: int) -> np.ndarray:
     end = img_offset + H * W
     if end > buf_u8.size:
         raise ValueError("image past EOF (need {} bytes at 0x{:x})".format(H*W, img_offset))
     return buf_u8[img_offset:end].view(np.int8).reshape(H, W)
 
-def conv4x4_valid_i8_i8(img_i8: np.ndarray, ker_i8: np.ndarray) -> np.ndarray:
+# ---------- kernel presets (img2svmem.py --kernel, conv.py --presets) ----------
+KERNEL_PRESETS = ("box", "edge", "sharpen", "emboss")
+
+def kernel_preset(name: str, size: int = 4) -> np.ndarray:
+    """All presets strictly use {-1,0,1} entries (float32, row-major); only box exists at sizes other than 4."""
+    name = (name or "box").lower()
+    if name == "box":
+        k = np.ones((size, size), dtype=np.float32)
+    elif size != 4:
+        raise ValueError(f"preset '{name}' is 4x4 only; give --kernel-values or --kernel-csv for {size}x{size}")
+    elif name == "edge":
+        k = np.array([
+            [-1, -1, -1, -1],
+            [ 0,  0,  0,  0],
+            [ 1,  1,  1,  1],
+            [ 0,  0,  0,  0]
+        ], dtype=np.float32)
+    elif name == "sharpen":
+        k = np.array([
+            [ 0, -1, -1,  0],
+            [-1,  1,  1, -1],
+            [-1,  1,  1, -1],
+            [ 0, -1, -1,  0]
+        ], dtype=np.float32)
+    elif name == "emboss":
+        k = np.array([
+            [-1, -1,  0,  0],
+            [-1,  0,  0,  1],
+            [ 0,  0,  1,  1],
+            [ 0,  1,  1,  1]
+        ], dtype=np.float32)
+    else:
+        raise ValueError(f"Unknown kernel preset: {name}")
+    return k
+
+def quantize_kernel_to_trinary(k: np.ndarray) -> np.ndarray:
+    """Force any kernel to {-1,0,1} via nearest thresholding."""
+    q = np.zeros_like(k, dtype=np.float32)
+    q[k >  0.5] =  1.0
+    q[k < -0.5] = -1.0
+    return q
+
+def kernel_to_i8_bytes(k: np.ndarray) -> np.ndarray:
+    """Row-major KxK -> K*K int8 coeffs, as raw two’s-complement bytes (np.uint8 view)."""
+    k_q = quantize_kernel_to_trinary(k).astype(np.int8).reshape(-1)  # int8 in {-1,0,1}
+    return k_q.view(np.uint8)  # reinterpret as bytes
+
+def preset_kernel_i8(name: str, size: int = 4) -> np.ndarray:
+    """A preset as the int8 KxK taps the header carries (kernel_to_i8_bytes, viewed back)."""
+    return kernel_to_i8_bytes(kernel_preset(name, size)).view(np.int8).reshape(size, size)
+
+# ---------- kernel-specialized 4x4 engines ----------
+CONV_ENGINES = ("auto", "generic", "trinary", "separable", "box")
+
+def _rank1_factors(k: np.ndarray):
+    """Integer (v, h) with k == outer(v, h), or None."""
+    rows = np.flatnonzero(k.any(axis=1))
+    if rows.size == 0:
+        return None
+    h = k[rows[0]]
+    j0 = int(np.flatnonzero(h)[0])
+    v = []
+    for i in range(4):
+        if k[i, j0] % h[j0]:
+            return None
+        c = int(k[i, j0] // h[j0])
+        if not np.array_equal(k[i], c * h):
+            return None
+        v.append(c)
+    return v, [int(x) for x in h]
+
+def conv_plan(ker_i8: np.ndarray, engine: str = "auto") -> dict:
+    """
+    Pick the 4x4 engine for a kernel (engine="auto") or validate a forced one:
+      box        all 16 taps equal c: 4-wide window sums by pairwise doubling,
+                 2 adds per axis (4 per pixel, like a summed-area table's 4
+                 lookups, but without cumsum's serial pass), x c
+      separable  k = outer(v, h): row pass over nz(h) taps, column pass over nz(v)
+      trinary    taps in {-1,0,1}: add/subtract the nonzero taps, no multiplies
+      generic    multiply-add over all 16 taps
+    """
+    k = ker_i8.astype(np.int32).reshape(4, 4)
+    taps = [(dy, dx, int(k[dy, dx])) for dy in range(4) for dx in range(4) if k[dy, dx]]
+    rank1 = _rank1_factors(k)
+    ok = {
+        "generic": True,
+        "trinary": bool(np.all(np.abs(k) <= 1)),
+        "separable": rank1 is not None,
+        "box": bool(k[0, 0] != 0 and np.all(k == k[0, 0])),
+    }
+    if engine == "auto":
+        if ok["box"]:
+            engine = "box"
+        elif ok["separable"] and sum(map(bool, rank1[0])) + sum(map(bool, rank1[1])) < len(taps):
+            engine = "separable"
+        elif ok["trinary"]:
+            engine = "trinary"
+        else:
+            engine = "generic"
+    elif not ok.get(engine, False):
+        raise ValueError("kernel does not fit the '{}' engine".format(engine))
+    plan = {"engine": engine, "scale": int(k[0, 0])}
+    if engine == "generic":
+        plan["taps"] = [(dy, dx, int(k[dy, dx])) for dy in range(4) for dx in range(4)]
+    else:
+        plan["taps"] = taps
+    if engine == "separable":
+        plan["v"], plan["h"] = rank1
+    return plan
+
+def _scratch(scratch: dict, name: str, shape, dtype) -> np.ndarray:
+    """Reusable buffer from `scratch`, grown on demand."""
+    size = int(np.prod(shape))
+    buf = scratch.get(name)
+    if buf is None or buf.size < size or buf.dtype != dtype:
+        buf = scratch[name] = np.empty(size, dtype=dtype)
+    return buf[:size].reshape(shape)
+
+def _accumulate_(C: np.ndarray, terms, T: np.ndarray, multiply: bool = False):
+    """C = sum(coef * view); ±1 terms add/subtract unless multiply is set."""
+    first = True
+    for view, c in terms:
+        if multiply or c not in (1, -1):
+            np.multiply(view, c, out=T)
+            view, c = T, 1
+        if first:
+            if c == 1:
+                np.copyto(C, view)
+            else:
+                np.negative(view, out=C)
+            first = False
+        elif c == 1:
+            np.add(C, view, out=C)
+        else:
+            np.subtract(C, view, out=C)
+    if first:
+        C[...] = 0
+
+def conv4x4_band_(S: np.ndarray, C: np.ndarray, plan: dict, scratch: dict):
+    """
+    C (n, Wc) = VALID 4x4 conv of S (n+3, Wc+3), both in the accumulator dtype.
+    Integer wraparound is harmless: partial sums are exact modulo 2**bits and
+    every final value fits the dtype.
+    """
+    n, Wc = C.shape
+    dt = C.dtype
+    e = plan["engine"]
+    if e == "box":
+        P = _scratch(scratch, "pair", (n + 3, Wc + 2), dt)
+        R = _scratch(scratch, "row", (n + 3, Wc), dt)
+        Q = _scratch(scratch, "colpair", (n + 2, Wc), dt)
+        np.add(S[:, :-1], S[:, 1:], out=P)          # x[j] + x[j+1]
+        np.add(P[:, :-2], P[:, 2:], out=R)          # 4-wide row sums
+        np.add(R[:-1], R[1:], out=Q)
+        np.add(Q[:-2], Q[2:], out=C)                # 4-tall column sums
+        if plan["scale"] != 1:
+            np.multiply(C, plan["scale"], out=C)
+    elif e == "separable":
+        R = _scratch(scratch, "row", (n + 3, Wc), dt)
+        T = _scratch(scratch, "rowt", (n + 3, Wc), dt)
+        _accumulate_(R, [(S[:, j:j + Wc], c) for j, c in enumerate(plan["h"]) if c], T)
+        _accumulate_(C, [(R[i:i + n], c) for i, c in enumerate(plan["v"]) if c], T[:n])
+    else:
+        T = _scratch(scratch, "tap", (n, Wc), dt)
+        _accumulate_(C, [(S[dy:dy + n, dx:dx + Wc], c) for dy, dx, c in plan["taps"]], T,
+                     multiply=(e == "generic"))
+
+def conv4x4_valid_i8_i8(img_i8: np.ndarray, ker_i8: np.ndarray, engine: str = "auto") -> np.ndarray:
     """True 4x4 convolution, VALID, stride=1 (NumPy-old friendly)."""
     H, W = img_i8.shape
     if H < 4 or W < 4:
         raise ValueError("image must be at least 4x4")
-    # Flip kernel for convolution without np.flip tuple-of-axes (compat)
-    #k = ker_i8[::-1, ::-1].astype(np.int32)
-    k = ker_i8.astype(np.int32)
+    return conv4x4_valid_nchw(img_i8[None, None], ker_i8[None, None], engine=engine)[0, 0]
+
+def conv4x4_valid_nchw(x_i8: np.ndarray, k_i8: np.ndarray, band_rows: int = 64,
+                       engine: str = "auto") -> np.ndarray:
+    """
+    Batched 4x4 VALID convolution, stride 1, summed across channels.
+      x_i8 : (N, C, H, W) int8 images
+      k_i8 : (K, C, 4, 4) int8 kernel bank
+      ->     (N, K, H-3, W-3) int32
+
+    A single kernel on a single channel runs the engine conv_plan picks for it.
+    Anything larger is a strided 4x4 window view contracted against the whole
+    bank with one matmul per band of `band_rows` output rows, so the im2col
+    copy stays cache-sized. The matmul runs in float32 when the kernel bound
+    keeps every partial sum below 2**24 (exact integers), else float64.
+    """
+    N, C, H, W = x_i8.shape
+    K = k_i8.shape[0]
+    if k_i8.shape[1:] != (C, 4, 4):
+        raise ValueError("kernel bank must be (K, {}, 4, 4), got {}".format(C, k_i8.shape))
+    if H < 4 or W < 4:
+        raise ValueError("image must be at least 4x4")
     out_h, out_w = H - 3, W - 3
-    out = np.zeros((out_h, out_w), dtype=np.int32)
-    img16 = img_i8.astype(np.int32, copy=False)
-    for dy in range(4):
-        for dx in range(4):
-            out += img16[dy:dy+out_h, dx:dx+out_w] * int(k[dy, dx])
+    out = np.zeros((N, K, out_h, out_w), dtype=np.int32)
+
+    if K == 1 and C == 1:
+        plan = conv_plan(k_i8[0, 0], engine)
+        scratch = {}
+        for n in range(N):
+            conv4x4_band_(x_i8[n, 0].astype(np.int32), out[n, 0], plan, scratch)
+        return out
+
+    # |partial sum| <= 128 * sum|k| over (C, 4, 4), per kernel
+    bound = 128 * int(np.abs(k_i8.astype(np.int32)).sum(axis=(1, 2, 3)).max())
+    ftype = np.float32 if bound < (1 << 24) else np.float64
+    xf = x_i8.astype(ftype)
+    kf = np.ascontiguousarray(k_i8.reshape(K, C * 16).T, dtype=ftype)      # (C*16, K)
+    for r0 in range(0, out_h, band_rows):
+        r1 = min(out_h, r0 + band_rows)
+        win = np.lib.stride_tricks.sliding_window_view(xf[:, :, r0:r1 + 3], (4, 4), axis=(2, 3))
+        cols = win.transpose(0, 2, 3, 1, 4, 5).reshape(N, r1 - r0, out_w, C * 16)
+        out[:, :, r0:r1] = np.moveaxis(cols @ kf, -1, 1)
     return out
 
 # ---------- Integer helpers / ops ----------
@@ -349,6 +1075,404 @@ def pool_2x2_stride2(arr: np.ndarray, mode: str):
         return blocks.max(axis=(1, 3))
     raise ValueError("unsupported --pool {}".format(mode))
 
+# ---------- fused conv→act→(zero-pad)→pool ----------
+_LRELU_NAMES = ("lrelu", "leaky", "leaky_relu", "leaky-relu")
+
+def fused_acc_dtype(ker_i8: np.ndarray, act: str = "none"):
+    """Narrowest of int16/int32 that holds every conv value (and 2x2 pool sum) for this kernel."""
+    bound = 128 * int(np.abs(ker_i8.astype(np.int32)).sum())
+    if act != "none":
+        bound *= 4
+    return np.int16 if bound <= np.iinfo(np.int16).max - 3 else np.int32
+
+def _trunc_div4_(x: np.ndarray, tmp: np.ndarray):
+    """x = trunc(x / 4) in place (adds 3 to negatives before the shift)."""
+    np.right_shift(x, x.dtype.itemsize * 8 - 1, out=tmp)
+    np.bitwise_and(tmp, 3, out=tmp)
+    np.add(x, tmp, out=x)
+    np.right_shift(x, 2, out=x)
+
+def row_spans(rows: int, threads: int, align: int = 2):
+    """Split [0, rows) into at most `threads` contiguous spans whose starts are multiples of align."""
+    if threads <= 1 or rows <= align:
+        return [(0, rows)]
+    per = -(-rows // threads)
+    per = -(-per // align) * align
+    return [(lo, min(rows, lo + per)) for lo in range(0, rows, per)]
+
+def resolve_threads(threads: int) -> int:
+    """--threads value: 0 means every core."""
+    return threads if threads and threads > 0 else (os.cpu_count() or 1)
+
+def fused_conv_act_pool(img_i8: np.ndarray, ker_i8: np.ndarray, act: str = "none",
+                        padding: int = 0, band_rows: int = 64, dtype=None,
+                        engine: str = "auto", out: np.ndarray = None,
+                        band_done=None, threads: int = 1) -> np.ndarray:
+    """
+    conv4x4 → act → zero_pad → avg pool → pad_cols_to_multiple_of_8 in one pass,
+    bit-exact with the finish_map chain. Works on bands of `band_rows` conv rows
+    with buffers allocated once; every op writes through out=. The accumulator
+    is int16 when fused_acc_dtype proves it cannot overflow, else int32, and
+    the conv runs the conv_plan engine for the kernel.
+
+    With `out` (an int8 (rows, cols padded to 8) array, e.g. a memmap) each
+    band is clamped to int8 and stored there instead of a new accumulator-typed
+    map; band_done(lo, hi) is called once output rows [lo, hi) are final.
+
+    threads > 1 splits the conv rows into one span per thread (even starts, so
+    pool pairs never straddle two spans); each span reads its rows plus the
+    3-row halo below and writes its own slice of `out`, with its own band
+    buffers. NumPy releases the GIL inside the ufuncs, so spans run in
+    parallel. band_done needs the serial, in-order path.
+    """
+    H, W = img_i8.shape
+    if H < 4 or W < 4:
+        raise ValueError("image must be at least 4x4")
+    a = (act or "none").lower()
+    if a not in ("none", "relu") + _LRELU_NAMES:
+        raise ValueError("unsupported --act {}".format(act))
+    pooled = a != "none"
+    pad = max(0, int(padding)) if pooled else 0
+    Hc, Wc = H - 3, W - 3
+    Hp, Wp = Hc + pad, Wc + pad
+    if pooled and (Hp != Wp or Hp % 2):
+        # same contract as blocks2x2_grid
+        raise ValueError("Expected an N×N 2D array." if Hp != Wp else "N must be even.")
+    Ho, Wo = final_shape(H, W, a, pad)
+    Wo8 = -(-Wo // 8) * 8
+    dt = np.dtype(dtype or fused_acc_dtype(ker_i8, a))
+
+    if out is None:
+        out = np.zeros((Ho, Wo8), dtype=dt)
+        clamp = False
+    else:
+        if out.shape != (Ho, Wo8) or out.dtype != np.int8:
+            raise ValueError("out must be int8 {}x{}".format(Ho, Wo8))
+        clamp = True
+    plan = conv_plan(ker_i8, engine)
+    spans = row_spans(Hp, threads)
+    if len(spans) > 1 and band_done is not None:
+        raise ValueError("band_done needs threads=1")
+    band_rows = max(2, min(band_rows, spans[0][1]) // 2 * 2)
+
+    def span(lo: int, hi: int):
+        _fused_span(img_i8, plan, a, lo, hi, Hc, Wc, Wp, Wo, dt, band_rows, out, clamp, band_done)
+
+    if len(spans) == 1:
+        span(*spans[0])
+    else:
+        with ThreadPoolExecutor(len(spans)) as ex:
+            for f in [ex.submit(span, lo, hi) for lo, hi in spans]:
+                f.result()
+    return out
+
+def _fused_span(img_i8, plan, a, lo, hi, Hc, Wc, Wp, Wo, dt, band_rows, out, clamp, band_done):
+    """fused_conv_act_pool over (padded) conv rows [lo, hi), lo even."""
+    W = img_i8.shape[1]
+    pooled = a != "none"
+    scratch = {}
+    src = np.empty((band_rows + 3, W), dtype=dt)
+    acc = np.zeros((band_rows, Wp), dtype=dt)        # columns Wc: stay zero (right pad)
+    tmp = np.empty((band_rows, Wc), dtype=dt)
+    tmp2 = np.empty((band_rows, Wc), dtype=dt)
+    if pooled:
+        psum = np.empty((band_rows // 2, Wp // 2), dtype=dt)
+        ptmp = np.empty_like(psum)
+
+    for r0 in range(lo, hi, band_rows):
+        n = min(band_rows, hi - r0)
+        nc = max(0, min(n, Hc - r0))                  # conv rows in this band; rest is bottom pad
+        A = acc[:n]
+        if nc < n:
+            A[nc:] = 0
+        if nc:
+            S = src[:nc + 3]
+            np.copyto(S, img_i8[r0:r0 + nc + 3], casting="unsafe")
+            C = A[:nc, :Wc]
+            T = tmp[:nc]
+            conv4x4_band_(S, C, plan, scratch)
+            if a == "relu":
+                np.maximum(C, 0, out=C)
+            elif a in _LRELU_NAMES:
+                # x >= 0 ? x : trunc(x / 4)  ==  max(x, 0) + trunc(min(x, 0) / 4)
+                N = tmp2[:nc]
+                np.minimum(C, 0, out=N)
+                np.maximum(C, 0, out=C)
+                _trunc_div4_(N, T)
+                np.add(C, N, out=C)
+        if not pooled:
+            if clamp:
+                np.clip(A[:nc, :Wc], -128, 127, out=A[:nc, :Wc])
+            out[r0:r0 + nc, :Wc] = A[:nc, :Wc]
+            if band_done is not None and nc:
+                band_done(r0, r0 + nc)
+            continue
+        P, Q = psum[:n // 2], ptmp[:n // 2]
+        np.add(A[0::2, 0::2], A[0::2, 1::2], out=P)
+        np.add(P, A[1::2, 0::2], out=P)
+        np.add(P, A[1::2, 1::2], out=P)
+        _trunc_div4_(P, Q)
+        if clamp:
+            np.clip(P, -128, 127, out=P)
+        out[r0 // 2:r0 // 2 + n // 2, :Wo] = P
+        if band_done is not None:
+            band_done(r0 // 2, r0 // 2 + n // 2)
+
+# ---------- general KxK conv (stride, dilation, zero padding) ----------
+CONV_ALGOS = ("auto", "engine4", "shift", "im2col", "fft")
+# conv_algo cost model: ns on the bench_conv.py reference run (1024x1024, NumPy 2.4, 1 core)
+SHIFT_NS = (0.45, 0.85)     # per output pixel, per nonzero tap: ±1 (add/sub), other (multiply-add)
+IM2COL_NS = (35.0, 0.55)    # per output pixel: window copy, plus per tap
+FFT_NS = 60.0               # per padded input pixel, whatever K and stride
+
+def conv_out_size(n: int, k: int, stride: int = 1, dilation: int = 1, padding: int = 0) -> int:
+    """Output length of a VALID conv over n inputs zero-padded by `padding` on each side."""
+    span = dilation * (k - 1) + 1
+    if stride < 1 or dilation < 1 or padding < 0:
+        raise ValueError("stride and dilation must be >= 1, padding >= 0")
+    if n + 2 * padding < span:
+        raise ValueError("image ({} + 2*{}) smaller than the dilated kernel ({})".format(n, padding, span))
+    return (n + 2 * padding - span) // stride + 1
+
+def conv_algo(k: np.ndarray, out_shape, in_shape, stride: int = 1, dilation: int = 1) -> str:
+    """
+    Fastest algorithm for a kernel on (padded) in_shape -> out_shape:
+      engine4  4x4, stride 1, dilation 1: the conv_plan engines
+      shift    one strided add per nonzero tap; wins for small or sparse kernels
+      im2col   strided window view x kernel matmul; wins for big kernels at stride > 1
+      fft      float64 rfft2 product; cost independent of K, wins for big kernels
+    Everything but engine4 is picked by the cost model above (re-fit it with bench_conv.py).
+    """
+    K = k.shape[0]
+    if K == 4 and stride == 1 and dilation == 1:
+        return "engine4"
+    unit = int(np.count_nonzero(np.abs(k) == 1))
+    mul = int(np.count_nonzero(k)) - unit
+    out_px = out_shape[0] * out_shape[1]
+    cost = {"shift": out_px * (unit * SHIFT_NS[0] + mul * SHIFT_NS[1]),
+            "im2col": out_px * (IM2COL_NS[0] + K * K * IM2COL_NS[1]),
+            "fft": in_shape[0] * in_shape[1] * FFT_NS}
+    return min(cost, key=cost.get)
+
+def _conv_shift(xp: np.ndarray, k: np.ndarray, s: int, d: int, out: np.ndarray, scratch: dict):
+    Ho, Wo = out.shape
+    T = _scratch(scratch, "shift", (Ho, Wo), np.int32)
+    out[...] = 0
+    for i, j in zip(*np.nonzero(k)):
+        c = int(k[i, j])
+        v = xp[i * d:i * d + (Ho - 1) * s + 1:s, j * d:j * d + (Wo - 1) * s + 1:s]
+        if c == 1:
+            np.add(out, v, out=out)
+        elif c == -1:
+            np.subtract(out, v, out=out)
+        else:
+            np.multiply(v, c, out=T)
+            np.add(out, T, out=out)
+
+def _im2col_dtype(k: np.ndarray):
+    # |partial sum| <= 128 * sum|k|: exact in float32 below 2**24 (as in conv4x4_valid_nchw)
+    return np.dtype(np.float32 if 128 * int(np.abs(k).sum()) < (1 << 24) else np.float64)
+
+def _conv_im2col(xp: np.ndarray, k: np.ndarray, s: int, d: int, out: np.ndarray, scratch: dict):
+    K = k.shape[0]
+    Ho, Wo = out.shape
+    r, c = xp.strides
+    win = np.lib.stride_tricks.as_strided(xp, (Ho, Wo, K, K), (s * r, s * c, d * r, d * c), writeable=False)
+    kf = k.reshape(-1).astype(xp.dtype)
+    band = max(1, (1 << 20) // max(1, Wo * K * K))       # ~4-8 MB of im2col rows at a time
+    for r0 in range(0, Ho, band):
+        r1 = min(Ho, r0 + band)
+        out[r0:r1] = (win[r0:r1].reshape((r1 - r0) * Wo, K * K) @ kf).reshape(r1 - r0, Wo)
+
+def _fft_len(n: int) -> int:
+    """Smallest 2^a 3^b 5^c >= n (fast pocketfft sizes)."""
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            m = p35
+            while m < n:
+                m *= 2
+            best = min(best, m)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+def _conv_fft(xp: np.ndarray, k: np.ndarray, s: int, d: int, out: np.ndarray, scratch: dict):
+    K = k.shape[0]
+    Ho, Wo = out.shape
+    span = d * (K - 1) + 1
+    kd = np.zeros((span, span), dtype=np.float64)
+    kd[::d, ::d] = k[::-1, ::-1]                        # correlation = convolution with the flipped kernel
+    # Circular conv of the padded image's size: outputs span-1.. are wrap-free.
+    # The transforms are NumPy temporaries (not scratch): pocketfft allocates its own.
+    shape = (_fft_len(xp.shape[0]), _fft_len(xp.shape[1]))
+    y = np.fft.irfft2(np.fft.rfft2(xp, shape) * np.fft.rfft2(kd, shape), shape)
+    y = y[span - 1:span - 1 + (Ho - 1) * s + 1:s, span - 1:span - 1 + (Wo - 1) * s + 1:s]
+    r = np.rint(y)
+    if np.abs(y - r).max(initial=0) > 0.25:
+        raise ArithmeticError("FFT conv rounding margin exceeded; use --conv-algo im2col")
+    np.copyto(out, r, casting="unsafe")
+
+def _conv_input(scratch: dict, img_i8: np.ndarray, padding: int, dtype) -> np.ndarray:
+    """img_i8 zero-padded on every side, as `dtype`, in a scratch buffer."""
+    H, W = img_i8.shape
+    p = padding
+    xp = _scratch(scratch, "xp." + np.dtype(dtype).name, (H + 2 * p, W + 2 * p), dtype)
+    if p:
+        xp[:p] = 0
+        xp[-p:] = 0
+        xp[:, :p] = 0
+        xp[:, -p:] = 0
+    np.copyto(xp[p:p + H, p:p + W], img_i8, casting="unsafe")
+    return xp
+
+def _conv_setup(shape, ker_i8, stride, dilation, padding, algo):
+    """(int32 kernel, output shape, resolved algorithm, padded-input dtype) for conv2d_i8."""
+    k = np.asarray(ker_i8).astype(np.int32)
+    if k.ndim != 2 or k.shape[0] != k.shape[1]:
+        raise ValueError("kernel must be square KxK, got {}".format(k.shape))
+    K = k.shape[0]
+    H, W = shape
+    Ho = conv_out_size(H, K, stride, dilation, padding)
+    Wo = conv_out_size(W, K, stride, dilation, padding)
+    if algo == "auto":
+        algo = conv_algo(k, (Ho, Wo), (H + 2 * padding, W + 2 * padding), stride, dilation)
+    if algo not in CONV_ALGOS:
+        raise ValueError("unknown conv algorithm '{}'".format(algo))
+    if algo == "engine4" and (K, stride, dilation) != (4, 1, 1):
+        raise ValueError("engine4 needs a 4x4 kernel with stride 1 and dilation 1")
+    dt = {"im2col": _im2col_dtype(k), "fft": np.dtype(np.float64)}.get(algo, np.dtype(np.int32))
+    return k, (Ho, Wo), algo, dt
+
+def conv2d_i8(img_i8: np.ndarray, ker_i8: np.ndarray, stride: int = 1, dilation: int = 1,
+              padding: int = 0, algo: str = "auto", out: np.ndarray = None,
+              scratch: dict = None) -> np.ndarray:
+    """
+    VALID KxK conv (correlation, like conv4x4_valid_i8_i8) of an int8 image,
+    zero-padded by `padding` on every side, with stride and dilation -> int32.
+    All algorithms are bit-exact with each other; algo="auto" uses conv_algo.
+
+    `out` (int32, may be a view) receives the map instead of a new array, and
+    the padded input and temporaries come from `scratch` (see conv2d_reserve),
+    so repeated calls allocate nothing full-size except the FFT transforms.
+    """
+    k, (Ho, Wo), algo, dt = _conv_setup(img_i8.shape, ker_i8, stride, dilation, padding, algo)
+    if out is None:
+        out = np.empty((Ho, Wo), dtype=np.int32)
+    elif out.shape != (Ho, Wo) or out.dtype != np.int32:
+        raise ValueError("out must be int32 {}x{}".format(Ho, Wo))
+    scratch = {} if scratch is None else scratch
+    xp = _conv_input(scratch, img_i8, padding, dt)
+    if algo == "engine4":
+        conv4x4_band_(xp, out, conv_plan(k.astype(np.int8)), scratch)
+    else:
+        {"shift": _conv_shift, "im2col": _conv_im2col, "fft": _conv_fft}[algo](xp, k, stride, dilation, out, scratch)
+    return out
+
+def conv2d_reserve(scratch: dict, shape, ker_i8: np.ndarray, stride: int = 1, dilation: int = 1,
+                   padding: int = 0, algo: str = "auto") -> str:
+    """Grow `scratch` to what conv2d_i8 needs for this layer; returns the resolved algorithm."""
+    k, (Ho, Wo), algo, dt = _conv_setup(shape, ker_i8, stride, dilation, padding, algo)
+    H, W = shape
+    _scratch(scratch, "xp." + dt.name, (H + 2 * padding, W + 2 * padding), dt)
+    if algo == "shift":
+        _scratch(scratch, "shift", (Ho, Wo), np.int32)
+    elif algo == "engine4":
+        # conv4x4_band_'s buffers for one band of Ho rows
+        names = {"box": [("pair", 3, 2), ("row", 3, 0), ("colpair", 2, 0)],
+                 "separable": [("row", 3, 0), ("rowt", 3, 0)]}.get(conv_plan(k.astype(np.int8))["engine"],
+                                                                  [("tap", 0, 0)])
+        for name, dr, dc in names:
+            _scratch(scratch, name, (Ho + dr, Wo + dc), np.int32)
+    return algo
+
+# ---------- quantized layer (net_run.py) ----------
+def layer_shapes(shape, K: int, stride: int = 1, dilation: int = 1, conv_pad: int = 0,
+                 pool: str = "none", padding: int = 0):
+    """(conv map, zero-padded map before the pool, layer output) shapes of one layer."""
+    Hc = conv_out_size(shape[0], K, stride, dilation, conv_pad)
+    Wc = conv_out_size(shape[1], K, stride, dilation, conv_pad)
+    if pool == "none":
+        return (Hc, Wc), (Hc, Wc), (Hc, Wc)
+    if pool != "avg":
+        raise ValueError("unsupported pool '{}' (avg|none)".format(pool))
+    Hp, Wp = Hc + max(0, padding), Wc + max(0, padding)
+    if Hp % 2 or Wp % 2:
+        raise ValueError("pool input {}x{} must have even sides (adjust padding)".format(Wp, Hp))
+    return (Hc, Wc), (Hp, Wp), (Hp // 2, Wp // 2)
+
+def layer_reserve(scratch: dict, shape, ker_i8: np.ndarray, stride: int = 1, dilation: int = 1,
+                  conv_pad: int = 0, pool: str = "none", padding: int = 0, scale: float = None,
+                  algo: str = "auto") -> str:
+    """Grow `scratch` to what conv_layer_ needs for this layer; returns the resolved conv algorithm."""
+    algo = conv2d_reserve(scratch, shape, ker_i8, stride, dilation, conv_pad, algo)
+    if scale is not None:
+        out = layer_shapes(shape, ker_i8.shape[0], stride, dilation, conv_pad, pool, padding)[2]
+        _scratch(scratch, "requant", out, np.float64)
+    return algo
+
+def conv_layer_(src_i8: np.ndarray, ker_i8: np.ndarray, dst_i8: np.ndarray, acc: np.ndarray,
+                tmp: np.ndarray, scratch: dict, stride: int = 1, dilation: int = 1, conv_pad: int = 0,
+                act: str = "none", pool: str = "none", padding: int = 0, shift: int = 0,
+                scale: float = None, algo: str = "auto") -> np.ndarray:
+    """
+    One quantized layer entirely in caller buffers:
+      conv (int32, into acc) → act → zero_pad (bottom/right, as zero_pad)
+      → 2x2 avg pool (TTZ) → requant → int8 view of dst_i8
+    acc and tmp are flat int32 buffers of at least twice the pre-pool map
+    size; dst_i8 is a flat int8 buffer. Requant is a rounding arithmetic
+    right shift by `shift` (ties toward +inf), or rint(x * scale) when scale
+    is given, then saturation to int8. act/pool/padding follow finish_map, so
+    one layer with shift 0 reproduces conv.py's final map.
+    """
+    a = (act or "none").lower()
+    if a not in ("none", "relu") + _LRELU_NAMES:
+        raise ValueError("unsupported act {}".format(act))
+    (Hc, Wc), (Hp, Wp), (Ho, Wo) = layer_shapes(src_i8.shape, ker_i8.shape[0], stride, dilation,
+                                                 conv_pad, pool, padding)
+    n = Hp * Wp
+    A = acc[:n].reshape(Hp, Wp)
+    C = A[:Hc, :Wc]
+    conv2d_i8(src_i8, ker_i8, stride, dilation, conv_pad, algo, out=C, scratch=scratch)
+    A[Hc:] = 0
+    A[:Hc, Wc:] = 0
+
+    if a == "relu":
+        np.maximum(C, 0, out=C)
+    elif a in _LRELU_NAMES:
+        # x >= 0 ? x : trunc(x / 4), as in fused_conv_act_pool
+        N = tmp[:Hc * Wc].reshape(Hc, Wc)
+        T = tmp[n:n + Hc * Wc].reshape(Hc, Wc)
+        np.minimum(C, 0, out=N)
+        np.maximum(C, 0, out=C)
+        _trunc_div4_(N, T)
+        np.add(C, N, out=C)
+
+    if pool == "avg":
+        R = tmp[:Ho * Wo].reshape(Ho, Wo)
+        np.add(A[0::2, 0::2], A[0::2, 1::2], out=R)
+        np.add(R, A[1::2, 0::2], out=R)
+        np.add(R, A[1::2, 1::2], out=R)
+        _trunc_div4_(R, acc[n:n + Ho * Wo].reshape(Ho, Wo))
+    else:
+        R = C
+
+    if scale is not None:
+        F = _scratch(scratch, "requant", (Ho, Wo), np.float64)
+        np.multiply(R, float(scale), out=F)
+        np.rint(F, out=F)
+        np.clip(F, -128, 127, out=F)
+        np.copyto(R, F, casting="unsafe")
+    elif shift:
+        np.add(R, 1 << (shift - 1), out=R)
+        np.right_shift(R, shift, out=R)
+    np.clip(R, -128, 127, out=R)
+    out = dst_i8[:Ho * Wo].reshape(Ho, Wo)
+    np.copyto(out, R, casting="unsafe")
+    return out
+
 # ---------- visualization & file helpers ----------
 def save_png_u8(path: str, img_u8_2d: np.ndarray):
     os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
@@ -373,16 +1497,650 @@ def clamp_final_to_int8(arr_like) -> np.ndarray:
     a = np.clip(a, -128, 127).astype(np.int8, copy=False)
     return a
 
-def write_png_clipped_int8(path: Path, arr_f: np.ndarray):
-    """Clipped visualization: i8 = clip(round(arr_f), -128,127); u8 = i8 + 128."""
+def clipped_int8_to_u8(arr_f: np.ndarray) -> np.ndarray:
+    """i8 = clip(round(arr_f), -128,127); u8 = i8 + 128."""
+    if np.issubdtype(arr_f.dtype, np.signedinteger):
+        return (np.clip(arr_f, -128, 127).astype(np.int16) + 128).astype(np.uint8)
     i8 = np.clip(np.rint(arr_f), -128, 127).astype(np.int16)
-    u8 = (i8 + 128).astype(np.uint8)
-    Image.fromarray(u8, mode="L").save(path)
+    return (i8 + 128).astype(np.uint8)
+
+def write_png_clipped_int8(path: Path, arr_f: np.ndarray, level: int = 6):
+    """Clipped visualization: i8 = clip(round(arr_f), -128,127); u8 = i8 + 128."""
+    Image.fromarray(clipped_int8_to_u8(arr_f), mode="L").save(path, compress_level=level)
+
+# =========================
+# Stage image writer
+# =========================
+# --emit stage images (and the final PNG) are encoded on a small thread pool
+# so zlib overlaps the next stage's compute and the DAT formatting; run()
+# joins the pool before returning. npy/raw store the clipped int8 map itself
+# (no +128 bias, no compression) for machine consumption.
+
+EMIT_FORMATS = ("png", "npy", "raw")
+
+def emit_path(png_path: str, fmt: str) -> str:
+    """Stage image path for --emit-format: *.png as given, else the .npy/.raw sibling."""
+    return png_path if fmt == "png" else os.path.splitext(png_path)[0] + "." + fmt
+
+class StageWriter:
+    """Writes clipped-int8 images on `workers` threads (0: inline); close() joins and re-raises."""
+
+    def __init__(self, workers: int = 2, level: int = 6, fmt: str = "png"):
+        self.level, self.fmt = level, fmt
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="emit") if workers > 0 else None
+        self.futures = []
+        self.max_pending = 2 * max(workers, 1)  # bounds the images held for --frames runs
+
+    def submit(self, png_path: str, arr: np.ndarray, fmt: str = None) -> str:
+        """Queue one image (arr must not change afterwards); returns the path written."""
+        fmt = fmt or self.fmt
+        path = emit_path(png_path, fmt)
+        if self.pool is None:
+            self._write(path, arr, fmt)
+            return path
+        self.futures = [f for f in self.futures if not f.done() or f.exception() is not None]
+        while len(self.futures) >= self.max_pending:
+            self.futures.pop(0).result()
+        self.futures.append(self.pool.submit(self._write, path, arr, fmt))
+        return path
+
+    def _write(self, path: str, arr: np.ndarray, fmt: str):
+        if fmt == "png":
+            write_png_clipped_int8(path, arr, self.level)
+            return
+        i8 = (clipped_int8_to_u8(arr) ^ 0x80).view(np.int8)
+        if fmt == "npy":
+            np.save(path, i8, allow_pickle=False)
+        else:
+            i8.tofile(path)
+
+    def close(self, check: bool = True):
+        futures, self.futures = self.futures, []
+        errors = [e for e in (f.exception() for f in futures) if e is not None]
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if errors and check:
+            raise errors[0]
+
+def stage_image(args, png_path: str, arr: np.ndarray, fmt: str = None) -> str:
+    """Write one image through args.writer when run() set one up, else inline as PNG."""
+    writer = getattr(args, "writer", None) if args is not None else None
+    if writer is None:
+        write_png_clipped_int8(png_path, arr)
+        return png_path
+    return writer.submit(png_path, arr, fmt)
+
+# =========================
+# Streaming (row-band) mode
+# =========================
+# Mirrors the DUT's rolling SRAM snapshot: the image arrives in row bands,
+# conv keeps a 3-row halo, and finished output rows are appended to the
+# PNG/DAT files, so memory is O(band_rows * W) whatever the image height.
+
+class PngRowWriter:
+    """8-bit grayscale PNG written a band of rows at a time (filter 0, one IDAT per band)."""
+
+    def __init__(self, path: str, width: int, height: int, level: int = 6):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.f = open(path, "wb")
+        self.z = zlib.compressobj(level)
+        self.f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+
+    def _chunk(self, tag: bytes, data: bytes):
+        self.f.write(struct.pack(">I", len(data)) + tag + data
+                     + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    def write(self, rows_u8: np.ndarray):
+        scan = np.zeros((rows_u8.shape[0], rows_u8.shape[1] + 1), dtype=np.uint8)
+        scan[:, 1:] = rows_u8
+        data = self.z.compress(scan.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self):
+        self._chunk(b"IDAT", self.z.flush())
+        self._chunk(b"IEND", b"")
+        self.f.close()
+
+class HexdumpAppender:
+    """Append bytes to an @ADDR HEX file as they are produced (8 bytes per line)."""
+
+    def __init__(self, path: str, start_addr: int = 0, comment: str = "", addr_digits: int = 16,
+                 prefix: str = " @", sep: str = " ", endian: str = "little"):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.f = open(path, "wb")
+        self.start = self.addr = start_addr
+        self.comment = comment
+        self.fmt = dict(addr_digits=addr_digits, prefix=prefix, sep=sep)
+        self.endian = endian
+        self.binary = is_svmb_path(path)
+        if self.binary:                 # header is rewritten with the final length on close()
+            self._svmb_header()
+
+    def write(self, flat_u8: np.ndarray):
+        flat = np.ascontiguousarray(flat_u8, dtype=np.uint8).reshape(-1)
+        if flat.size % 8:
+            raise ValueError("appended rows must be whole 8-byte words")
+        if self.binary:
+            self.f.write(display_to_little(words_for_display(flat, self.endian)).tobytes())
+            self.addr += flat.size
+            return
+        text = format_addr8_lines(words_for_display(flat, self.endian), start_addr=self.addr, **self.fmt)
+        if self.comment and len(text):
+            self.f.write(text[0, :-1].tobytes() + "  // {}\n".format(self.comment).encode("utf-8"))
+            text, self.comment = text[1:], ""
+        self.f.write(text.tobytes())
+        self.addr += flat.size
+
+    def _svmb_header(self):
+        self.f.seek(0)
+        self.f.write(svmb_header(svmb_style(**self.fmt), [(self.start, self.addr - self.start)]))
+
+    def close(self):
+        if self.binary:
+            self._svmb_header()
+        self.f.close()
+
+def iter_hexdump_words(path: str, chunk_bytes: int = 1 << 20):
+    """Yield (addresses, (n, 8) LE words) per ~chunk_bytes of hexdump text (or SVMB payload)."""
+    if is_svmb(path):
+        yield from iter_svmb_words(path, chunk_bytes)
+        return
+    with open(path, "rb") as f:
+        rest = b""
+        while True:
+            blk = f.read(chunk_bytes)
+            data = rest + blk
+            if blk:
+                cut = data.rfind(b"\n") + 1
+                data, rest = data[:cut], data[cut:]
+            if data:
+                recs = _parse_hexdump_words(data)
+                if recs is not None:
+                    yield recs
+                elif any(_line_record(l) for l in data.decode("utf-8", errors="ignore").splitlines()):
+                    raise ValueError("--stream needs one 8-byte word per @ADDR line: {}".format(path))
+            if not blk:
+                return
+
+def read_hexdump_bytes(path: str, start: int, length: int) -> np.ndarray:
+    """Bytes [start, start+length) of an ascending hexdump, reading only as far as needed."""
+    out = np.zeros(length, dtype=np.uint8)
+    seen = 0
+    for addr, words in iter_hexdump_words(path, chunk_bytes=1 << 12):
+        for a, w in zip(addr.tolist(), words):
+            lo, hi = max(a, start), min(a + 8, start + length)
+            if lo < hi:
+                out[lo - start:hi - start] = w[lo - a:hi - a]
+            seen = max(seen, a + 8)
+        if seen >= start + length:
+            return out
+    raise ValueError("need {} bytes at 0x{:x}, file ends at 0x{:x}".format(length, start, seen))
+
+class HexdumpReader:
+    """
+    Forward-only random access into an ascending hexdump: read(start, n)
+    parses just far enough and drops everything before start + n, so a
+    pass over a file of many frames holds about one frame at a time.
+    """
+
+    def __init__(self, path: str, chunk_bytes: int = 1 << 20):
+        self.path = path
+        self.words = iter_hexdump_words(path, chunk_bytes)
+        self.base = 0                   # address of buf[0]
+        self.buf = bytearray()
+        self.last = -1
+
+    def _pull(self) -> bool:
+        recs = next(self.words, None)
+        if recs is None:
+            return False
+        a64 = recs[0].astype(np.int64)
+        if a64[0] <= self.last or np.any(np.diff(a64) <= 0):
+            raise ValueError("need ascending addresses: {}".format(self.path))
+        a0, self.last = int(a64[0]), int(a64[-1])
+        span = np.zeros(self.last + 8 - a0, dtype=np.uint8)
+        span.reshape(-1, 8)[(a64 - a0) // 8] = recs[1]
+        end = self.base + len(self.buf)
+        if a0 > end:
+            self.buf += bytes(a0 - end)         # address gap reads as zeros
+        elif a0 < end:
+            span = span[end - a0:]              # already-consumed bytes
+        self.buf += span.tobytes()
+        return True
+
+    def read(self, start: int, length: int) -> np.ndarray:
+        if start < self.base:
+            raise ValueError("HexdumpReader reads forward only (0x{:x} < 0x{:x})".format(start, self.base))
+        while self.base + len(self.buf) < start + length:
+            if not self._pull():
+                raise ValueError("need {} bytes at 0x{:x}, file ends at 0x{:x}".format(
+                    length, start, self.base + len(self.buf)))
+        lo = start - self.base
+        out = np.frombuffer(bytes(self.buf[lo:lo + length]), dtype=np.uint8)
+        del self.buf[:lo + length]
+        self.base = start + length
+        return out
+
+def iter_image_rows(path: str, offset: int, H: int, W: int, band_rows: int):
+    """Yield the image as int8 (rows, W) bands, parsing the hexdump incrementally."""
+    end = offset + H * W
+    pending = bytearray()
+    pos = offset            # absolute address of the next byte for `pending`
+    last = -1               # last record address seen
+    for addr, words in iter_hexdump_words(path):
+        a64 = addr.astype(np.int64)
+        if a64[0] <= last or np.any(np.diff(a64) <= 0):
+            raise ValueError("--stream needs ascending addresses: {}".format(path))
+        last = int(a64[-1])
+        a0 = int(a64[0])
+        span = np.zeros(last + 8 - a0, dtype=np.uint8)
+        span.reshape(-1, 8)[(a64 - a0) // 8] = words
+        lo, hi = max(a0, pos), min(a0 + span.size, end)
+        if hi > lo:
+            if lo > pos:
+                pending += bytes(lo - pos)      # address gap reads as zeros
+            pending += span[lo - a0:hi - a0].tobytes()
+            pos = hi
+        while len(pending) >= band_rows * W:
+            yield np.frombuffer(bytes(pending[:band_rows * W]), dtype=np.int8).reshape(band_rows, W)
+            del pending[:band_rows * W]
+        if pos >= end:
+            break
+    if pos < end:
+        raise ValueError("image extends past EOF (need {} bytes at 0x{:x})".format(H * W, offset))
+    if pending:
+        yield np.frombuffer(bytes(pending), dtype=np.int8).reshape(-1, W)
+
+def iter_conv_bands(row_bands, ker_i8: np.ndarray):
+    """VALID 4x4 conv over streamed rows, carrying a 3-row halo between bands."""
+    halo = None
+    for band in row_bands:
+        slab = band if halo is None else np.concatenate([halo, band])
+        if slab.shape[0] >= 4:
+            yield conv4x4_valid_i8_i8(slab, ker_i8)
+        halo = slab[-3:]
+
+def avg_pool_2x2_rows_i32(x_i32: np.ndarray) -> np.ndarray:
+    """avg_pool_4x4_stride4_valid_i32 arithmetic on any even-height, even-width band."""
+    h, w = x_i32.shape
+    sums = x_i32.reshape(h // 2, 2, w // 2, 2).sum(axis=(1, 3))
+    return (sums.astype(np.int32) / int(4)).astype(np.int32)
+
+def iter_pool_bands(act_bands, pad: int, width: int):
+    """zero_pad (bottom/right by `pad`) then 2x2 avg pool, on streamed rows."""
+    def padded():
+        for band in act_bands:
+            yield band
+        if pad > 0:
+            yield np.zeros((pad, width), dtype=np.int32)
+    carry = None
+    for band in padded():
+        if pad > 0:
+            band = np.pad(band, ((0, 0), (0, pad)))
+        slab = band if carry is None else np.concatenate([carry, band])
+        n2 = slab.shape[0] // 2 * 2
+        if n2:
+            yield avg_pool_2x2_rows_i32(slab[:n2])
+        carry = slab[n2:]
+
+def run_stream(args):
+    """--stream: the run() pipeline on row bands, writing output rows as they finish."""
+    H, W = args.dims
+    if args.presets:
+        raise ValueError("--stream does not support --presets")
+    if H < 4 or W < 4:
+        raise ValueError("image must be at least 4x4")
+
+    ker_i8 = read_kernel_i8(read_hexdump_bytes(args.input, args.kernel, 16), 0)
+
+    Hc, Wc = H - 3, W - 3
+    pooled = args.act != 'none'
+    pad = max(0, int(args.padding)) if pooled else 0
+    if pooled:
+        Hp, Wp = Hc + pad, Wc + pad
+        if Hp != Wp:
+            raise ValueError("Expected an N×N 2D array.")
+        if Hp % 2:
+            raise ValueError("N must be even.")
+        Ho, Wo = Hp // 2, Wp // 2
+    else:
+        Ho, Wo = Hc, Wc
+    Wo8 = -(-Wo // 8) * 8
+
+    writers = []
+    def tap(bands, png_path, width, height, dat=None):
+        png = PngRowWriter(png_path, width, height, args.png_level)
+        writers.append(png)
+        if dat:
+            writers.append(dat)
+        for band in bands:
+            png.write(clipped_int8_to_u8(band))
+            if dat:
+                dat.write(band.view(np.uint8))
+            yield band
+
+    bands = iter_image_rows(args.input, args.offset, H, W, max(1, args.band_rows))
+    if args.emit:
+        p_png, p_dat = step_paths(args.output, args.out_mem, "input")
+        dat = HexdumpAppender(p_dat, 0x00, comment="image (input)") if p_dat else None
+        bands = tap(bands, p_png, W, H, dat)
+    bands = iter_conv_bands(bands, ker_i8)
+    if args.emit:
+        bands = tap(bands, step_paths(args.output, None, "conv")[0], Wc, Hc)
+    if pooled:
+        bands = (apply_activation(b, args.act, args.alpha) for b in bands)
+        if args.emit:
+            bands = tap(bands, step_paths(args.output, None, "act")[0], Wc, Hc)
+        bands = iter_pool_bands(bands, pad, Wc)
+
+    final_png = PngRowWriter(args.output, Wo8, Ho, args.png_level)
+    final_dat = HexdumpAppender(args.out_mem) if args.out_mem else None
+    try:
+        for band in bands:
+            band = pad_cols_to_multiple_of_8(band)
+            final_png.write(clipped_int8_to_u8(band))
+            if final_dat:
+                final_dat.write(np.clip(band, -128, 127).astype(np.int8).view(np.uint8))
+    finally:
+        for w in writers + [final_png] + ([final_dat] if final_dat else []):
+            w.close()
+
+# =========================
+# Multi-frame DRAM images
+# =========================
+# img2svmem.py --frames packs a sequence into one image:
+#   0x00   header      "SVMF", version, frame count, alignment, table offset
+#   0x10   frame table one 16-byte entry per frame: kernel offset, image
+#                      offset, width, height
+#   base   per frame   the single-frame layout relocated to an aligned base:
+#                      16 kernel bytes at base, image at base + 0x10
+FRAME_MAGIC = b"SVMF"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("<4sHHII")     # magic, version, n_frames, align, table_off
+FRAME_ENTRY = struct.Struct("<IIHHI")       # kernel_off, image_off, width, height, reserved
+
+def frame_layout(sizes, align: int = 64):
+    """
+    (header + table bytes, [(kernel_off, image_off, W, H)]) for frames of
+    the given (W, H); each frame base is a multiple of align.
+    """
+    if align <= 0 or align % 8:
+        raise ValueError("frame alignment must be a positive multiple of 8 bytes")
+    table_off = FRAME_HEADER.size
+    pos = table_off + FRAME_ENTRY.size * len(sizes)
+    entries = []
+    for W, H in sizes:
+        base = -(-pos // align) * align
+        entries.append((base, base + 16, W, H))
+        pos = base + 16 + W * H
+    head = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, len(sizes), align, table_off)
+    head += b"".join(FRAME_ENTRY.pack(k, i, W, H, 0) for k, i, W, H in entries)
+    return head, entries
+
+def read_frame_table(reader: HexdumpReader):
+    """[(kernel_off, image_off, W, H)] from the header of a multi-frame image."""
+    magic, version, n, align, table_off = FRAME_HEADER.unpack(reader.read(0, FRAME_HEADER.size).tobytes())
+    if magic != FRAME_MAGIC:
+        raise ValueError("{}: not a multi-frame image (no {} header)".format(reader.path, FRAME_MAGIC.decode()))
+    if version != FRAME_VERSION:
+        raise ValueError("{}: frame table version {} (expected {})".format(reader.path, version, FRAME_VERSION))
+    raw = reader.read(table_off, FRAME_ENTRY.size * n).tobytes()
+    entries = [FRAME_ENTRY.unpack_from(raw, FRAME_ENTRY.size * i)[:4] for i in range(n)]
+    if any(b[0] < a[1] + a[2] * a[3] for a, b in zip(entries, entries[1:])):
+        raise ValueError("{}: frame table is not in ascending address order".format(reader.path))
+    return entries
+
+def frame_tag(i: int) -> str:
+    return "frame{:04d}".format(i)
+
+def run_frames(args):
+    """--frames: one golden per frame of a multi-frame image, one frame in memory at a time."""
+    if args.presets or args.emit or args.stream:
+        raise ValueError("--frames does not combine with --presets, --emit or --stream")
+    reader = HexdumpReader(args.input)
+    entries = read_frame_table(reader)
+    prof = getattr(args, "prof", None)
+    for i, (k_off, i_off, W, H) in enumerate(entries):
+        with profile_stage(args, "load"):
+            ker_i8 = reader.read(k_off, 16).view(np.int8).reshape(4, 4)
+            img_i8 = reader.read(i_off, W * H).view(np.int8).reshape(H, W)
+        if prof:
+            prof.pixels += W * H
+        out_png, out_mem = step_paths(args.output, args.out_mem, frame_tag(i))
+        if args.no_fuse:
+            with profile_stage(args, "conv"):
+                conv_arr = conv4x4_valid_i8_i8(img_i8, ker_i8).astype(np.int32)
+            finish_map(conv_arr, args, out_png, out_mem)
+        else:
+            with profile_stage(args, "fused"):
+                final = fused_conv_act_pool(img_i8, ker_i8, args.act, args.padding,
+                                        threads=resolve_threads(args.threads))
+            write_final(final, out_png, out_mem, args)
+        print("frame {:4d}     : {}x{} @0x{:x} -> {}".format(i, W, H, i_off, out_mem or out_png))
+    print("=== {} frames from {} ===".format(len(entries), args.input))
+
+# =========================
+# Out-of-core mode
+# =========================
+# For frames far past the DUT's 1024x1024: the parsed DRAM image is an SVMB
+# file mapped read-only (text inputs are converted a chunk at a time into a
+# scratch directory next to the output), the final map is an int8 .npy
+# memmap in the same directory, and the fused kernel walks full-width row
+# tiles (3-row halo) sized by --tile-mb. Pages of both maps are dropped
+# behind each tile, so RSS follows the tile budget instead of the frame size.
+# The scratch directory is removed when the run ends; only -o / --out-mem stay.
+
+def _release(mm: np.memmap, lo: int, hi: int):
+    """Flush and drop the resident pages of bytes [lo, hi) of a memmap (best effort)."""
+    m = getattr(mm, "_mmap", None)
+    if m is None or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    delta = mm.offset % mmap.ALLOCATIONGRANULARITY
+    lo = -(-(lo + delta) // mmap.PAGESIZE) * mmap.PAGESIZE
+    hi = (hi + delta) // mmap.PAGESIZE * mmap.PAGESIZE
+    if hi > lo:
+        if mm.mode != "r":
+            m.flush(lo, hi - lo)
+        m.madvise(mmap.MADV_DONTNEED, lo, hi - lo)
+
+OOC_ZERO_BLOCK = 1 << 20       # bytes of zeros written per call across an address gap
+OOC_DENSE_GAP = 64             # gaps up to this many bytes are filled inside a chunk's span
+
+def ooc_dram_image(path: str, scratch_dir: str) -> np.memmap:
+    """
+    Read-only memmap of a DRAM image from address 0: an SVMB file as is, a
+    hexdump via an SVMB copy (image.bin) in the run's scratch_dir, which the
+    caller cleans up. Conversion holds one parse chunk at a time; address gaps
+    read as zeros and are written in OOC_ZERO_BLOCK pieces.
+    """
+    if is_svmb(path):
+        _, segs = read_svmb_header(path)
+        if len(segs) != 1 or segs[0][0] != 0:
+            raise ValueError("{}: out-of-core needs a single SVMB segment at address 0".format(path))
+        return load_svmb_u8(path)
+    dst = os.path.join(scratch_dir, "image.bin")
+    zeros = np.zeros(OOC_ZERO_BLOCK, dtype=np.uint8)
+    app = HexdumpAppender(dst, 0)
+    try:
+        pos = 0
+        for addr, words in iter_hexdump_words(path):
+            a = addr.astype(np.int64)
+            if a[0] < pos or np.any(np.diff(a) <= 0):
+                raise ValueError("--out-of-core needs ascending addresses: {}".format(path))
+            # Dense spans between the wide gaps; the gaps themselves in bounded zero blocks
+            cuts = np.concatenate(([0], np.flatnonzero(np.diff(a) > 8 + OOC_DENSE_GAP) + 1, [a.size]))
+            for lo, hi in zip(cuts[:-1], cuts[1:]):
+                base = int(a[lo])
+                while pos < base:
+                    n = min(base - pos, zeros.size)
+                    app.write(zeros[:n])
+                    pos += n
+                span = np.zeros(int(a[hi - 1]) + 8 - base, dtype=np.uint8)
+                span.reshape(-1, 8)[(a[lo:hi] - base) // 8] = words[lo:hi]
+                app.write(span)
+                pos = int(a[hi - 1]) + 8
+    finally:
+        app.close()
+    return load_svmb_u8(dst)
+
+def tile_rows(W: int, ker_i8: np.ndarray, act: str, budget_bytes: int) -> int:
+    """Conv rows per tile so the fused kernel's buffers fit in budget_bytes."""
+    item = np.dtype(fused_acc_dtype(ker_i8, act)).itemsize
+    per_row = W * (8 * item + 2)        # src/acc/tmp/tmp2/pool + engine scratch, input + output pages
+    return max(2, budget_bytes // per_row // 2 * 2)
+
+def run_out_of_core(args):
+    """--out-of-core: fused pipeline from a mapped DRAM image into a mapped final map."""
+    if args.presets or args.emit or args.stream:
+        raise ValueError("--out-of-core does not combine with --presets, --emit or --stream")
+    # The SVMB copy and the map live (and die) in a scratch directory beside the
+    # output; _ooc_tiles returns before it is removed, dropping its memmaps.
+    with tempfile.TemporaryDirectory(prefix=".ooc.", dir=os.path.dirname(os.path.abspath(args.output))) as tmp:
+        rows = _ooc_tiles(args, tmp)
+    print("out-of-core    : {} conv rows per tile ({} MB budget)".format(rows, args.tile_mb))
+
+def _ooc_tiles(args, tmp: str) -> int:
+    """run_out_of_core's work with scratch files in tmp; returns the conv rows per tile."""
+    H, W = args.dims
+    buf = ooc_dram_image(args.input, tmp)
+    ker_i8 = np.array(read_kernel_i8(buf, args.kernel))
+    img_i8 = read_image_i8(buf, args.offset, H, W)
+
+    pad = max(0, int(args.padding)) if args.act != "none" else 0
+    Ho, Wo = final_shape(H, W, args.act, pad)
+    Wo8 = -(-Wo // 8) * 8
+    out = np.lib.format.open_memmap(os.path.join(tmp, "map.npy"), mode="w+", dtype=np.int8, shape=(Ho, Wo8))
+
+    rows = tile_rows(W, ker_i8, args.act, args.tile_mb << 20)
+    png = PngRowWriter(args.output, Wo8, Ho, args.png_level)
+    dat = HexdumpAppender(args.out_mem) if args.out_mem else None
+    done_in = 0
+
+    def band_done(lo, hi):
+        nonlocal done_in
+        band = out[lo:hi]
+        png.write(clipped_int8_to_u8(band))
+        if dat:
+            dat.write(band.view(np.uint8))
+        _release(out, lo * Wo8, hi * Wo8)
+        nxt = args.offset + min(H, hi * (2 if args.act != "none" else 1)) * W
+        _release(buf, done_in, nxt)
+        done_in = max(done_in, nxt)
+
+    try:
+        fused_conv_act_pool(img_i8, ker_i8, args.act, args.padding, band_rows=rows,
+                            out=out, band_done=band_done)
+    finally:
+        png.close()
+        if dat:
+            dat.close()
+    return rows
+
+# =========================
+# Profiling (--profile)
+# =========================
+
+class StageProfiler:
+    """
+    Wall time, CPU time, tracemalloc peak (bytes allocated above the stage's
+    starting level) and input MPix/s per pipeline stage. A stage entered
+    more than once (presets, frames) accumulates. Stages must not nest.
+    """
+
+    def __init__(self, pixels: int):
+        self.pixels = pixels
+        self.stages = {}
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start()
+        self.t0, self.c0 = time.perf_counter(), time.process_time()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            w, c = time.perf_counter() - w0, time.process_time() - c0
+            peak = tracemalloc.get_traced_memory()[1] - base
+            st = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": 0})
+            st["calls"] += 1
+            st["wall_s"] += w
+            st["cpu_s"] += c
+            st["peak_bytes"] = max(st["peak_bytes"], peak)
+
+    def record(self, args) -> dict:
+        """One JSON-able record for this run."""
+        if self.started:
+            tracemalloc.stop()
+        wall, cpu = time.perf_counter() - self.t0, time.process_time() - self.c0
+        mpix = self.pixels / 1e6
+        stages = {k: dict(v, mpix_s=mpix / v["wall_s"] if v["wall_s"] else None) for k, v in self.stages.items()}
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "input": args.input, "output": args.output,
+            "dims": list(args.dims) if args.dims else None, "pixels": self.pixels,
+            "config": {"act": args.act, "pool": args.pool, "padding": args.padding,
+                       "mode": pipeline_mode(args), "presets": args.presets},
+            "stages": stages,
+            "total": {"wall_s": wall, "cpu_s": cpu, "mpix_s": mpix / wall if wall else None},
+        }
+
+class _NoProfile:
+    def stage(self, name: str):
+        return contextlib.nullcontext()
+
+NO_PROFILE = _NoProfile()
+
+def pipeline_mode(args) -> str:
+    for flag in ("frames", "out_of_core", "stream", "presets", "emit", "no_fuse"):
+        if getattr(args, flag):
+            return flag
+    return "fused"
+
+def profile_stage(args, name: str):
+    """Context manager timing `name` when --profile is on."""
+    return (getattr(args, "prof", None) or NO_PROFILE).stage(name)
+
+def best_time(fn, repeat: int) -> float:
+    """Best wall seconds of `repeat` calls of fn() (the bench_*.py scripts)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def print_profile(rec: dict):
+    print("=== profile ({}) ===".format(rec["config"]["mode"]))
+    print("stage          calls    wall ms     cpu ms    peak MiB    MPix/s")
+    rows = list(rec["stages"].items()) + [("total", rec["total"])]
+    for name, st in rows:
+        peak = "{:10.1f}".format(st["peak_bytes"] / 2**20) if "peak_bytes" in st else " " * 10
+        rate = "{:9.1f}".format(st["mpix_s"]) if st.get("mpix_s") else " " * 9
+        print("{:<14s} {:>5} {:10.1f} {:10.1f}  {}  {}".format(
+            name, st.get("calls", ""), st["wall_s"] * 1e3, st["cpu_s"] * 1e3, peak, rate))
+
+def append_profile(path: str, rec: dict):
+    """Append one JSON line; an exclusive lock keeps lines from parallel jobs whole."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        try:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        except (ImportError, OSError):
+            pass
+        f.write(json.dumps(rec) + "\n")
 
 # =========================
 # Main
 # =========================
-def main():
+def build_arg_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(
         description="Run input→conv→act→(zero-pad)→pool on int8 image from @ADDR HEX hexdump. -o is final PNG (clamped). --emit outputs stage PNGs. DATs: input passthrough & final only. All DAT addresses start at 0x00."
     )
@@ -391,93 +2149,274 @@ def main():
     ap.add_argument("--out-mem", help="if set, writes final pool DAT here (hexdump). With --emit, also writes *.input.dat passthrough.")
     ap.add_argument("--emit", action="store_true",
                     help="also emit per-stage PNGs: *.input.png, *.conv.png, *.act.png, *.pool.png (DATs: only *.input.dat and final *.pool.dat)")
-    ap.add_argument("--dims", required=True, type=parse_dims, help='image dims "WIDTHxHEIGHT"')
-    ap.add_argument("--offset", type=parse_hex_or_int, default="0x10", help="image start offset (default 0x10)")
+    ap.add_argument("--dims", type=parse_dims, default=None,
+                    help='image dims "WIDTHxHEIGHT" (required unless --frames)')
+    ap.add_argument("--offset", type=parse_hex_or_int, default=None,
+                    help="image start offset (default 0x10, or right after an extended KxK kernel header)")
     ap.add_argument("--kernel", type=parse_hex_or_int, default="0x00", help="kernel start offset (default 0x00)")
     ap.add_argument("--act", default="none", help="activation: none|relu|lrelu")
     ap.add_argument("--alpha", type=float, default=0.01, help="lrelu slope")
     ap.add_argument("--pool", default="none", help="pooling: none|avg|max (2x2 stride 2)")
     ap.add_argument("--padding", type=int, default=0, help="zero padding applied to activation output before pooling")
-    args = ap.parse_args()
-
-    H, W = args.dims
-    img_bytes = H * W
-
-    # Load buffer (64-bit BE text → LE bytes in memory)
-    buf_u8 = load_hexdump_u8_little(args.input)
-
-    # Byte window for the image
-    start = args.offset
-    end = start + img_bytes
-    if end > buf_u8.size:
-        raise ValueError("image extends past EOF (need {} bytes at 0x{:x})".format(img_bytes, start))
-
-    # ===== Step 0: INPUT (passthrough PNG; DAT optional) =====
-    img_i8 = buf_u8[start:end].view(np.int8).reshape(H, W)
-    if args.emit:
-        p_png, p_dat = step_paths(args.output, args.out_mem, "input")
-        write_png_clipped_int8(p_png, img_i8)
-        if p_dat:
-            # Start output addresses at 0x00
-            write_hexdump_from_little(p_dat, 0x00, bytes(buf_u8[start:end]),
-                                      bytes_per_line=8, comment="image (input)")
-
-    # ===== Step 1: CONV =====
-    ker_i8 = read_kernel_i8(buf_u8, args.kernel)
-    final_i8 = conv_arr = conv4x4_valid_i8_i8(img_i8, ker_i8).astype(np.int32)  # safe accum
+    ap.add_argument("--stride", type=int, default=None, help="conv stride (default: kernel header, else 1)")
+    ap.add_argument("--dilation", type=int, default=None, help="conv dilation (default: kernel header, else 1)")
+    ap.add_argument("--conv-pad", type=int, default=None,
+                    help="zero padding on every side of the conv input (default: kernel header, else 0)")
+    ap.add_argument("--conv-algo", choices=CONV_ALGOS, default="auto",
+                    help="general KxK conv algorithm (default auto: engine4 for plain 4x4, else by cost model)")
+    ap.add_argument("--cache-dir", default=None,
+                    help="parsed-input cache directory (default: .hexcache next to the input)")
+    ap.add_argument("--cache-max-mb", type=int, default=512, help="cache size bound, LRU eviction (default 512)")
+    ap.add_argument("--no-cache", action="store_true", help="always parse the input text")
+    ap.add_argument("--stream", action="store_true",
+                    help="row-band streaming mode: O(W) memory, output rows appended as they finish")
+    ap.add_argument("--band-rows", type=int, default=64, help="rows per band in --stream mode (default 64)")
+    ap.add_argument("--no-fuse", action="store_true",
+                    help="run conv/act/pad/pool as separate full-frame stages instead of the fused band kernel")
+    ap.add_argument("--presets", default=None,
+                    help="comma list of img2svmem kernel presets ({}) to run in one "
+                         "batched pass instead of the DRAM kernel; outputs are tagged *.<preset>.png/.dat".format(",".join(KERNEL_PRESETS)))
+    ap.add_argument("--threads", type=int, default=1,
+                    help="fused kernel: split the frame into this many row spans run on a thread pool, "
+                         "bit-exact with 1 (default 1, 0 = one per core)")
+    ap.add_argument("--out-of-core", action="store_true",
+                    help="memory-map the parsed image and the final map (scratch files beside -o, removed "
+                         "afterwards) and run the fused kernel in row tiles; for frames far larger than RAM")
+    ap.add_argument("--tile-mb", type=int, default=64, help="--out-of-core working-set budget (default 64)")
+    ap.add_argument("--frames", action="store_true",
+                    help="input is an img2svmem.py --frames image: write one golden per frame, "
+                         "tagged *.frameNNNN.png/.dat (dims, offsets and kernels come from its frame table)")
+    ap.add_argument("--emit-format", choices=EMIT_FORMATS, default="png",
+                    help="--emit stage images as png (default), or the clipped int8 map as .npy or .raw "
+                         "(uncompressed, for scripts); the final -o is always PNG")
+    ap.add_argument("--png-level", type=int, choices=range(10), default=6, metavar="0-9",
+                    help="zlib level for every PNG written (default 6; 1 is much faster, slightly larger)")
+    ap.add_argument("--writers", type=int, default=2,
+                    help="background threads encoding stage/final images while compute goes on "
+                         "(default 2, 0 = write inline)")
+    ap.add_argument("--profile", nargs="?", const="", default=None, metavar="JSONL",
+                    help="print wall/CPU time, tracemalloc peak and MPix/s per stage; with a path, also "
+                         "append the run as one JSON line there (batch runs accumulate in one file)")
+    return ap
+
+
+def finish_map(conv_arr: np.ndarray, args, output: str, out_mem: str or None):
+    """act→(zero-pad)→pool on one conv map, then write its PNG (and DAT)."""
+    final_i8 = conv_arr
     if args.emit:
-        c_png, _ = step_paths(args.output, None, "conv")
-        write_png_clipped_int8(c_png,conv_arr)
+        c_png, _ = step_paths(output, None, "conv")
+        with profile_stage(args, "emit"):
+            stage_image(args, c_png, conv_arr)
         #save_png_u8(c_png, clamp_final_to_int8(conv_arr).view(np.uint8))
 
     if args.act != 'none':
         #print("Con")
         #print(conv_arr)
         # ===== Step 2: ACT =====
-        act_arr = apply_activation(conv_arr, args.act, args.alpha)
+        with profile_stage(args, "act"):
+            act_arr = apply_activation(conv_arr, args.act, args.alpha)
         #print("Act")
         #print(act_arr)
         if args.emit:
-            a_png, _ = step_paths(args.output, None, "act")
-            write_png_clipped_int8(a_png,act_arr)
+            a_png, _ = step_paths(output, None, "act")
+            with profile_stage(args, "emit"):
+                stage_image(args, a_png, act_arr)
             #save_png_u8(a_png, viz_to_u8(act_arr))
 
         # ===== Step 2.5: ZERO PADDING (before pooling) =====
         pad = max(0, int(args.padding))
-        act_arr_padded = act_arr if pad == 0 else zero_pad(act_arr, pad)
+        with profile_stage(args, "pool"):
+            act_arr_padded = act_arr if pad == 0 else zero_pad(act_arr, pad)
 
-        # ===== Step 3: POOL (avg uses TTZ) =====
-        #final_i8 = pool_2x2_stride2(act_arr_padded, args.pool)
-        final_i8 = avg_pool_4x4_stride4_valid_i32(act_arr_padded)
+            # ===== Step 3: POOL (avg uses TTZ) =====
+            #final_i8 = pool_2x2_stride2(act_arr_padded, args.pool)
+            final_i8 = avg_pool_4x4_stride4_valid_i32(act_arr_padded)
         #print("Out")
         #print(final_i8)
         
 
     # Always write final -o PNG (equals *.pool.png)
-    #save_png_u8(args.output, final_i8.view(np.uint8))
-    final_i8 = pad_cols_to_multiple_of_8(final_i8)
-    write_png_clipped_int8(args.output,final_i8)
+    #save_png_u8(output, final_i8.view(np.uint8))
+    write_final(pad_cols_to_multiple_of_8(final_i8), output, out_mem, args)
+
+
+def write_final(final_i8: np.ndarray, output: str, out_mem: str or None, args=None):
+    """Final PNG (clamped) and, with out_mem, the final DAT (addresses start at 0x00)."""
+    with profile_stage(args, "png"):
+        stage_image(args, output, final_i8, "png")
 
     # Also write *.pool.png and final DAT (addresses start at 0x00) when --emit
         # If no --emit but --out-mem was provided, write a single final DAT here (addresses start at 0x00)
-    if args.out_mem:
-
-        out_i8 = np.clip(final_i8, -128, 127).astype(np.int8)
-        write_mem_addr8_from_i8(out_i8, args.out_mem, endian="little")
-        #write_hexdump_from_little(args.out_mem, 0x00, final_i8.tobytes(order="C"),
+    if out_mem:
+        with profile_stage(args, "dat"):
+            out_i8 = np.clip(final_i8, -128, 127).astype(np.int8)
+            write_mem_addr8_from_i8(out_i8, out_mem, endian="little")
+        #write_hexdump_from_little(out_mem, 0x00, final_i8.tobytes(order="C"),
         #                          bytes_per_line=8, comment="image (final, int8 clamped)")
 
+
+def run(args):
+    """Run one input→conv→act→pool job for parsed CLI args (see build_arg_parser)."""
+    if getattr(args, "profile", None) is None:
+        run_writing(args)
+        return
+    args.prof = StageProfiler(args.dims[0] * args.dims[1] if args.dims else 0)
+    try:
+        run_writing(args)
+    finally:
+        rec = args.prof.record(args)
+        args.prof = None
+    print_profile(rec)
+    if args.profile:
+        append_profile(args.profile, rec)
+        print("profile        :", args.profile, "(appended)")
+
+def run_writing(args):
+    """run_pipeline with a StageWriter, joined before returning."""
+    if args.stream and args.emit_format != "png":
+        raise ValueError("--stream writes its stage images as PNG rows; drop --emit-format")
+    args.writer = StageWriter(args.writers, args.png_level, args.emit_format)
+    try:
+        run_pipeline(args)
+        with profile_stage(args, "join"):
+            args.writer.close()
+    finally:
+        args.writer.close(check=False)
+        args.writer = None
+
+def run_pipeline(args):
+    geom_flags = (args.stride, args.dilation, args.conv_pad)
+    if (args.frames or args.stream or args.out_of_core or args.presets) and \
+            (geom_flags != (None,) * 3 or args.conv_algo != "auto"):
+        raise ValueError("--stride/--dilation/--conv-pad/--conv-algo need the in-memory, single-kernel pipeline")
+    if args.frames:
+        run_frames(args)
+        return
+    if args.dims is None:
+        raise ValueError("--dims is required (unless --frames)")
+    H, W = args.dims
+    img_bytes = H * W
+    if args.offset is None and (args.stream or args.out_of_core):
+        args.offset = LEGACY_IMAGE_OFFSET
+
+    if args.out_of_core:
+        with profile_stage(args, "out_of_core"):
+            run_out_of_core(args)
+        print_summary(args)
+        return
+
+    if args.stream:
+        with profile_stage(args, "stream"):
+            run_stream(args)
+        print_summary(args)
+        return
+
+    # Load buffer (64-bit BE text → LE bytes in memory)
+    cache = getattr(args, "cache", None)        # golden_server.py passes its in-memory cache
+    if cache is None and not args.no_cache:
+        cache = HexdumpCache(args.cache_dir, args.cache_max_mb << 20)
+    with profile_stage(args, "load"):
+        buf_u8 = load_hexdump_u8_little(args.input, cache=cache)
+
+    # Kernel (legacy 4x4 or extended KxK header) and the byte window for the image
+    hdr = None if args.presets else read_kernel_header(buf_u8, args.kernel)
+    if args.offset is None:
+        args.offset = hdr[2] if hdr else LEGACY_IMAGE_OFFSET
+    start = args.offset
+    end = start + img_bytes
+    if end > buf_u8.size:
+        raise ValueError("image extends past EOF (need {} bytes at 0x{:x})".format(img_bytes, start))
+
+    # ===== Step 0: INPUT (passthrough PNG; DAT optional) =====
+    img_i8 = buf_u8[start:end].view(np.int8).reshape(H, W)
+    if args.emit:
+        p_png, p_dat = step_paths(args.output, args.out_mem, "input")
+        with profile_stage(args, "emit"):
+            stage_image(args, p_png, img_i8)
+            if p_dat:
+                # Start output addresses at 0x00
+                write_hexdump_from_little(p_dat, 0x00, bytes(buf_u8[start:end]),
+                                          bytes_per_line=8, comment="image (input)")
+
+    # ===== Step 1: CONV =====
+    if args.presets:
+        # Whole preset bank in one pass; each map gets its own *.<preset> outputs
+        names = [p.strip() for p in args.presets.split(",") if p.strip()]
+        bank = np.stack([preset_kernel_i8(p) for p in names])
+        with profile_stage(args, "conv"):
+            maps = conv4x4_valid_nchw(img_i8[None, None], bank[:, None])[0]
+        for name, conv_arr in zip(names, maps):
+            out_png, out_mem = step_paths(args.output, args.out_mem, name)
+            finish_map(conv_arr, args, out_png, out_mem)
+    elif hdr[0].shape != (4, 4) or geometry(args, hdr) != (1, 1, 0) or args.conv_algo != "auto":
+        # general KxK conv (stride / dilation / padding), then the usual act→pad→pool
+        ker_i8 = hdr[0]
+        stride, dilation, pad = geometry(args, hdr)
+        H2, W2 = H + 2 * pad, W + 2 * pad
+        shape = (conv_out_size(H, ker_i8.shape[0], stride, dilation, pad),
+                 conv_out_size(W, ker_i8.shape[0], stride, dilation, pad))
+        algo = args.conv_algo if args.conv_algo != "auto" else conv_algo(ker_i8, shape, (H2, W2), stride, dilation)
+        args.conv_desc = "{0}x{0}, stride {1}, dilation {2}, conv pad {3}, {4}".format(
+            ker_i8.shape[0], stride, dilation, pad, algo)
+        with profile_stage(args, "conv"):
+            conv_arr = conv2d_i8(img_i8, ker_i8, stride, dilation, pad, algo)
+        finish_map(conv_arr, args, args.output, args.out_mem)
+    elif not (args.emit or args.no_fuse):
+        # conv→act→pad→pool fused into preallocated band buffers (no stage temporaries)
+        ker_i8 = hdr[0]
+        with profile_stage(args, "fused"):
+            final = fused_conv_act_pool(img_i8, ker_i8, args.act, args.padding,
+                                        threads=resolve_threads(args.threads))
+        write_final(final, args.output, args.out_mem, args)
+    else:
+        ker_i8 = hdr[0]
+        with profile_stage(args, "conv"):
+            conv_arr = conv4x4_valid_i8_i8(img_i8, ker_i8).astype(np.int32)  # safe accum
+        finish_map(conv_arr, args, args.output, args.out_mem)
+
     # Console summary
+    print_summary(args)
+
+def geometry(args, hdr) -> tuple:
+    """(stride, dilation, conv padding): the CLI flags where given, else the kernel header's."""
+    return tuple(h if v is None else v for v, h in zip((args.stride, args.dilation, args.conv_pad), hdr[1]))
+
+def output_paths(args) -> list:
+    """Files a run with these args writes (frames and out-of-core maps excluded)."""
+    outs = [args.output] + ([args.out_mem] if args.out_mem else [])
+    pngs = [args.output]
+    if args.presets:
+        names = [p.strip() for p in args.presets.split(",") if p.strip()]
+        outs = [p for n in names for p in step_paths(args.output, args.out_mem, n) if p]
+        pngs = [step_paths(args.output, None, n)[0] for n in names]
+    if args.emit:
+        # .input is shared; each map (per preset) has its own .conv / .act
+        outs.append(emit_path(step_paths(args.output, None, "input")[0], args.emit_format))
+        if args.out_mem:
+            outs.append(step_paths(args.output, args.out_mem, "input")[1])
+        for png in pngs:
+            for tag in ("conv",) + (("act",) if args.act != "none" else ()):
+                outs.append(emit_path(step_paths(png, None, tag)[0], args.emit_format))
+    return outs
+
+def print_summary(args):
+    H, W = args.dims
     print("=== pipeline summary ===")
     print("input          :", args.input)
     print("dims (HxW)     : {}x{}".format(H, W))
     print("image @        : 0x{:x}".format(args.offset))
-    print("kernel @       : 0x{:x}".format(args.kernel))
+    if args.presets:
+        print("kernels        : presets", args.presets)
+    else:
+        print("kernel @       : 0x{:x}".format(args.kernel))
+    if getattr(args, "conv_desc", None):
+        print("conv           :", args.conv_desc)
     print("act            :", args.act)
     print("pool           :", args.pool)
-    print("final PNG      :", args.output)
+    print("final PNG      :", step_paths(args.output, None, "<preset>")[0] if args.presets else args.output)
     if args.emit:
-        print("stage PNGs     : emitted (.input/.conv/.act/.pool)")
+        print("stage PNGs     : emitted (.input/.conv/.act/.pool{})".format(
+            "" if args.emit_format == "png" else ", stages as ." + args.emit_format))
         if args.out_mem:
             print("DATs           : input.dat (0x00-based) and pool.dat (0x00-based)")
     else:
@@ -485,6 +2424,9 @@ def main():
         if args.out_mem:
             print("final DAT      :", args.out_mem, "(0x00-based)")
 
+def main(argv=None):
+    run(build_arg_parser().parse_args(argv))
+
 if __name__ == "__main__":
     main()
 
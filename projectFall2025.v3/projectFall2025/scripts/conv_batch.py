@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+conv_batch.py — Run many conv.py jobs in one launch on a process pool.
+
+Jobs come from a manifest (one conv.py command line per line, '#' comments
+allowed) and/or from input globs crossed with a config matrix. Each job runs
+conv.py's pipeline in a worker process that already has NumPy/PIL imported,
+so the per-job cost is the work itself rather than an interpreter start.
+
+Config matrix (--config, repeatable):
+  464  -> conv only
+  564  -> conv + lrelu + avg pool, padding 1
+  NAME="conv.py flags"  -> custom config
+
+Output naming for glob jobs follows gen_outputs.sh:
+  <outdir>/<stem>.<config>.png and .dat, where a leading 'input' in the stem
+  becomes 'output' (input3.dat -> output3.564.dat, debug0.dat -> debug0.564.dat)
+
+Examples
+  # Regenerate every golden listed in the manifest
+  python3 conv_batch.py goldens.manifest
+
+  # All full-size inputs, both variants
+  python3 conv_batch.py --inputs "../inputs/input*.dat" --dims 1024x1024 \
+      --config 464 --config 564 --outdir ../outputs
+
+  # Same, with per-stage timings appended to one JSONL file and summed
+  python3 conv_batch.py --inputs "../inputs/input*.dat" --profile prof.jsonl
+
+Exit status is 1 if any job fails.
+"""
+
+import os, sys, glob, json, shlex, argparse, io, time, traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout, redirect_stderr
+from typing import List, Tuple
+
+import conv
+
+CONFIGS = {
+    "464": [],
+    "564": ["--act", "lrelu", "--pool", "avg", "--padding", "1"],
+}
+
+# ----------------------------
+# Job construction
+# ----------------------------
+
+def read_manifest(path: str) -> List[List[str]]:
+    """One conv.py command line per line; a leading 'conv.py' word is dropped."""
+    jobs = []
+    with open(path, "r") as f:
+        for raw in f:
+            argv = shlex.split(raw, comments=True)
+            if not argv:
+                continue
+            while argv and (argv[0].startswith("python") or os.path.basename(argv[0]) == "conv.py"):
+                argv = argv[1:]
+            jobs.append(argv)
+    return jobs
+
+def parse_config(s: str) -> Tuple[str, List[str]]:
+    if "=" in s:
+        name, flags = s.split("=", 1)
+        return name.strip(), shlex.split(flags)
+    if s not in CONFIGS:
+        raise argparse.ArgumentTypeError(f"unknown config '{s}' (use {', '.join(CONFIGS)} or NAME=\"flags\")")
+    return s, CONFIGS[s]
+
+def output_stem(input_path: str) -> str:
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return "output" + stem[len("input"):] if stem.startswith("input") else stem
+
+def matrix_jobs(patterns: List[str], configs, dims: str, outdir: str, extra: List[str]) -> List[List[str]]:
+    paths = []
+    for p in patterns:
+        m = sorted(glob.glob(p))
+        paths.extend(m if m else [p])
+    os.makedirs(outdir, exist_ok=True)
+    jobs = []
+    for path in paths:
+        for name, flags in configs:
+            base = os.path.join(outdir, f"{output_stem(path)}.{name}")
+            jobs.append([path, "-o", base + ".png", "--out-mem", base + ".dat",
+                         "--dims", dims] + flags + extra)
+    return jobs
+
+# ----------------------------
+# Worker
+# ----------------------------
+
+def run_job(argv: List[str], main=conv.main):
+    """Run one conv.py job (or another script's main); returns (ok, seconds, captured output)."""
+    out = io.StringIO()
+    t0 = time.perf_counter()
+    ok = True
+    with redirect_stdout(out), redirect_stderr(out):
+        try:
+            main(argv)
+        except SystemExit as e:             # argparse usage errors
+            ok = e.code in (None, 0)
+        except Exception:
+            traceback.print_exc(file=out)
+            ok = False
+    return ok, time.perf_counter() - t0, out.getvalue()
+
+# ----------------------------
+# Profile summary
+# ----------------------------
+
+def profile_summary(path: str, start: int = 0):
+    """Sum the conv.py --profile records appended to path after byte offset start, per mode and dims."""
+    groups = {}
+    with open(path, "r") as f:
+        f.seek(start)
+        for line in f:
+            rec = json.loads(line)
+            key = (rec["config"]["mode"], "x".join(map(str, rec["dims"] or ["frames"])))
+            g = groups.setdefault(key, {"runs": 0, "pixels": 0, "stages": {}})
+            g["runs"] += 1
+            g["pixels"] += rec["pixels"]
+            for name, st in list(rec["stages"].items()) + [("total", rec["total"])]:
+                acc = g["stages"].setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": 0})
+                acc["wall_s"] += st["wall_s"]
+                acc["cpu_s"] += st["cpu_s"]
+                acc["peak_bytes"] = max(acc["peak_bytes"], st.get("peak_bytes", 0))
+    for (mode, dims), g in sorted(groups.items()):
+        print(f"=== profile: {mode} {dims}, {g['runs']} runs ===")
+        print("stage             wall s      cpu s    peak MiB    MPix/s")
+        for name, st in g["stages"].items():
+            rate = g["pixels"] / 1e6 / st["wall_s"] if st["wall_s"] else 0.0
+            peak = f"{st['peak_bytes'] / 2**20:10.1f}" if name != "total" else " " * 10
+            print(f"{name:<14s} {st['wall_s']:9.3f} {st['cpu_s']:10.3f}  {peak} {rate:9.1f}")
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Run many conv.py jobs on a process pool.")
+    ap.add_argument("manifest", nargs="*", help="manifest file(s): one conv.py command line per line")
+    ap.add_argument("--inputs", nargs="+", default=[], help="input .dat paths or globs for the config matrix")
+    ap.add_argument("--config", action="append", type=parse_config, default=[],
+                    help='config for --inputs: 464, 564 or NAME="conv.py flags" (repeatable)')
+    ap.add_argument("--dims", default="1024x1024", help='image dims for --inputs jobs (default 1024x1024)')
+    ap.add_argument("--outdir", default="../outputs", help="output directory for --inputs jobs")
+    ap.add_argument("--extra", default="", help='flags appended to every --inputs job, e.g. "--emit"')
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                    help="worker processes (default: core count)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="print each job's conv.py output")
+    ap.add_argument("--profile", default=None, metavar="JSONL",
+                    help="pass --profile JSONL to every job and print per-stage totals at the end")
+    args = ap.parse_args()
+
+    jobs = []
+    for m in args.manifest:
+        jobs.extend(read_manifest(m))
+    if args.inputs:
+        configs = args.config or [parse_config("464"), parse_config("564")]
+        jobs.extend(matrix_jobs(args.inputs, configs, args.dims, args.outdir, shlex.split(args.extra)))
+    if not jobs:
+        ap.error("no jobs: give a manifest or --inputs")
+    prof_start = 0
+    if args.profile:
+        jobs = [argv + ["--profile", args.profile] for argv in jobs]
+        prof_start = os.path.getsize(args.profile) if os.path.isfile(args.profile) else 0
+
+    t0 = time.perf_counter()
+    failed = 0
+    workers = max(1, min(args.jobs, len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futs = {pool.submit(run_job, argv): argv for argv in jobs}
+        for fut in as_completed(futs):
+            argv = futs[fut]
+            try:
+                ok, dt, text = fut.result()
+            except Exception as e:          # worker died
+                ok, dt, text = False, 0.0, repr(e)
+            failed += not ok
+            print(f"[{'OK' if ok else 'FAIL'}] {dt:6.2f}s  {shlex.join(argv)}")
+            if text and (args.verbose or not ok):
+                print("       " + text.rstrip().replace("\n", "\n       "))
+
+    print(f"=== {len(jobs) - failed}/{len(jobs)} jobs passed in {time.perf_counter() - t0:.2f}s "
+          f"({workers} workers) ===")
+    if args.profile and os.path.isfile(args.profile):
+        profile_summary(args.profile, prof_start)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
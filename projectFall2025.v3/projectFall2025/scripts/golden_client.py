@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+golden_client.py — Thin client for golden_server.py (standard library only,
+so a request costs an interpreter start plus one socket round trip, not a
+NumPy/PIL import).
+
+Everything after the options is a conv.py command line; it is sent as one
+JSON request and the server's captured conv.py output is printed. Requests
+can also be given as JSON objects with the fields
+  input, dims, offset, kernel, act, alpha, pool, padding, output, out_mem,
+  emit, presets, no_fuse, nocache
+(see golden_server.request_argv). Exit status is 1 if the job failed.
+
+Examples
+  python3 golden_client.py ../inputs/debug0.dat -o /tmp/d0.png --out-mem /tmp/d0.dat --dims 32x32
+
+  python3 golden_client.py --json '{"input": "../inputs/debug1.dat", "dims": "32x32",
+      "act": "lrelu", "pool": "avg", "padding": 1, "output": "/tmp/d1.png"}'
+
+  # Server state, latency check, shutdown
+  python3 golden_client.py --stats
+  python3 golden_client.py --repeat 100 ../inputs/debug0.dat -o /tmp/d0.png --dims 32x32
+  python3 golden_client.py --shutdown
+"""
+
+import os, sys, json, socket, time, argparse
+
+DEFAULT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"golden-{os.getuid()}.sock")
+
+# ----------------------------
+# Protocol: one JSON request line per connection, one JSON response line back
+# ----------------------------
+
+def send_msg(f, obj: dict):
+    f.write(json.dumps(obj).encode("utf-8") + b"\n")
+    f.flush()
+
+def recv_msg(f):
+    line = f.readline()
+    return json.loads(line) if line else None
+
+def request(obj: dict, path: str = DEFAULT_SOCKET, timeout: float = 300.0) -> dict:
+    """Send one request on a fresh connection (the server answers one per connection)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        with sock.makefile("rwb") as f:
+            send_msg(f, obj)
+            resp = recv_msg(f)
+    if resp is None:
+        raise ConnectionError("server closed the connection")
+    return resp
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Send conv.py jobs to a running golden_server.py.",
+                                 usage="%(prog)s [options] [conv.py args ...]", allow_abbrev=False)
+    ap.add_argument("--socket", default=DEFAULT_SOCKET, help=f"server socket (default {DEFAULT_SOCKET})")
+    ap.add_argument("--json", default=None, help="send this JSON request instead of a command line")
+    ap.add_argument("--stats", action="store_true", help="print the server's cache statistics")
+    ap.add_argument("--shutdown", action="store_true", help="stop the server")
+    ap.add_argument("--repeat", type=int, default=1, help="send the request N times and report latency")
+    ap.add_argument("-q", "--quiet", action="store_true", help="do not print conv.py output")
+    args, argv = ap.parse_known_args()
+    if argv[:1] == ["--"]:
+        argv = argv[1:]
+
+    if args.stats or args.shutdown:
+        req = {"cmd": "stats" if args.stats else "shutdown"}
+    elif args.json:
+        req = json.loads(args.json)
+    elif argv:
+        req = {"argv": argv}
+    else:
+        ap.error("give a conv.py command line, --json, --stats or --shutdown")
+    # Relative paths resolve against this directory, not the server's
+    req.setdefault("cwd", os.getcwd())
+
+    lat = []
+    for _ in range(max(1, args.repeat)):
+        t0 = time.perf_counter()
+        try:
+            resp = request(req, args.socket)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            sys.exit(f"error: cannot connect to {args.socket} ({e}); start golden_server.py first")
+        lat.append(time.perf_counter() - t0)
+
+    if "stats" in resp:
+        print(json.dumps(resp["stats"], indent=1))
+    if resp.get("log") and not args.quiet:
+        sys.stdout.write(resp["log"])
+    if resp.get("error"):
+        print("error:", resp["error"], file=sys.stderr)
+    if args.repeat > 1:
+        lat.sort()
+        print(f"=== {len(lat)} requests: median {lat[len(lat) // 2] * 1e3:.2f} ms, "
+              f"min {lat[0] * 1e3:.2f} ms, max {lat[-1] * 1e3:.2f} ms (last: {resp.get('cached') or 'run'}) ===")
+    sys.exit(0 if resp.get("ok") else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+golden_server.py — Long-running conv.py golden model on a local Unix socket.
+
+NumPy, PIL and the pipeline stay imported between requests, parsed DRAM
+images are held in an in-memory LRU (keyed by path, checked against size and
+mtime, falling back to the content digest), and finished jobs are kept as
+their output files' bytes: a repeated request only rewrites its outputs.
+
+Each connection carries one JSON request line and gets one JSON response
+line back (golden_client.py is the CLI):
+  {"argv": [conv.py args...], "cwd": "..."}
+  {"input": ..., "dims": "32x32", "offset": 16, "kernel": 0, "act": "lrelu",
+   "pool": "avg", "padding": 1, "output": "x.png", "out_mem": "x.dat", ...}
+  {"cmd": "stats"} | {"cmd": "ping"} | {"cmd": "shutdown"}
+Each gets {"ok", "ms", "cached": "output"|"input"|null, "outputs", "log",
+"error"}. Jobs run one at a time in the server process; "nocache": true
+skips the output cache. A connection that sends nothing within --idle-s
+seconds is dropped, so an idle client cannot hold up the others.
+
+Examples
+  python3 golden_server.py &
+  python3 golden_client.py ../inputs/debug0.dat -o /tmp/d0.png --out-mem /tmp/d0.dat --dims 32x32
+
+  # Preset bank with stage images (cached as o.input.*, o.<preset>.{png,dat,conv.png})
+  python3 golden_client.py ../inputs/input0.dat --dims 1024x1024 --presets edge,box --emit \
+      -o /tmp/o.png --out-mem /tmp/o.dat
+
+  # Bigger caches, explicit socket
+  python3 golden_server.py --socket /tmp/g.sock --cache-mb 1024 --out-cache-mb 256
+"""
+
+import io, os, sys, json, time, signal, socket, argparse, socketserver, traceback
+from collections import OrderedDict
+from contextlib import redirect_stdout, redirect_stderr
+
+import numpy as np
+
+import conv
+from golden_client import DEFAULT_SOCKET, send_msg, recv_msg
+
+# request field -> conv.py flag (value flags, then switches)
+FIELDS = [("dims", "--dims"), ("offset", "--offset"), ("kernel", "--kernel"), ("act", "--act"),
+          ("alpha", "--alpha"), ("pool", "--pool"), ("padding", "--padding"), ("out_mem", "--out-mem"),
+          ("presets", "--presets"), ("band_rows", "--band-rows"), ("threads", "--threads"),
+          ("stride", "--stride"), ("dilation", "--dilation"), ("conv_pad", "--conv-pad"), ("conv_algo", "--conv-algo")]
+SWITCHES = [("emit", "--emit"), ("no_fuse", "--no-fuse"), ("stream", "--stream")]
+
+# ----------------------------
+# Caches
+# ----------------------------
+
+class MemoryCache:
+    """
+    In-memory stand-in for conv.HexdumpCache (same lookup/store/digest calls):
+    parsed buffers by content digest, LRU-evicted past max_bytes, plus a
+    path -> (size, mtime_ns, digest) index so an unchanged file skips the read.
+    """
+
+    digest = staticmethod(conv.HexdumpCache.digest)
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.blobs = OrderedDict()      # digest -> read-only buffer
+        self.index = {}                 # abspath -> (size, mtime_ns, digest)
+        self.bytes = 0
+        self.hits = self.misses = 0
+
+    def lookup(self, path: str, digest: str = None):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = os.path.abspath(path)
+        if digest is None:
+            meta = self.index.get(key)
+            if not meta or meta[:2] != (st.st_size, st.st_mtime_ns):
+                return None
+            digest = meta[2]
+        buf = self.blobs.get(digest)
+        if buf is None:
+            return None
+        self.blobs.move_to_end(digest)
+        self.index[key] = (st.st_size, st.st_mtime_ns, digest)
+        self.hits += 1
+        return buf
+
+    def store(self, path: str, digest: str, buf: np.ndarray):
+        buf = np.array(buf, dtype=np.uint8)
+        buf.flags.writeable = False
+        st = os.stat(path)
+        self.index[os.path.abspath(path)] = (st.st_size, st.st_mtime_ns, digest)
+        self.misses += 1
+        if digest in self.blobs:
+            return
+        self.blobs[digest] = buf
+        self.bytes += buf.nbytes
+        while self.bytes > self.max_bytes and len(self.blobs) > 1:
+            _, old = self.blobs.popitem(last=False)
+            self.bytes -= old.nbytes
+
+    def stats(self) -> dict:
+        return {"entries": len(self.blobs), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+class OutputCache:
+    """Job key -> bytes of each output file, in conv.output_paths order; LRU past max_bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.jobs = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        files = self.jobs.get(key)
+        if files is None:
+            self.misses += 1
+            return None
+        self.jobs.move_to_end(key)
+        self.hits += 1
+        return files
+
+    def put(self, key, files: list):
+        size = sum(len(b) for b in files)
+        if size > self.max_bytes or key in self.jobs:
+            return
+        self.jobs[key] = files
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, old = self.jobs.popitem(last=False)
+            self.bytes -= sum(len(b) for b in old)
+
+    def stats(self) -> dict:
+        return {"entries": len(self.jobs), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+# ----------------------------
+# Jobs
+# ----------------------------
+
+def request_argv(req: dict) -> list:
+    """conv.py command line for a request: its "argv", or one built from the named fields."""
+    if "argv" in req:
+        return [str(a) for a in req["argv"]]
+    if "input" not in req or "output" not in req:
+        raise ValueError("request needs 'argv' or at least 'input' and 'output'")
+    argv = [req["input"], "-o", req["output"]]
+    for field, flag in FIELDS:
+        v = req.get(field)
+        if v is None:
+            continue
+        if field == "dims" and not isinstance(v, str):
+            v = "{}x{}".format(*v)
+        argv += [flag, str(v)]
+    argv += [flag for field, flag in SWITCHES if req.get(field)]
+    return argv
+
+def job_key(args):
+    """Output-cache key: the input file's identity plus every flag except the output paths."""
+    st = os.stat(args.input)
+    flags = {k: v for k, v in vars(args).items()
+             if k not in ("input", "output", "out_mem", "cache", "cache_dir", "cache_max_mb", "no_cache")}
+    return (os.path.abspath(args.input), st.st_size, st.st_mtime_ns, bool(args.out_mem),
+            json.dumps(flags, sort_keys=True, default=str))
+
+def capture(args):
+    """conv.run(args) in this process; returns (ok, captured stdout/stderr)."""
+    out = io.StringIO()
+    ok = True
+    with redirect_stdout(out), redirect_stderr(out):
+        try:
+            conv.run(args)
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except Exception:
+            traceback.print_exc(file=out)
+            ok = False
+    return ok, out.getvalue()
+
+class Server:
+    def __init__(self, cache_bytes: int, out_cache_bytes: int):
+        self.inputs = MemoryCache(cache_bytes)
+        self.outputs = OutputCache(out_cache_bytes)
+        self.served = 0
+        self.t0 = time.time()
+
+    def handle(self, req: dict) -> dict:
+        cmd = req.get("cmd", "run")
+        if cmd == "ping":
+            return {"ok": True}
+        if cmd == "stats":
+            return {"ok": True, "stats": {"served": self.served, "uptime_s": round(time.time() - self.t0, 1),
+                                          "inputs": self.inputs.stats(), "outputs": self.outputs.stats()}}
+        if cmd != "run":
+            return {"ok": False, "error": f"unknown cmd '{cmd}'"}
+        t0 = time.perf_counter()
+        cwd = os.getcwd()
+        try:
+            os.chdir(req.get("cwd") or cwd)
+            resp = self.run(request_argv(req), bool(req.get("nocache")))
+        except Exception as e:
+            resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            os.chdir(cwd)
+        self.served += 1
+        resp["ms"] = round((time.perf_counter() - t0) * 1e3, 3)
+        return resp
+
+    def run(self, argv: list, nocache: bool) -> dict:
+        usage = io.StringIO()
+        try:
+            with redirect_stderr(usage):
+                args = conv.build_arg_parser().parse_args(argv)
+        except SystemExit:
+            return {"ok": False, "error": usage.getvalue().strip().splitlines()[-1]}
+        cacheable = not (nocache or args.frames or args.out_of_core or args.profile is not None)
+        paths = conv.output_paths(args)
+        key = job_key(args) if cacheable else None
+        files = self.outputs.get(key) if cacheable else None
+        if files is not None:
+            for p, data in zip(paths, files):
+                with open(p, "wb") as f:
+                    f.write(data)
+            return {"ok": True, "cached": "output", "outputs": paths, "log": ""}
+
+        hits = self.inputs.hits
+        args.cache = None if args.no_cache else self.inputs
+        ok, log = capture(args)
+        resp = {"ok": ok, "cached": "input" if self.inputs.hits > hits else None,
+                "outputs": paths, "log": log}
+        if not ok:
+            resp["error"] = (log.strip().splitlines() or ["conv.py failed"])[-1]
+        elif cacheable:
+            files = []
+            for p in paths:
+                with open(p, "rb") as f:
+                    files.append(f.read())
+            self.outputs.put(key, files)
+        return resp
+
+# ----------------------------
+# Socket
+# ----------------------------
+
+class Handler(socketserver.StreamRequestHandler):
+    """One request per connection; the socket timeout bounds how long a silent client is waited on."""
+
+    def setup(self):
+        self.timeout = self.server.idle_s
+        super().setup()
+
+    def handle(self):
+        try:
+            req = recv_msg(self.rfile)
+        except ValueError as e:
+            send_msg(self.wfile, {"ok": False, "error": f"bad JSON: {e}"})
+            return
+        except OSError:                 # idle past --idle-s, or the client went away
+            return
+        if req is None:
+            return
+        if req.get("cmd") == "shutdown":
+            send_msg(self.wfile, {"ok": True})
+            self.server.stop = True
+            return
+        send_msg(self.wfile, self.server.golden.handle(req))
+
+class UnixServer(socketserver.UnixStreamServer):
+    """One connection at a time: the jobs share the caches and the working directory."""
+
+    stop = False
+    idle_s = 10.0
+
+def bind(path: str) -> UnixServer:
+    """Bind the socket, replacing a stale file that nothing listens on."""
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            raise SystemExit(f"error: a server is already listening on {path}")
+        finally:
+            probe.close()
+    old = os.umask(0o177)               # socket is private to this user
+    try:
+        return UnixServer(path, Handler)
+    finally:
+        os.umask(old)
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve conv.py goldens over a local Unix socket.")
+    ap.add_argument("--socket", default=DEFAULT_SOCKET, help=f"socket path (default {DEFAULT_SOCKET})")
+    ap.add_argument("--cache-mb", type=int, default=512, help="parsed-input cache bound (default 512)")
+    ap.add_argument("--out-cache-mb", type=int, default=128, help="output-file cache bound (default 128)")
+    ap.add_argument("--idle-s", type=float, default=10.0,
+                    help="drop a connection that sends no request within this many seconds (default 10)")
+    args = ap.parse_args()
+
+    srv = bind(args.socket)
+    srv.idle_s = args.idle_s
+    srv.golden = Server(args.cache_mb << 20, args.out_cache_mb << 20)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"golden_server: listening on {args.socket} (pid {os.getpid()})", flush=True)
+    try:
+        while not srv.stop:
+            srv.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+        try:
+            os.unlink(args.socket)
+        except OSError:
+            pass
+        print(f"golden_server: stopped after {srv.golden.served} requests", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,13 @@ Mem layout (8 bytes per line, little-endian by default):
   @00000008  <8 kernel bytes>
   @00000010  <image bytes begin>   # row-major u8 grayscale
 
+Other kernel geometries (--kernel-size K, --stride, --dilation, --conv-pad)
+use the extended header instead (see conv.py, "Extended kernel header"):
+  @00000000  "KRN" 01 K stride dilation padding
+  @00000008  <K*K kernel bytes, zero-filled to 8>
+  then the image bytes
+conv.py finds the image after it on its own (no --offset needed).
+
 Kernel source matches conv4x4:
   - Presets strictly in {-1,0,1}: box, edge, sharpen, emboss
   - Or --kernel-values / --kernel-csv, which are quantized to {-1,0,1}
@@ -23,13 +30,42 @@ Examples
   # Use custom kernel values (quantized to {-1,0,1})
   python3 img2svmem.py frame.png -o mem/frame.addr8.mem \
       --kernel-values "1,0,-1,0; 1,0,-1,0; 1,0,-1,0; 1,0,-1,0"
+
+  # 3x3 kernel, stride 2, extended header
+  python3 img2svmem.py frame.png -o mem/frame.k3s2.mem --kernel-size 3 --stride 2 --conv-pad 1 \
+      --kernel-values "0,1,0; 1,1,1; 0,1,0"
+
+  # Many frames on 8 worker processes
+  python3 img2svmem.py "frames/*.png" -d sv_mem --target 1024x1024 --resize bilinear -j 8
+
+  # One DRAM image holding a whole sequence (directory, globs or a multi-page
+  # TIFF), kernels cycling box/edge, goldens with conv.py --frames
+  python3 img2svmem.py frames/ clip.tiff -o ../inputs/seq.dat --frames \
+      --target 1024x1024 --frame-kernels box,edge
+  python3 conv.py ../inputs/seq.dat -o ../outputs/seq.564.png --out-mem ../outputs/seq.564.dat \
+      --frames --act lrelu --pool avg --padding 1
+
+--frames layout (see conv.py, "Multi-frame DRAM images"): a 16-byte header
+and a 16-byte-per-frame table of kernel/image offsets and dims at 0x00,
+then each frame as the usual kernel + image block at a --align boundary.
+Frames are decoded and written one at a time.
+
+Decoded grayscale frames (after resize or pad/crop) are cached as .npy in a
+'.imgcache' directory next to each image, keyed by (path, size, mtime,
+target, resize method, pad policy), so re-running with another kernel
+skips decode and resampling. --no-cache turns it off.
 """
 
-import os, sys, argparse, glob, re
+import os, sys, io, argparse, glob, re, json, hashlib, itertools, traceback
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
 from typing import Tuple, Optional, List
 import numpy as np
 from PIL import Image
 
+from conv import write_addr8_hex, words_for_display, BlobCache, HexdumpAppender, frame_layout, kernel_header_bytes
+from conv import KERNEL_PRESETS, kernel_preset, kernel_to_i8_bytes
+
 # ----------------------------
 # Utilities
 # ----------------------------
@@ -115,11 +151,83 @@ def pad_or_truncate(u8: np.ndarray, target: Tuple[int,int], pad_where: str) -> n
         u8 = np.pad(u8, ((y_top, y_bottom), (x_left, x_right)), mode='constant', constant_values=0)
     return u8
 
+# ----------------------------
+# Decoded-image cache
+# ----------------------------
+
+class ImageCache(BlobCache):
+    """
+    Grayscale frames after resize or pad/crop, one .npy per (source stat,
+    geometry) key, in the same kind of LRU blob directory as conv.py's
+    HexdumpCache; a changed mtime simply misses, since re-hashing the image
+    would cost about as much as decoding it.
+    """
+
+    subdir = ".imgcache"
+
+    @staticmethod
+    def key(path: str, target, resize, pad_where, page: int = 0) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not target:
+            resize = pad_where = None
+        elif resize:
+            pad_where = None
+        else:
+            pad_where = ",".join(sorted(p.strip().lower() for p in pad_where.split(","))) if pad_where else None
+        rec = [os.path.abspath(path), st.st_size, st.st_mtime_ns, list(target) if target else None, resize, pad_where]
+        if page:
+            rec.append(page)
+        return hashlib.blake2b(json.dumps(rec).encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, path: str, key: str) -> Optional[np.ndarray]:
+        blob = os.path.join(self._dir(path), key + ".npy")
+        try:
+            u8 = np.load(blob)
+            os.utime(blob)                  # LRU clock for eviction
+        except (OSError, ValueError):
+            return None
+        return u8
+
+    def put(self, path: str, key: str, u8: np.ndarray):
+        try:
+            self._write_blob(path, key, u8)
+        except OSError:
+            pass                            # read-only tree: just run uncached
+
+def load_gray(path: str,
+              target: Optional[Tuple[int,int]],
+              resize: Optional[str],
+              pad_where: str,
+              cache: Optional[ImageCache] = None,
+              page: int = 0) -> np.ndarray:
+    """Decode (page of a multi-frame file) -> L -> resize or pad/crop to target, through the cache if given."""
+    key = cache.key(path, target, resize, pad_where, page) if cache is not None else None
+    if key is not None:
+        u8 = cache.get(path, key)
+        if u8 is not None:
+            return u8
+    img = Image.open(path)
+    if page:
+        img.seek(page)
+    if resize and target:
+        img = resize_image(img.convert('L'), target, resize)
+        u8 = to_gray_u8(img)
+    else:
+        u8 = to_gray_u8(img)
+        if target:
+            u8 = pad_or_truncate(u8, target, pad_where)
+    if key is not None:
+        cache.put(path, key, u8)
+    return u8
+
 # ----------------------------
 # Kernel handling (match conv4x4)
 # ----------------------------
 
-def parse_kernel_values(s: str) -> np.ndarray:
+def parse_kernel_values(s: str, size: int = 4) -> np.ndarray:
     rows = [row.strip() for row in s.strip().split(";")]
     mat: List[List[float]] = []
     for r in rows:
@@ -127,51 +235,39 @@ def parse_kernel_values(s: str) -> np.ndarray:
             continue
         mat.append([float(x.strip()) for x in r.split(",") if x.strip()])
     k = np.array(mat, dtype=np.float32)
-    if k.shape != (4, 4):
-        raise ValueError(f"--kernel-values must define a 4x4 matrix, got {k.shape}")
+    if k.shape != (size, size):
+        raise ValueError(f"--kernel-values must define a {size}x{size} matrix, got {k.shape}")
     return k
 
-def kernel_preset(name: str) -> np.ndarray:
-    """All presets strictly use {-1,0,1} entries (float32, row-major)."""
-    name = (name or "box").lower()
-    if name == "box":
-        k = np.ones((4,4), dtype=np.float32)
-    elif name == "edge":
-        k = np.array([
-            [-1, -1, -1, -1],
-            [ 0,  0,  0,  0],
-            [ 1,  1,  1,  1],
-            [ 0,  0,  0,  0]
-        ], dtype=np.float32)
-    elif name == "sharpen":
-        k = np.array([
-            [ 0, -1, -1,  0],
-            [-1,  1,  1, -1],
-            [-1,  1,  1, -1],
-            [ 0, -1, -1,  0]
-        ], dtype=np.float32)
-    elif name == "emboss":
-        k = np.array([
-            [-1, -1,  0,  0],
-            [-1,  0,  0,  1],
-            [ 0,  0,  1,  1],
-            [ 0,  1,  1,  1]
-        ], dtype=np.float32)
+def resolve_kernel(kernel_name: str,
+                   kernel_values: Optional[str],
+                   kernel_csv: Optional[str],
+                   size: int = 4) -> np.ndarray:
+    """--kernel-values, else --kernel-csv, else the preset; as size*size kernel bytes."""
+    if kernel_values:
+        k = parse_kernel_values(kernel_values, size)
+    elif kernel_csv:
+        import csv
+        rows = []
+        with open(kernel_csv, "r") as f:
+            for r in csv.reader(f):
+                if not r: continue
+                rows.append([float(x) for x in r])
+        k = np.array(rows, dtype=np.float32)
+        if k.shape != (size, size):
+            raise ValueError(f"--kernel-csv must be {size}x{size}, got {k.shape}")
     else:
-        raise ValueError(f"Unknown kernel preset: {name}")
-    return k
-
-def quantize_kernel_to_trinary(k: np.ndarray) -> np.ndarray:
-    """Force any kernel to {-1,0,1} via nearest thresholding."""
-    q = np.zeros_like(k, dtype=np.float32)
-    q[k >  0.5] =  1.0
-    q[k < -0.5] = -1.0
-    return q
-
-def kernel_to_i8_bytes(k: np.ndarray) -> np.ndarray:
-    """Row-major 4x4 -> 16 int8 coeffs, as raw two’s-complement bytes (np.uint8 view)."""
-    k_q = quantize_kernel_to_trinary(k).astype(np.int8).reshape(-1)  # int8 in {-1,0,1}
-    return k_q.view(np.uint8)  # reinterpret as bytes
+        k = kernel_preset(kernel_name, size)
+    return kernel_to_i8_bytes(k)  # length size*size
+
+def kernel_block(kernel_bytes_u8: np.ndarray, size: int = 4, stride: int = 1,
+                 dilation: int = 1, conv_pad: int = 0) -> np.ndarray:
+    """Bytes ahead of the image: the 16 kernel bytes for a plain 4x4, else the extended header and taps."""
+    if (size, stride, dilation, conv_pad) == (4, 1, 1, 0):
+        return kernel_bytes_u8
+    head = np.frombuffer(kernel_header_bytes(size, stride, dilation, conv_pad), np.uint8)
+    taps = kernel_bytes_u8.astype(np.uint8)
+    return np.concatenate([head, taps, np.zeros(-taps.size % 8, np.uint8)])
 
 # ----------------------------
 # Writer (addr8 with kernel header)
@@ -182,25 +278,15 @@ def save_addr8_with_kernel(u8_image: np.ndarray,
                            endian: str,
                            kernel_bytes_u8: np.ndarray) -> str:
     """
-    Write two 64-bit lines of kernel (16 bytes total), then image bytes.
-    Two spaces after @address. Always pad the final line to 8 bytes with 0x00.
+    Write the kernel block (two 64-bit lines for a 4x4 kernel, see kernel_block),
+    then image bytes. Two spaces after @address. Always pad the final line to
+    8 bytes with 0x00.
     """
     flat_img = u8_image.reshape(-1).astype(np.uint8) + 128
     stream = np.concatenate([kernel_bytes_u8.astype(np.uint8), flat_img], axis=0)
 
-    ensure_dir(os.path.dirname(output_path) or ".")
-    with open(output_path, "w") as f:
-        addr = 0
-        for i in range(0, stream.size, 8):
-            chunk = stream[i:i+8]
-            # endianness transform: little -> reverse within the 64-bit word
-            data = chunk[::-1] if endian.lower() == "little" else chunk
-            if data.size < 8:
-                pad = np.zeros(8 - data.size, dtype=np.uint8)
-                data = np.concatenate([data, pad], axis=0)
-            hexstr = "".join(f"{int(b):02x}" for b in data.tolist())
-            f.write(f"@{addr:08x}  {hexstr}\n")
-            addr += 8
+    write_addr8_hex(output_path, words_for_display(stream, endian.lower()),
+                    addr_digits=8, prefix="@", sep="  ")
     return output_path
 
 # ----------------------------
@@ -217,7 +303,12 @@ def process_one(path: str,
                 endian: str,
                 kernel_name: str,
                 kernel_values: Optional[str],
-                kernel_csv: Optional[str]):
+                kernel_csv: Optional[str],
+                cache: Optional[ImageCache] = None,
+                kernel_size: int = 4,
+                stride: int = 1,
+                dilation: int = 1,
+                conv_pad: int = 0):
 
     # Determine output file path
     if out_path:
@@ -227,45 +318,112 @@ def process_one(path: str,
         output_path = os.path.join(out_dir, f"{name}_u8.addr8.mem")
 
     # Load image -> u8
-    img = Image.open(path)
-    if resize and target:
-        img = resize_image(img.convert('L'), target, resize)
-        u8 = to_gray_u8(img)
-    else:
-        u8 = to_gray_u8(img)
-        if target:
-            u8 = pad_or_truncate(u8, target, pad_where)
+    u8 = load_gray(path, target, resize, pad_where, cache)
 
-    # Build kernel (float32), then to i8 bytes
-    if kernel_values:
-        k = parse_kernel_values(kernel_values)
-    elif kernel_csv:
-        import csv
-        rows = []
-        with open(kernel_csv, "r") as f:
-            for r in csv.reader(f):
-                if not r: continue
-                rows.append([float(x) for x in r])
-        k = np.array(rows, dtype=np.float32)
-        if k.shape != (4,4):
-            raise ValueError(f"--kernel-csv must be 4x4, got {k.shape}")
-    else:
-        k = kernel_preset(kernel_name)
-    kernel_bytes = kernel_to_i8_bytes(k)  # length 16
+    kernel_bytes = resolve_kernel(kernel_name, kernel_values, kernel_csv, kernel_size)
+    block = kernel_block(kernel_bytes, kernel_size, stride, dilation, conv_pad)
 
-    out_written = save_addr8_with_kernel(u8, output_path, endian=endian, kernel_bytes_u8=kernel_bytes)
+    out_written = save_addr8_with_kernel(u8, output_path, endian=endian, kernel_bytes_u8=block)
     H, W = u8.shape
     print(f"[OK] {path} -> {out_written} (W={W}, H={H}, endian={endian})")
     print("     Header layout:")
-    print("       @00000000  <8 kernel bytes>")
-    print("       @00000008  <8 kernel bytes>")
-    print("       @00000010  <image bytes begin>")
+    if block is kernel_bytes:
+        print("       @00000000  <8 kernel bytes>")
+        print("       @00000008  <8 kernel bytes>")
+    else:
+        print(f"       @00000000  KRN v1, K={kernel_size}, stride={stride}, dilation={dilation}, padding={conv_pad}")
+        print(f"       @00000008  <{kernel_size * kernel_size} kernel bytes>")
+    print(f"       @{block.size:08x}  <image bytes begin>")
+
+# ----------------------------
+# Multi-frame mode
+# ----------------------------
+
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif", ".pgm", ".ppm")
+
+def frame_sources(paths: List[str]) -> List[Tuple[str, int]]:
+    """(path, page) per frame: directories expand to their sorted images, multi-page files to their pages."""
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(sorted(os.path.join(p, n) for n in os.listdir(p) if n.lower().endswith(IMAGE_EXTS)))
+        else:
+            files.append(p)
+    frames = []
+    for f in files:
+        with Image.open(f) as img:
+            frames.extend((f, i) for i in range(getattr(img, "n_frames", 1)))
+    return frames
+
+def frame_size(path: str, page: int) -> Tuple[int,int]:
+    """(W, H) from the image header, without decoding pixels."""
+    with Image.open(path) as img:
+        if page:
+            img.seek(page)
+        return img.size
+
+def write_frames(paths: List[str],
+                 out_path: str,
+                 target: Optional[Tuple[int,int]],
+                 resize: Optional[str],
+                 pad_where: str,
+                 endian: str,
+                 kernels: List[np.ndarray],
+                 align: int = 64,
+                 cache: Optional[ImageCache] = None) -> int:
+    """
+    Stream every frame of `paths` into one DRAM image with a frame table;
+    kernels are used round-robin. Holds one decoded frame at a time.
+    """
+    frames = frame_sources(paths)
+    if not frames:
+        raise ValueError("no frames found")
+    sizes = [target or frame_size(p, page) for p, page in frames]
+    head, entries = frame_layout(sizes, align)
+
+    out = HexdumpAppender(out_path, 0, addr_digits=8, prefix="@", sep="  ", endian=endian)
+    try:
+        pos = len(head)
+        pending = [np.frombuffer(head, np.uint8)]      # bytes not yet written (< one frame + 8)
+        for (p, page), kb, (k_off, i_off, W, H) in zip(frames, itertools.cycle(kernels), entries):
+            u8 = load_gray(p, target, resize, pad_where, cache, page)
+            if u8.shape != (H, W):
+                raise ValueError(f"{p}[{page}]: decoded {u8.shape[1]}x{u8.shape[0]}, expected {W}x{H}")
+            pending += [np.zeros(k_off - pos, np.uint8), kb.astype(np.uint8),
+                        (u8.reshape(-1) + np.uint8(128))]
+            pos = i_off + W * H
+            flat = np.concatenate(pending)
+            n8 = flat.size // 8 * 8
+            out.write(flat[:n8])
+            pending = [flat[n8:]]
+            print(f"[OK] {p}" + (f"[{page}]" if page else "") + f" -> frame @0x{k_off:08x} (W={W}, H={H})")
+        tail = np.concatenate(pending)
+        if tail.size:
+            out.write(np.concatenate([tail, np.zeros(-tail.size % 8, np.uint8)]))
+    finally:
+        out.close()
+    print(f"[OK] {len(frames)} frames -> {out_path} (align={align}, endian={endian})")
+    return len(frames)
+
+def _worker(kwargs: dict) -> Tuple[bool, str]:
+    """process_one(**kwargs) in a pool process; returns (ok, captured stdout/stderr)."""
+    out = io.StringIO()
+    ok = True
+    with redirect_stdout(out), redirect_stderr(out):
+        try:
+            process_one(**kwargs)
+        except SystemExit as e:
+            ok = e.code in (None, 0)
+        except Exception:
+            traceback.print_exc(file=out)
+            ok = False
+    return ok, out.getvalue()
 
 # ----------------------------
 # CLI
 # ----------------------------
 
-def main():
+def build_arg_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(description="Image -> addr8 MEM with 4x4 kernel header (row-major).")
     ap.add_argument("inputs", nargs="+", help="Input image paths or globs (e.g., frame*.png)")
     ap.add_argument("-o", "--out", default=None,
@@ -284,14 +442,37 @@ def main():
                     help="Byte order within each 64-bit line (default: little).")
 
     # Kernel args (match conv4x4)
-    ap.add_argument("--kernel", choices=["box","edge","sharpen","emboss"], default="box",
+    ap.add_argument("--kernel", choices=KERNEL_PRESETS, default="box",
                     help="4x4 kernel preset (strictly in {-1,0,1}).")
     ap.add_argument("--kernel-values", default=None,
                     help='Explicit 4x4 matrix; e.g. "1,0,-1,0; 1,0,-1,0; 1,0,-1,0; 1,0,-1,0"')
     ap.add_argument("--kernel-csv", default=None,
                     help="CSV file with 4 rows × 4 columns for the kernel.")
-
-    args = ap.parse_args()
+    ap.add_argument("--kernel-size", type=int, default=4,
+                    help="kernel size K (default 4); other sizes, or any of the options below, "
+                         "write the extended KxK header")
+    ap.add_argument("--stride", type=int, default=1, help="conv stride stored in the extended header (default 1)")
+    ap.add_argument("--dilation", type=int, default=1, help="conv dilation stored in the extended header (default 1)")
+    ap.add_argument("--conv-pad", type=int, default=0,
+                    help="conv input zero padding stored in the extended header (default 0)")
+
+    ap.add_argument("--frames", action="store_true",
+                    help="write every input frame (globs, directories, multi-page TIFF/GIF pages) into the "
+                         "single -o image, behind a frame table")
+    ap.add_argument("--frame-kernels", default=None,
+                    help="comma list of kernel presets used round-robin per frame (default: the --kernel* kernel)")
+    ap.add_argument("--align", type=int, default=64,
+                    help="--frames: frame start alignment in bytes, a multiple of the 8-byte DRAM word (default 64)")
+    ap.add_argument("-j", "--jobs", type=int, default=1,
+                    help="worker processes for multiple inputs (default 1: serial)")
+    ap.add_argument("--cache-dir", default=None,
+                    help="decoded-image cache directory (default: .imgcache next to each image)")
+    ap.add_argument("--cache-max-mb", type=int, default=512, help="cache size bound, LRU eviction (default 512)")
+    ap.add_argument("--no-cache", action="store_true", help="always decode and resample the images")
+    return ap
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
 
     # Resolve inputs (globs)
     paths = []
@@ -299,6 +480,23 @@ def main():
         m = glob.glob(p)
         paths.extend(m if m else [p])
 
+    cache = None if args.no_cache else ImageCache(args.cache_dir, args.cache_max_mb << 20)
+    geometry = (args.kernel_size, args.stride, args.dilation, args.conv_pad)
+    if args.frames:
+        if not args.out:
+            print("error: --frames needs -o", file=sys.stderr)
+            sys.exit(2)
+        if geometry != (4, 1, 1, 0):
+            print("error: --frames images use the 4x4 kernel header", file=sys.stderr)
+            sys.exit(2)
+        if args.frame_kernels:
+            kernels = [kernel_to_i8_bytes(kernel_preset(n.strip())) for n in args.frame_kernels.split(",") if n.strip()]
+        else:
+            kernels = [resolve_kernel(args.kernel, args.kernel_values, args.kernel_csv)]
+        write_frames(paths, args.out, args.target, args.resize, args.pad_where, args.endian,
+                     kernels, args.align, cache)
+        return
+
     if args.out and len(paths) != 1:
         print("error: --out may only be used with a single input file", file=sys.stderr)
         sys.exit(2)
@@ -306,18 +504,41 @@ def main():
     if not args.out:
         ensure_dir(args.outdir)
 
-    for p in paths:
-        process_one(p,
-                    out_path=args.out,
-                    out_dir=args.outdir,
-                    target=args.target,
-                    resize=args.resize,
-                    pad_where=args.pad_where,
-                    force_name=args.name,
-                    endian=args.endian,
-                    kernel_name=args.kernel,
-                    kernel_values=args.kernel_values,
-                    kernel_csv=args.kernel_csv)
+    jobs = [dict(path=p,
+                 out_path=args.out,
+                 out_dir=args.outdir,
+                 target=args.target,
+                 resize=args.resize,
+                 pad_where=args.pad_where,
+                 force_name=args.name,
+                 endian=args.endian,
+                 kernel_name=args.kernel,
+                 kernel_values=args.kernel_values,
+                 kernel_csv=args.kernel_csv,
+                 cache=cache,
+                 kernel_size=args.kernel_size,
+                 stride=args.stride,
+                 dilation=args.dilation,
+                 conv_pad=args.conv_pad) for p in paths]
+
+    workers = max(1, min(args.jobs, len(jobs)))
+    if workers == 1:
+        for kw in jobs:
+            process_one(**kw)
+        return
+
+    # Outputs are printed in input order once each job finishes
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futs = [pool.submit(_worker, kw) for kw in jobs]
+        for kw, fut in zip(jobs, futs):
+            ok, text = fut.result()
+            print(text, end="")
+            if not ok:
+                print(f"[FAIL] {kw['path']}", file=sys.stderr)
+                failed += 1
+    if failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+mac_trace.py — Cycle-level trace of the MAC_4x4 pipeline registers, for
+lining up against a dut_{0,2,4}stage waveform.
+
+Takes the same DRAM image as conv.py and computes, for every output pixel,
+the value each MAC_4x4 register holds and the cycle it holds it. Everything
+is whole-array NumPy (no per-cycle loop), bit-exact to the RTL widths:
+
+  depth 0   window -> products (16b) -> sum (32b) -> mac_out        all comb.
+  depth 2   products_reg (16b) @+1, sum_reg (20b) @+2, mac_out @+2
+  depth 4   data_reg / partial_prod = {0,d[3:0]}*k (12b) @+1,
+            products_reg = partial_prod + (d[7:4]*k <<< 4) (16b) @+2,
+            sum0..3_p2 row sums (20b) @+3, sum_p3 (20b) @+4, mac_out @+4
+
+mac_out saturates to int8 like the RTL. The window stream runs one 4x4
+window per cycle over full rows of W, so output pixel (y, x) enters the MAC
+at cycle t0 + y*W + x; the 3 wrap columns at the end of each row are squashed
+and show up as 'x' in the VCD. t0 defaults to the perf_model.py estimate of
+the first MAC cycle; pass --t0 with the cycle seen in the waveform to align.
+
+Outputs
+  --npz   every stage as arrays shaped (rows, W-3, ...) plus a JSON 'meta'
+          entry (depth, dims, t0, stage latencies and widths)
+  --vcd   one signal per register, kernel in the header, time = cycle * clock.
+          Roughly 50 bytes per bit of state per cycle, so use --rows for
+          anything but small frames.
+  --pixel print every stage of one pixel with the cycle it is valid at
+
+Examples
+  # Where does pixel (10, 200) of the 4-stage design sit in the pipeline?
+  python3 mac_trace.py ../inputs/input0.dat --dims 1024x1024 --depth 4 --pixel 10,200
+
+  # Full-frame compact trace, VCD for output rows 10..11 only
+  python3 mac_trace.py ../inputs/input0.dat --dims 1024x1024 --depth 2 \
+      --npz trace0.npz --vcd trace0.vcd --rows 10:12
+"""
+
+import os, sys, json, time, argparse
+from typing import Dict, List, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import conv
+import perf_model
+
+# (register, latency in cycles after the window enters, bit width, per-pixel shape)
+STAGES = {
+    0: [("window", 0, 8, (4, 4)), ("products", 0, 16, (4, 4)),
+        ("sum", 0, 32, ()), ("mac_out", 0, 8, ())],
+    2: [("window", 0, 8, (4, 4)), ("products_reg", 1, 16, (4, 4)),
+        ("sum_reg", 2, 20, ()), ("mac_out", 2, 8, ())],
+    4: [("window", 0, 8, (4, 4)), ("data_reg", 1, 8, (4, 4)), ("partial_prod", 1, 12, (4, 4)),
+        ("products_reg", 2, 16, (4, 4)), ("sum_p2", 3, 20, (4,)), ("sum_p3", 4, 20, ()),
+        ("mac_out", 4, 8, ())],
+}
+
+# ----------------------------
+# Model
+# ----------------------------
+
+def wrap_bits(x: np.ndarray, bits: int) -> np.ndarray:
+    """Two's-complement wrap of int values to a signed `bits`-wide register."""
+    half = 1 << (bits - 1)
+    return ((x.astype(np.int64) + half) & ((1 << bits) - 1)) - half
+
+def saturate_i8(x: np.ndarray) -> np.ndarray:
+    return np.clip(x, -128, 127).astype(np.int8)
+
+def windows(img_i8: np.ndarray, y0: int, y1: int) -> np.ndarray:
+    """(y1-y0, W-3, 4, 4) int8 view: window[y, x, r, c] = img[y0+y+r, x+c]."""
+    return sliding_window_view(img_i8[y0:y1 + 3], (4, 4))
+
+def trace_stages(img_i8: np.ndarray, ker_i8: np.ndarray, depth: int,
+                 y0: int = 0, y1: int = None) -> Dict[str, np.ndarray]:
+    """Register contents for output rows [y0, y1), keyed by STAGES[depth] names."""
+    if depth not in STAGES:
+        raise ValueError(f"depth must be one of {sorted(STAGES)}")
+    y1 = img_i8.shape[0] - 3 if y1 is None else y1
+    win = windows(img_i8, y0, y1)
+    k = ker_i8.astype(np.int16)
+    prod = win * k                                  # int16: |d*k| <= 2^14, exact
+    out = {"window": win}
+    if depth == 0:
+        out["products"] = prod
+        out["sum"] = prod.sum(axis=(2, 3), dtype=np.int32)
+        out["mac_out"] = saturate_i8(out["sum"])
+    elif depth == 2:
+        out["products_reg"] = prod
+        out["sum_reg"] = prod.sum(axis=(2, 3), dtype=np.int32)
+        out["mac_out"] = saturate_i8(out["sum_reg"])
+    else:
+        lo = win.view(np.uint8) & np.uint8(0x0F)    # {1'b0, d[3:0]}
+        hi = win >> 4                               # $signed(d[7:4])
+        out["data_reg"] = win
+        out["partial_prod"] = lo * k
+        out["products_reg"] = out["partial_prod"] + ((hi * k) << 4)
+        # balanced tree (p0 + p1) + (p2 + p3); 20 bits never wrap for int8 operands
+        out["sum_p2"] = out["products_reg"].sum(axis=3, dtype=np.int32)
+        out["sum_p3"] = out["sum_p2"].sum(axis=2, dtype=np.int32)
+        out["mac_out"] = saturate_i8(out["sum_p3"])
+    return out
+
+def pixel_cycle(y, x, W: int, t0: int):
+    """Cycle at which output pixel (y, x)'s window is on data_in."""
+    return t0 + np.asarray(y, np.int64) * W + np.asarray(x, np.int64)
+
+def default_t0(H: int, W: int, depth: int) -> int:
+    """perf_model.py's first MAC cycle with its default DRAM parameters."""
+    r = perf_model.model(H, W, depth, 32, 8, 8, 0, 5, 1.0)
+    return int(r["mac_start"])
+
+def check(tr: Dict[str, np.ndarray], img_i8: np.ndarray, ker_i8: np.ndarray, depth: int,
+          y0: int, y1: int) -> List[str]:
+    """Cross-check against conv.py and the RTL widths; returns failures."""
+    bad = []
+    gold = saturate_i8(conv.conv4x4_valid_i8_i8(img_i8[y0:y1 + 3], ker_i8, engine="generic"))
+    if not np.array_equal(gold, tr["mac_out"]):
+        bad.append(f"mac_out != clip(conv.py) at {int((gold != tr['mac_out']).sum())} pixels")
+    for name, _, bits, _ in STAGES[depth]:
+        if not np.array_equal(wrap_bits(tr[name], bits), tr[name]):
+            bad.append(f"{name} overflows {bits} bits")
+    if "partial_prod" in tr and not np.array_equal(tr["products_reg"], tr["window"] * ker_i8.astype(np.int16)):
+        bad.append("products_reg != data_in * kernel_in")
+    return bad
+
+# ----------------------------
+# Export
+# ----------------------------
+
+def save_npz(path: str, tr: Dict[str, np.ndarray], meta: dict, compress: bool = False):
+    arrays = {k: np.ascontiguousarray(v) for k, v in tr.items()}
+    (np.savez_compressed if compress else np.savez)(path, meta=np.array(json.dumps(meta)), **arrays)
+
+def _vcd_ids(n: int) -> List[str]:
+    return [chr(33 + i) for i in range(n)]          # '!', '"', ... — fine for < 94 signals
+
+def _bit_rows(v: np.ndarray, bits: int) -> np.ndarray:
+    """(n, k) ints -> (n, k*bits) ASCII '0'/'1', element k-1 in the MSBs."""
+    u = v.astype(np.int64)[:, ::-1] & ((1 << bits) - 1)
+    sh = np.arange(bits - 1, -1, -1, dtype=np.int64)
+    return (((u[:, :, None] >> sh) & 1).astype(np.uint8) + ord("0")).reshape(v.shape[0], -1)
+
+def write_vcd(path: str, tr: Dict[str, np.ndarray], ker_i8: np.ndarray, meta: dict,
+              chunk: int = 1 << 14):
+    """
+    One vector per register; array registers are packed with [0][0] in the
+    LSBs (element r*4+c at bits (r*4+c)*w). Every cycle of the covered range is
+    written; slots that carry no output pixel (row wrap, pipeline fill) are x.
+    """
+    depth, W, t0 = meta["depth"], meta["W"], meta["t0"]
+    y0, y1 = meta["rows"]
+    Wc = W - 3
+    stages = STAGES[depth]
+    ids = _vcd_ids(len(stages) + 1)
+    period_ps = int(round(meta["clock_ns"] * 1000))
+
+    first = int(pixel_cycle(y0, 0, W, t0))
+    last = int(pixel_cycle(y1 - 1, Wc - 1, W, t0)) + depth
+    cycles = np.arange(first, last + 1, dtype=np.int64)
+
+    with open(path, "wb") as f:
+        hdr = [f"$comment mac_trace.py depth={depth} dims={W}x{meta['H']} t0={t0} rows={y0}:{y1} "
+               f"kernel={ker_i8.reshape(-1).tolist()} $end",
+               "$timescale 1ps $end", f"$scope module MAC_4x4_{depth}stage $end"]
+        for (name, _, bits, shp), i in zip(stages, ids):
+            hdr.append(f"$var wire {bits * int(np.prod(shp, dtype=int))} {i} {name} $end")
+        hdr.append(f"$var wire 1 {ids[-1]} valid_out $end")
+        hdr += ["$upscope $end", "$enddefinitions $end", ""]
+        f.write("\n".join(hdr).encode())
+
+        for c0 in range(0, cycles.size, chunk):
+            cyc = cycles[c0:c0 + chunk]
+            cols = []
+            for (name, lat, bits, shp), i in zip(stages, ids):
+                rel = cyc - lat - t0                # stream slot whose value is in this register
+                y, x = np.divmod(rel, W)
+                ok = (x < Wc) & (y >= y0) & (y < y1)
+                v = tr[name].reshape(y1 - y0, Wc, -1)[np.clip(y - y0, 0, y1 - y0 - 1), np.minimum(x, Wc - 1)]
+                bits_m = _bit_rows(v, bits)
+                bits_m[~ok] = ord("x")
+                n = bits_m.shape[0]
+                cols += [np.full((n, 1), ord("b"), np.uint8), bits_m,
+                         np.frombuffer(f" {i}\n".encode(), np.uint8)[None, :].repeat(n, 0)]
+                if name == "mac_out":
+                    valid = ok
+            cols += [(valid.astype(np.uint8) + ord("0"))[:, None],
+                     np.frombuffer(f"{ids[-1]}\n".encode(), np.uint8)[None, :].repeat(cyc.size, 0)]
+            body = np.concatenate(cols, axis=1)
+            rows = [bytes(r) for r in body]
+            stamps = [f"#{t * period_ps}\n".encode() for t in cyc.tolist()]
+            f.write(b"".join(s + r for s, r in zip(stamps, rows)))
+        f.write(f"#{(last + 1) * period_ps}\n".encode())
+
+def print_pixel(tr: Dict[str, np.ndarray], depth: int, y: int, x: int, y0: int, W: int, t0: int):
+    c = int(pixel_cycle(y, x, W, t0))
+    print(f"pixel ({y}, {x}): window on data_in at cycle {c}")
+    for name, lat, bits, shp in STAGES[depth]:
+        v = tr[name][y - y0, x]
+        txt = np.array2string(np.asarray(v), separator=" ").replace("\n", "\n" + " " * 32)
+        print(f"  {name:<14s} {bits:>3d}b  @{c + lat:<10d} {txt}")
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def parse_rows(s: str) -> Tuple[int, int]:
+    lo, _, hi = s.partition(":")
+    return int(lo), int(hi) if hi else int(lo) + 1
+
+def main():
+    ap = argparse.ArgumentParser(description="Bit-accurate cycle-level trace of the MAC_4x4 pipeline.")
+    ap.add_argument("input", help="DRAM image hexdump (same as conv.py)")
+    ap.add_argument("--dims", required=True, type=conv.parse_dims, help='image dims "WIDTHxHEIGHT"')
+    ap.add_argument("--offset", type=conv.parse_hex_or_int, default="0x10", help="image start offset (default 0x10)")
+    ap.add_argument("--kernel", type=conv.parse_hex_or_int, default="0x00", help="kernel start offset (default 0x00)")
+    ap.add_argument("--depth", type=int, choices=sorted(STAGES), default=2, help="MAC pipeline depth (default 2)")
+    ap.add_argument("--rows", type=parse_rows, default=None, help="output rows lo:hi to trace (default all)")
+    ap.add_argument("--t0", type=int, default=None, help="cycle of the first window (default: perf_model estimate)")
+    ap.add_argument("--clock-ns", type=float, default=None,
+                    help="VCD clock period (default: timing report of --depth)")
+    ap.add_argument("--npz", default=None, help="write all stages to this .npz")
+    ap.add_argument("--compress", action="store_true", help="zip-compress the .npz")
+    ap.add_argument("--vcd", default=None, help="write a VCD of the traced rows")
+    ap.add_argument("--pixel", default=None, help='print every stage of output pixel "ROW,COL"')
+    ap.add_argument("--check", action="store_true", help="cross-check against conv.py and the register widths")
+    args = ap.parse_args()
+
+    H, W = args.dims
+    y0, y1 = args.rows or (0, H - 3)
+    if not 0 <= y0 < y1 <= H - 3:
+        ap.error(f"--rows must lie in 0:{H - 3}")
+    if args.pixel:
+        py, px = (int(v) for v in args.pixel.split(","))
+        if not (y0 <= py < y1 and 0 <= px < W - 3):
+            ap.error("--pixel is outside the traced rows")
+
+    buf = conv.load_hexdump_u8_little(args.input)
+    ker = conv.read_kernel_i8(buf, args.kernel)
+    img = conv.read_image_i8(buf, args.offset, H, W)
+    t0 = default_t0(H, W, args.depth) if args.t0 is None else args.t0
+    clock = args.clock_ns or float(perf_model.clock_for_depth(
+        args.depth, perf_model.load_clock_periods(perf_model.DEFAULT_REPORT_DIR)))
+
+    t = time.perf_counter()
+    tr = trace_stages(img, ker, args.depth, y0, y1)
+    dt = time.perf_counter() - t
+    meta = {"depth": args.depth, "H": H, "W": W, "t0": t0, "rows": [y0, y1], "clock_ns": clock,
+            "kernel": ker.reshape(-1).tolist(),
+            "stages": [{"name": n, "latency": l, "bits": b, "shape": list(s)} for n, l, b, s in STAGES[args.depth]]}
+
+    print(f"=== MAC_4x4 {args.depth}-stage trace: rows {y0}:{y1}, {(y1 - y0) * (W - 3)} pixels, "
+          f"cycles {t0 + y0 * W}..{int(pixel_cycle(y1 - 1, W - 4, W, t0)) + args.depth} "
+          f"({dt * 1e3:.0f} ms) ===")
+    failed = False
+    if args.check:
+        bad = check(tr, img, ker, args.depth, y0, y1)
+        print("check          : " + ("; ".join(bad) if bad else "OK"))
+        failed = bool(bad)
+    if args.pixel:
+        print_pixel(tr, args.depth, py, px, y0, W, t0)
+    if args.npz:
+        t = time.perf_counter()
+        save_npz(args.npz, tr, meta, args.compress)
+        print(f"npz            : {args.npz} ({os.path.getsize(args.npz) / 2**20:.1f} MiB, "
+              f"{time.perf_counter() - t:.2f}s)")
+    if args.vcd:
+        t = time.perf_counter()
+        write_vcd(args.vcd, tr, ker, meta)
+        print(f"vcd            : {args.vcd} ({os.path.getsize(args.vcd) / 2**20:.1f} MiB, "
+              f"{time.perf_counter() - t:.2f}s)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+mem_trace.py — Replay the DUT's DRAM/SRAM access schedule over an input frame
+for several buffering schemes and compare them side by side.
+
+Every access is placed on a cycle: DRAM_in beats, SRAM reads and writes,
+staging-buffer loads and MAC window issues, each resource serving its ops in
+order, one per cycle (the controller's fixed K-cycle loop per SRAM word
+included). From the trace come DRAM bursts, SRAM operations and the
+staging-buffer occupancy per --window cycles, and per scheme the reuse
+factor (MAC operand bytes per DRAM byte read), the bytes moved per output
+pixel and the predicted stall cycles (MAC bubbles after the first window).
+Staging is bounded: the producer feeding it (SRAM reads, or DRAM for strip)
+holds back a chunk until the one capacity // chunk places earlier has left.
+
+Schemes (README "Future Work"):
+  row      current RTL: forward DRAM reads through the MSB-first flip buffer,
+           4 SRAM row slots, per 32-bit word K-1 reads of the rows above +
+           1 write, 4x8 register file -> 4x12 shift buffer every 2nd word
+  reverse  row, but DRAM bursts read from the latest address (no flip buffer)
+  small    row with 4x4 -> 4x8 staging, loaded every word
+  column   column-wise SRAM: one word per image column, lane = row mod K,
+           byte-lane writes, one read per window gives a whole 4-high
+           column straight into a 4x4 window register
+  strip    no SRAM: DRAM read in --strip-rows x burst blocks (column order
+           within a strip), overlapping strips re-read from DRAM
+
+The schedule depends on the frame's layout (dims, kernel and image offsets,
+stream length), not its pixel values; the frame is checked to hold the image.
+DRAM_out is counted (bursts) but shares no port with the read side.
+
+Examples
+  # The five schemes on input3 (1024x1024)
+  python3 mem_trace.py ../inputs/input3.dat --dims 1024x1024
+
+  # Dual-port SRAM, 16-bit DQ, per-window CSV for plotting
+  python3 mem_trace.py ../inputs/input3.dat --dims 1024x1024 --sram-ports 2 \\
+      --dq-bits 16 --window 2048 --csv /tmp/trace.csv
+"""
+
+import argparse, time
+from typing import Dict
+import numpy as np
+
+import conv
+from perf_model import (KERNEL, CTRL_STALL, MAC_CTRL_STALL, COLLECT_BYTES, OUT_STAGE,
+                        DEFAULT_REPORT_DIR, load_clock_periods, clock_for_depth)
+
+DRAM_BUF = 4            # Staging_unit shift_buffer_1x4 between DRAM_in and the register file
+
+SCHEMES = {
+    "row":     {"sram": "row",    "flip": True,  "ld_every": 2, "stage": ((4, 8), (4, 12))},
+    "reverse": {"sram": "row",    "flip": False, "ld_every": 2, "stage": ((4, 8), (4, 12))},
+    "small":   {"sram": "row",    "flip": True,  "ld_every": 1, "stage": ((4, 4), (4, 8))},
+    "column":  {"sram": "column", "flip": False, "ld_every": 1, "stage": ((4, 4),)},
+    "strip":   {"sram": None,     "flip": False, "ld_every": 1, "stage": None},
+}
+
+# ----------------------------
+# Resources
+# ----------------------------
+
+def serial(ready: np.ndarray, dur=1) -> np.ndarray:
+    """Start cycles of in-order ops on one resource: start_i = max(ready_i, start_{i-1} + dur_{i-1})."""
+    ready = np.asarray(ready, np.int64)
+    if np.isscalar(dur):
+        base = np.arange(ready.size, dtype=np.int64) * dur
+    else:
+        base = np.concatenate(([0], np.cumsum(dur)[:-1])).astype(np.int64)
+    return base + np.maximum.accumulate(ready - base)
+
+def throttled(ready, dur, lat, src, n_mac, leave_at, enter_off, lag: int):
+    """
+    (producer start, MAC issue) cycles for chunks staged ahead of the MAC.
+
+    Chunk j is produced in order on one resource (serial(ready, dur)), is usable
+    at start[src_j] + lat_j and enables the next n_mac[j] MAC windows, which
+    issue in chunk order one per cycle. It leaves staging once MAC window
+    leave_at[j] has issued (-1: never staged). Backpressure: chunk j enters
+    (start_j + enter_off) no earlier than the cycle after chunk j - lag left.
+    The free-running schedule is kept when it already fits; otherwise the
+    chunks are replayed one by one.
+    """
+    n = len(ready)
+    ready = np.asarray(ready, np.int64)
+    dur = np.broadcast_to(np.asarray(dur, np.int64), (n,))
+    lat = np.broadcast_to(np.asarray(lat, np.int64), (n,))
+    src = np.asarray(src, np.int64)
+    n_mac = np.asarray(n_mac, np.int64)
+    ends = np.cumsum(n_mac)
+    grp = np.searchsorted(ends, leave_at, side="right")        # chunk whose windows hold leave_at
+    off = leave_at - (ends[np.minimum(grp, n - 1)] - n_mac[np.minimum(grp, n - 1)])
+    grp[leave_at < 0] = -1
+    used = n_mac > 0
+    cnt, base = n_mac[used], (ends - n_mac)[used]
+
+    def expand(m0):
+        return np.repeat(m0[used] - base, cnt) + np.arange(ends[-1])
+
+    start = serial(ready, dur)
+    m0 = np.zeros(n, np.int64)
+    m0[used] = serial((start[src] + lat)[used], n_mac[used])
+    leave = np.where(grp >= 0, m0[grp] + off, -1)
+    if n <= lag or np.all(start[lag:] + enter_off >= leave[:-lag] + 1):
+        return start, expand(m0)
+
+    ready, dur, lat, src, n_mac, grp, off = (a.tolist() for a in (ready, dur, lat, src, n_mac, grp, off))
+    start, m0 = [0] * n, [0] * n
+    free = mac_free = -(1 << 62)
+    g = 0                                                       # next chunk whose windows are unscheduled
+    for j in range(n):
+        t = ready[j]
+        k = j - lag
+        if k >= 0 and grp[k] >= 0:
+            if grp[k] >= g:
+                raise ValueError("staging holds fewer chunks than one MAC window needs")
+            t = max(t, m0[grp[k]] + off[k] + 1 - enter_off)
+        start[j] = t = max(t, free)
+        free = t + dur[j]
+        while g < n and src[g] <= j:
+            if n_mac[g]:
+                m0[g] = max(start[src[g]] + lat[g], mac_free)
+                mac_free = m0[g] + n_mac[g]
+            g += 1
+    return np.array(start, np.int64), expand(np.array(m0, np.int64))
+
+def dram_stream(n: int, p):
+    """(beat cycle, cycle the byte is usable) for n bytes read back to back in bursts."""
+    beat = np.arange(n, dtype=np.int64) // p.beat_bytes
+    bi, within = np.divmod(beat, p.burst)
+    beat_t = p.rdlat + bi * (p.burst + p.dram_gap) + within
+    avail = beat_t + 1 + (p.burst if p.flip else 0)
+    return beat_t[::p.beat_bytes], avail
+
+# ----------------------------
+# Schemes
+# ----------------------------
+
+def trace_row(H: int, W: int, off: int, p) -> dict:
+    """Row slots in SRAM, K-1 reads + 1 write per word (current controller)."""
+    K, S = KERNEL, p.sram_bytes
+    Wc = W // S
+    beats, avail = dram_stream(off + H * W, p)
+    w = np.arange(H * Wc, dtype=np.int64)
+    ready = avail[off + w * S + S - 1] + DRAM_BUF + CTRL_STALL
+    dur = K if p.sram_ports == 1 else K - 1
+    # Words of row K-1 on are staged: window x waits for word (x+K-1)//S (its
+    # 4x8 -> 4x12 load after every 2nd word), and a word's K x S bytes enter
+    # when its reads start and leave once the window of its last column has issued
+    src = np.minimum(w | 1, w.size - 1) if p.ld_every == 2 else w
+    x = np.arange(W)
+    per_word = np.bincount(np.minimum((x + K - 1) // S, Wc - 1), minlength=Wc)
+    staged = w >= (K - 1) * Wc
+    n_mac = np.where(staged, per_word[w % Wc], 0)
+    leave_at = np.where(staged, (w // Wc - (K - 1)) * W + (w % Wc) * S + S - 1, -1)
+    capacity = sum(a * b for a, b in p.stage) + DRAM_BUF
+    start, mac = throttled(ready, dur, dur + 1, src, n_mac, leave_at, 0, capacity // (K * S))
+    rd = (start[:, None] + np.arange(K - 1)).ravel()
+    wr = start + dur - 1
+    enter = start[staged]
+    leave = mac.reshape(-1, Wc, S).max(axis=2).ravel()
+    return {"beats": beats, "dram_bytes": off + H * W, "bursts": -(-(off + H * W) // p.burst_bytes),
+            "sram_rd": rd, "sram_wr": wr, "rd_bytes": S, "wr_bytes": S, "mac": mac,
+            "enter": enter, "leave": leave, "chunk": K * S,
+            "capacity": capacity,
+            "flip_bytes": 2 * p.burst_bytes if p.flip else 1, "sram_kb": K * W / 1024}
+
+def trace_column(H: int, W: int, off: int, p) -> dict:
+    """Column words in SRAM (lane = row mod K): byte-lane writes, one read per window."""
+    K = KERNEL
+    beats, avail = dram_stream(off + H * W, p)
+    px = np.arange(H * W, dtype=np.int64)
+    has_rd = px >= (K - 1) * W
+    ready = avail[off + px] + CTRL_STALL
+    # A column read (rows K-1 on) is staged from the cycle after it until
+    # window x = its column has issued; window x waits for column x+K-1
+    x = np.arange(W)
+    per_col = np.bincount(np.minimum(x + K - 1, W - 1), minlength=W)
+    n_mac = np.where(has_rd, per_col[px % W], 0)
+    leave_at = np.where(has_rd, px - (K - 1) * W, -1)
+    capacity = sum(a * b for a, b in p.stage)
+    start, mac = throttled(ready, 1 + has_rd if p.sram_ports == 1 else 1, 2, px, n_mac, leave_at, 2,
+                           capacity // K)
+    rd = start[has_rd] + 1
+    return {"beats": beats, "dram_bytes": off + H * W, "bursts": -(-(off + H * W) // p.burst_bytes),
+            "sram_rd": rd, "sram_wr": start, "rd_bytes": K, "wr_bytes": 1, "mac": mac,
+            "enter": rd + 1, "leave": mac, "chunk": K,
+            "capacity": capacity,
+            "flip_bytes": 2 * p.burst_bytes if p.flip else 1, "sram_kb": K * W / 1024}
+
+def trace_strip(H: int, W: int, off: int, p) -> dict:
+    """No SRAM: SH x burst blocks from DRAM, strips of SH rows overlapping by K-1."""
+    K, SH, BW = KERNEL, p.strip_rows, p.burst_bytes
+    step = SH - K + 1
+    nb = -(-W // BW)
+    strips = [(b, min(SH, H - b)) for b in range(0, H - K + 1, step)]
+    n = off + sum(rows * nb * BW for _, rows in strips)
+    beats, avail = dram_stream(n, p)
+    # Blocks in stream order; windows in column order (every output row of a
+    # column), each waiting for the block of column x+K-1. A block enters with
+    # its first byte and leaves once the window of its last column has issued
+    # in every output row. Holding the DRAM back pauses the rest of the stream.
+    x = np.arange(W)
+    per_blk = np.bincount(np.minimum((x + K - 1) // BW, nb - 1), minlength=nb)
+    last_col = np.minimum(np.arange(nb) * BW + BW - 1, W - 1)
+    first, span, n_mac, leave_at = [], [], [], []
+    pos, i = off, 0
+    for base, rows in strips:
+        f = pos + np.arange(nb) * rows * BW
+        first.append(f)
+        span.append(avail[f + rows * BW - 1] + 1 - avail[f])
+        n_mac.append(per_blk * (rows - K + 1))
+        leave_at.append(i + last_col * (rows - K + 1) + rows - K)
+        pos += rows * nb * BW
+        i += (rows - K + 1) * W
+    first = np.concatenate(first)
+    ready = avail[first]
+    capacity = 2 * SH * BW + SH * (K - 1) + step * BW           # 2 blocks, carry, out reorder
+    chunk = np.concatenate([np.full(nb, rows * BW) for _, rows in strips])
+    enter, mac = throttled(ready, np.diff(ready, append=ready[-1]), np.concatenate(span) + CTRL_STALL,
+                           np.arange(ready.size), np.concatenate(n_mac), np.concatenate(leave_at), 0,
+                           capacity // int(chunk.max()))
+    leave = mac[np.concatenate(leave_at)]
+    blk = np.searchsorted(first, np.arange(beats.size) * p.beat_bytes, side="right") - 1
+    beats = beats + np.where(blk >= 0, (enter - ready)[blk], 0)
+    return {"beats": beats, "dram_bytes": n, "bursts": -(-off // BW) + sum(rows * nb for _, rows in strips),
+            "sram_rd": np.zeros(0, np.int64), "sram_wr": np.zeros(0, np.int64), "rd_bytes": 0, "wr_bytes": 0,
+            "mac": mac, "enter": enter, "leave": leave, "chunk": chunk,
+            "capacity": capacity,
+            "flip_bytes": 1, "sram_kb": 0.0}
+
+TRACERS = {"row": trace_row, "column": trace_column, None: trace_strip}
+
+# ----------------------------
+# Metrics
+# ----------------------------
+
+def occupancy(tr: dict, n_cycles: int) -> np.ndarray:
+    """Staging-buffer bytes held at the end of every cycle."""
+    chunk = np.broadcast_to(tr["chunk"], tr["enter"].shape).astype(np.int64)
+    d = np.bincount(tr["enter"], chunk, n_cycles + 1) - np.bincount(tr["leave"] + 1, chunk, n_cycles + 1)
+    return np.cumsum(d)[:n_cycles].astype(np.int64)
+
+def summarize(tr: dict, H: int, W: int, p) -> dict:
+    K = KERNEL
+    valid = (H - K + 1) * (W - K + 1)
+    mac = tr["mac"]
+    cycles = int(mac[-1]) + 1 + p.depth + MAC_CTRL_STALL + COLLECT_BYTES + OUT_STAGE + p.burst
+    occ = occupancy(tr, cycles)
+    out_bytes = (H - K + 1) * W
+    sram_bytes = tr["sram_rd"].size * tr["rd_bytes"] + tr["sram_wr"].size * tr["wr_bytes"]
+    dram = tr["dram_bytes"] + out_bytes
+    tr["occ"] = occ
+    return {
+        "cycles": cycles,
+        "frame_us": cycles * p.clock_ns / 1e3,
+        "fill": int(mac[0]),
+        "stall": int(mac[-1] - mac[0] + 1 - mac.size),
+        "dram_in_bursts": tr["bursts"],
+        "dram_out_bursts": -(-out_bytes // p.burst_bytes),
+        "dram_in_bytes": tr["dram_bytes"],
+        "sram_reads": tr["sram_rd"].size,
+        "sram_writes": tr["sram_wr"].size,
+        "sram_kb": tr["sram_kb"],
+        "stage_cap": tr["capacity"],
+        "stage_peak": int(occ.max()),
+        "stage_mean": float(occ.mean()),
+        "flip_bytes": tr["flip_bytes"],
+        "reuse": K * K * valid / tr["dram_bytes"],
+        "dram_B_px": dram / valid,
+        "bytes_px": (dram + sram_bytes) / valid,
+    }
+
+ROWS = [("cycles", "{:d}"), ("frame_us", "{:.1f}"), ("fill", "{:d}"), ("stall", "{:d}"),
+        ("dram_in_bursts", "{:d}"), ("dram_out_bursts", "{:d}"), ("dram_in_bytes", "{:d}"),
+        ("sram_reads", "{:d}"), ("sram_writes", "{:d}"), ("sram_kb", "{:.1f}"),
+        ("stage_cap", "{:d}"), ("stage_peak", "{:d}"), ("stage_mean", "{:.1f}"), ("flip_bytes", "{:d}"),
+        ("reuse", "{:.2f}"), ("dram_B_px", "{:.3f}"), ("bytes_px", "{:.3f}")]
+
+def print_side_by_side(results: Dict[str, dict]):
+    names = list(results)
+    width = max(10, *(len(n) for n in names))
+    print(f"{'':16s}" + "".join(n.rjust(width + 2) for n in names))
+    for key, f in ROWS:
+        print(f"{key:16s}" + "".join(f.format(results[n][key]).rjust(width + 2) for n in names))
+    for n in names:
+        r = results[n]
+        if r["stage_peak"] > r["stage_cap"]:
+            print(f"warning: {n}: staging peak {r['stage_peak']} B exceeds its {r['stage_cap']} B")
+
+def window_rows(name: str, tr: dict, window: int):
+    """Per-window counts: DRAM beats, SRAM reads/writes, MAC windows, staging occupancy mean/max."""
+    occ = tr["occ"]
+    nwin = -(-occ.size // window)
+    count = lambda t: np.bincount(np.asarray(t) // window, minlength=nwin)[:nwin]
+    pad = np.zeros(nwin * window, np.int64)
+    pad[:occ.size] = occ
+    occ_w = pad.reshape(nwin, window)
+    cols = (count(tr["beats"]), count(tr["sram_rd"]), count(tr["sram_wr"]), count(tr["mac"]),
+            occ_w.mean(axis=1), occ_w.max(axis=1))
+    for i, row in enumerate(zip(*cols)):
+        yield (name, i * window) + row
+
+def write_csv(path: str, traces: Dict[str, dict], window: int):
+    with open(path, "w") as f:
+        f.write("scheme,cycle,dram_beats,sram_reads,sram_writes,mac_windows,stage_mean,stage_max\n")
+        for name, tr in traces.items():
+            for row in window_rows(name, tr, window):
+                f.write("{},{},{},{},{},{},{:.2f},{}\n".format(*row))
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="DRAM/SRAM access traces of the conv DUT under several buffering schemes.")
+    ap.add_argument("input", help="input DRAM image (.dat hexdump or SVMB .bin)")
+    ap.add_argument("--dims", type=conv.parse_dims, default=(1024, 1024), help="image WxH (default 1024x1024)")
+    ap.add_argument("--offset", type=conv.parse_hex_or_int, default="0x10", help="image start offset (default 0x10)")
+    ap.add_argument("--kernel", type=conv.parse_hex_or_int, default="0x00", help="kernel start offset (default 0x00)")
+    ap.add_argument("--schemes", default=",".join(SCHEMES), help="comma list of " + ",".join(SCHEMES))
+    ap.add_argument("--depth", type=int, default=2, help="MAC pipeline depth (default 2)")
+    ap.add_argument("--sram-bits", type=int, default=32, help="SRAM word width (default 32)")
+    ap.add_argument("--sram-ports", type=int, choices=(1, 2), default=1,
+                    help="1: one SRAM op per cycle (current controller), 2: a read and a write per cycle")
+    ap.add_argument("--dq-bits", type=int, default=8, help="DRAM DQ width (default 8)")
+    ap.add_argument("--burst", type=int, default=8, help="DRAM burst length in beats (default 8)")
+    ap.add_argument("--dram-gap", type=int, default=0, help="idle cycles between bursts (default 0)")
+    ap.add_argument("--rdlat", type=int, default=5, help="DRAM read latency in cycles (default 5)")
+    ap.add_argument("--strip-rows", type=int, default=8, help="strip scheme block height (default 8)")
+    ap.add_argument("--clock-ns", type=float, default=None, help="clock period (default: from the timing reports)")
+    ap.add_argument("--reports", default=DEFAULT_REPORT_DIR, help="Timing_Reports directory")
+    ap.add_argument("--window", type=int, default=4096, help="cycles per trace window (default 4096)")
+    ap.add_argument("--csv", default=None, help="write per-window counts of every scheme here")
+    args = ap.parse_args()
+
+    H, W = args.dims
+    K = KERNEL
+    sram_bytes = args.sram_bits // 8
+    names = [s.strip() for s in args.schemes.split(",") if s.strip()]
+    for n in names:
+        if n not in SCHEMES:
+            ap.error(f"unknown scheme '{n}'")
+    if H < K or W < K or W % sram_bytes or args.dq_bits % 8:
+        ap.error("need H, W >= 4, W a multiple of the SRAM word and whole-byte DQ")
+    if args.kernel + K * K > args.offset:
+        ap.error("the kernel must sit below the image (the DUT reads the stream in address order)")
+    buf = conv.load_hexdump_u8_little(args.input)
+    if args.offset + H * W > buf.size:
+        ap.error(f"{args.input}: image extends past EOF (need {H * W} bytes at 0x{args.offset:x})")
+    clock = args.clock_ns or float(clock_for_depth(args.depth, load_clock_periods(args.reports)))
+
+    results, traces = {}, {}
+    t0 = time.perf_counter()
+    for n in names:
+        s = SCHEMES[n]
+        p = argparse.Namespace(**{**vars(args), "clock_ns": clock}, sram_bytes=sram_bytes,
+                               beat_bytes=args.dq_bits // 8, burst_bytes=args.burst * args.dq_bits // 8,
+                               flip=s["flip"], ld_every=s["ld_every"], stage=s["stage"])
+        traces[n] = TRACERS[s["sram"]](H, W, args.offset, p)
+        results[n] = summarize(traces[n], H, W, p)
+    dt = time.perf_counter() - t0
+
+    print(f"=== {args.input}: {W}x{H}, depth {args.depth} @ {clock:.3g} ns, {args.sram_bits}-bit SRAM x "
+          f"{args.sram_ports} port(s), {args.dq_bits}-bit DQ, burst {args.burst} ({dt:.2f}s) ===")
+    print_side_by_side(results)
+    if args.csv:
+        write_csv(args.csv, traces, args.window)
+        print(f"Wrote {args.csv}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+net_run.py — Goldens for a stack of quantized conv layers, run in memory.
+
+The DRAM image is read once (conv.py's loader and parse cache), then every
+layer runs conv → act → (zero-pad) → avg pool → int8 requant
+(conv.conv_layer_) between two preallocated int8 activation buffers used
+ping-pong; the int32 accumulators and the conv scratch are sized for the
+largest layer before the first one runs, so no layer allocates a full-size
+array (the FFT conv's transforms excepted). A one-layer net with shift 0 is
+conv.py's single-layer golden.
+
+The net is a JSON list of layers (a file, or inline JSON), each an object:
+  kernel    "dram" (the input's header kernel and geometry), a preset name
+            (box|edge|sharpen|emboss; "size" K for box), or rows of int8 taps
+  stride, dilation, conv_pad       conv geometry (default 1, 1, 0)
+  act       none|relu|lrelu (default none)
+  pool      avg|none (default avg when act is set, as in conv.py)
+  padding   zero padding before the pool (default 0)
+  shift     requant: rounding arithmetic right shift (default 0)
+  scale     requant: rint(x * scale) instead of shift
+  algo      conv algorithm (auto|engine4|shift|im2col|fft)
+  name      tag for dumps and the report (default L<index>)
+
+-o / --out-mem get the last layer's map as conv.py writes it; --dump writes
+chosen layers' outputs as *.L<i>.<name>.dat in the same $readmemh layout
+(int8, 8 bytes per line, rows padded to 8 bytes, addresses from 0x00).
+The report gives each layer's shapes, algorithm, time and the bytes it
+allocated beyond the arena (tracemalloc), then the arena's footprint.
+
+Examples
+  # Two layers on the DRAM kernel, then a 3x3 box with requant shift
+  python3 net_run.py ../inputs/input0.dat --dims 1024x1024 -o /tmp/net.png --out-mem /tmp/net.dat \\
+      --net '[{"kernel": "dram", "act": "lrelu", "padding": 1},
+              {"kernel": "box", "size": 3, "conv_pad": 1, "act": "relu", "shift": 3}]'
+
+  # Layer list from a file, dump layers 1 and 3, best of 5 timings
+  python3 net_run.py ../inputs/input0.dat --dims 1024x1024 -o /tmp/net.png --net net.json \\
+      --dump 1,3 --repeat 5
+"""
+
+import argparse, json, os, sys, time, tracemalloc
+import numpy as np
+
+import conv
+
+LAYER_KEYS = ("name", "kernel", "size", "stride", "dilation", "conv_pad", "act", "pool",
+              "padding", "shift", "scale", "algo")
+
+# ----------------------------
+# Net description
+# ----------------------------
+
+def load_net(spec: str) -> list:
+    """Layer list from inline JSON or a JSON file."""
+    if spec.lstrip().startswith("["):
+        net = json.loads(spec)
+    else:
+        with open(spec, "r") as f:
+            net = json.load(f)
+    if not isinstance(net, list) or not net:
+        raise ValueError("the net must be a non-empty JSON list of layers")
+    return net
+
+def layer_kernel(layer: dict, hdr):
+    """(int8 KxK kernel, (stride, dilation, conv_pad) defaults) for one layer."""
+    k = layer.get("kernel", "dram")
+    if k == "dram":
+        return np.array(hdr[0]), hdr[1]
+    if isinstance(k, str):
+        size = int(layer.get("size", 4))
+        return conv.preset_kernel_i8(k, size), (1, 1, 0)
+    arr = np.array(k)
+    if arr.ndim != 2 or arr.shape[0] != arr.shape[1] or arr.min() < -128 or arr.max() > 127:
+        raise ValueError("kernel must be a square list of int8 rows, 'dram' or a preset name")
+    return arr.astype(np.int8), (1, 1, 0)
+
+def resolve_layers(net: list, hdr, in_shape) -> list:
+    """Layers with every field filled in and their shapes checked, in order."""
+    layers = []
+    shape = in_shape
+    for i, raw in enumerate(net, 1):
+        bad = set(raw) - set(LAYER_KEYS)
+        if bad:
+            raise ValueError("layer {}: unknown field(s) {}".format(i, ", ".join(sorted(bad))))
+        if raw.get("shift") and raw.get("scale") is not None:
+            raise ValueError("layer {}: give shift or scale, not both".format(i))
+        ker, (s, d, p) = layer_kernel(raw, hdr)
+        act = raw.get("act", "none")
+        L = {
+            "name": raw.get("name", "L{}".format(i)), "kernel": ker,
+            "stride": int(raw.get("stride", s)), "dilation": int(raw.get("dilation", d)),
+            "conv_pad": int(raw.get("conv_pad", p)), "act": act,
+            "pool": raw.get("pool", "avg" if act != "none" else "none"),
+            "padding": int(raw.get("padding", 0)), "shift": int(raw.get("shift", 0)),
+            "scale": raw.get("scale"), "algo": raw.get("algo", "auto"),
+        }
+        if L["shift"] < 0:
+            raise ValueError("layer {}: shift must be >= 0".format(i))
+        L["in"] = shape
+        try:
+            L["conv"], L["prepool"], L["out"] = conv.layer_shapes(
+                shape, ker.shape[0], L["stride"], L["dilation"], L["conv_pad"], L["pool"], L["padding"])
+        except ValueError as e:
+            raise ValueError("layer {} ({}x{} in): {}".format(i, shape[1], shape[0], e))
+        layers.append(L)
+        shape = L["out"]
+    return layers
+
+# ----------------------------
+# Arena
+# ----------------------------
+
+class Arena:
+    """
+    Every buffer the net needs, allocated once for its largest layer:
+      act[0], act[1]  int8 ping-pong activations (layer i writes act[i % 2],
+                      reads the other; layer 1 reads the DRAM image itself)
+      acc, tmp        int32, twice the largest pre-pool map (conv.conv_layer_)
+      scratch         conv.conv2d_i8 padded inputs and temporaries, pre-grown
+                      by conv.layer_reserve
+    """
+
+    def __init__(self, layers: list):
+        n_act = max(L["out"][0] * L["out"][1] for L in layers)
+        n_acc = 2 * max(L["prepool"][0] * L["prepool"][1] for L in layers)
+        self.act = [np.empty(n_act, np.int8), np.empty(n_act, np.int8)]
+        self.acc = np.empty(n_acc, np.int32)
+        self.tmp = np.empty(n_acc, np.int32)
+        self.scratch = {}
+        for L in layers:
+            L["algo"] = conv.layer_reserve(self.scratch, L["in"], L["kernel"], L["stride"], L["dilation"],
+                                           L["conv_pad"], L["pool"], L["padding"], L["scale"], L["algo"])
+
+    def sizes(self) -> dict:
+        return {"act": sum(a.nbytes for a in self.act), "acc": self.acc.nbytes + self.tmp.nbytes,
+                "scratch": sum(b.nbytes for b in self.scratch.values())}
+
+# ----------------------------
+# Run
+# ----------------------------
+
+def run_net(img_i8: np.ndarray, layers: list, arena: Arena, dump=None, stats=None) -> np.ndarray:
+    """
+    All layers on img_i8; returns the last output (a view into the arena).
+    dump(i, layer, out) is called after each layer, outside its timing;
+    stats (a list) collects (seconds, allocated bytes) per layer.
+    """
+    x = img_i8
+    for i, L in enumerate(layers):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        x = conv.conv_layer_(x, L["kernel"], arena.act[i % 2], arena.acc, arena.tmp, arena.scratch,
+                             L["stride"], L["dilation"], L["conv_pad"], L["act"], L["pool"], L["padding"],
+                             L["shift"], L["scale"], L["algo"])
+        dt = time.perf_counter() - t0
+        if stats is not None:
+            stats.append((dt, tracemalloc.get_traced_memory()[1] - base))
+        if dump:
+            dump(i, L, x)
+    return x
+
+def requant_desc(L: dict) -> str:
+    if L["scale"] is not None:
+        return "x{:g}".format(L["scale"])
+    return ">>{}".format(L["shift"]) if L["shift"] else "sat"
+
+def print_report(layers: list, best: list, arena: Arena):
+    print(f"{'#':>2s} {'name':10s} {'in':>11s} {'out':>11s} {'K':>3s} {'s':>2s} {'d':>2s} {'p':>2s} "
+          f"{'algo':8s} {'act':6s} {'pool':5s} {'requant':7s} {'ms':>9s} {'alloc KiB':>10s}")
+    for i, (L, (t, alloc)) in enumerate(zip(layers, best), 1):
+        print(f"{i:2d} {L['name']:10s} {'{1}x{0}'.format(*L['in']):>11s} {'{1}x{0}'.format(*L['out']):>11s} "
+              f"{L['kernel'].shape[0]:3d} {L['stride']:2d} {L['dilation']:2d} {L['conv_pad']:2d} "
+              f"{L['algo']:8s} {L['act']:6s} {L['pool']:5s} {requant_desc(L):7s} {t * 1e3:9.2f} {alloc / 1024:10.1f}")
+    sz = arena.sizes()
+    print("arena          : act {:.1f} KiB (2 x int8), acc/tmp {:.1f} KiB, scratch {:.1f} KiB = {:.2f} MiB".format(
+        sz["act"] / 1024, sz["acc"] / 1024, sz["scratch"] / 1024, sum(sz.values()) / 2**20))
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def dump_selection(spec: str, layers: list) -> set:
+    """Layer indices (0-based) from a comma list of 1-based indices or names, or 'all'."""
+    if not spec:
+        return set()
+    if spec == "all":
+        return set(range(len(layers)))
+    names = {L["name"]: i for i, L in enumerate(layers)}
+    out = set()
+    for tok in (t.strip() for t in spec.split(",") if t.strip()):
+        if tok in names:
+            out.add(names[tok])
+        elif tok.isdigit() and 1 <= int(tok) <= len(layers):
+            out.add(int(tok) - 1)
+        else:
+            raise ValueError("--dump: no layer '{}'".format(tok))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Run a stack of quantized conv layers on a DRAM image, in memory.")
+    ap.add_argument("input", help="hexdump (or SVMB) DRAM image, as for conv.py")
+    ap.add_argument("--net", required=True, help="layer list: a JSON file or inline JSON")
+    ap.add_argument("--dims", type=conv.parse_dims, required=True, help='image dims "WIDTHxHEIGHT"')
+    ap.add_argument("--offset", type=conv.parse_hex_or_int, default=None,
+                    help="image start offset (default 0x10, or right after an extended kernel header)")
+    ap.add_argument("--kernel", type=conv.parse_hex_or_int, default="0x00", help="kernel start offset (default 0x00)")
+    ap.add_argument("-o", "--output", required=True, help="final PNG (last layer, as conv.py -o)")
+    ap.add_argument("--out-mem", default=None, help="final DAT (last layer, as conv.py --out-mem)")
+    ap.add_argument("--dump", default=None,
+                    help="comma list of layers (1-based index or name, or 'all') to write as *.L<i>.<name>.dat")
+    ap.add_argument("--repeat", type=int, default=1, help="run the net N times, report the best time per layer")
+    ap.add_argument("--no-cache", action="store_true", help="always parse the input text")
+    args = ap.parse_args()
+
+    try:
+        net = load_net(args.net)
+        cache = None if args.no_cache else conv.HexdumpCache(None, 512 << 20)
+        buf = conv.load_hexdump_u8_little(args.input, cache=cache)
+        hdr = conv.read_kernel_header(buf, args.kernel)
+        H, W = args.dims
+        start = hdr[2] if args.offset is None else args.offset
+        img_i8 = conv.read_image_i8(buf, start, H, W)
+        layers = resolve_layers(net, hdr, (H, W))
+        want = dump_selection(args.dump, layers)
+    except (OSError, ValueError) as e:
+        sys.exit("error: {}".format(e))
+
+    root = os.path.splitext(args.out_mem or args.output)[0]
+    dumped = []
+
+    def dump(i, L, out):
+        if i in want:
+            path = "{}.L{}.{}.dat".format(root, i + 1, L["name"])
+            conv.write_mem_addr8_from_i8(conv.pad_cols_to_multiple_of_8(out), path)
+            dumped.append(path)
+
+    arena = Arena(layers)
+    tracemalloc.start()
+    try:
+        best = None
+        for r in range(max(1, args.repeat)):
+            stats = []
+            final = run_net(img_i8, layers, arena, dump if r == 0 else None, stats)
+            best = stats if best is None else [min(a, b) for a, b in zip(best, stats)]
+    finally:
+        tracemalloc.stop()
+    conv.write_final(conv.pad_cols_to_multiple_of_8(final), args.output, args.out_mem)
+
+    print("=== net: {} layer(s) on {} ({}x{} @0x{:x}) ===".format(len(layers), args.input, W, H, start))
+    print_report(layers, best, arena)
+    for p in dumped:
+        print("dump           :", p)
+    print("final PNG      :", args.output)
+    if args.out_mem:
+        print("final DAT      :", args.out_mem, "(0x00-based)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+perf_model.py — Analytic throughput/latency model of the dut_{0,2,4}stage datapath.
+
+The model follows the RTL stage by stage and treats each one as a stream with
+its own rate; a frame takes as long as the slowest stage plus the pipeline
+fill ahead of it and the drain behind it.
+
+  DRAM_in     one DQ beat per cycle, bursts of --burst beats (+ --dram-gap idle
+              cycles between bursts), first data after --rdlat cycles, then one
+              burst held in the MSB-first flip buffer (--no-reorder drops it)
+  Staging     per SRAM word: K-1 reads of the rows above + 1 write = K cycles
+  MAC         one 4x4 window per cycle over (H-K+1) full rows (the 3 wrap
+              columns are computed and squashed), --depth register stages
+  DRAM_out    capture every 8 bytes, 4-cycle staging, one DQ beat per cycle
+
+Clock periods come from the Synopsys timing reports (parsed by synth_db.py)
+as (clock edge - slack), i.e. the period at which the critical path has zero
+slack; depths without a report are linearly interpolated and held flat past
+the deepest one (or pass --clock-ns).
+
+Every parameter takes a comma list or lo:hi[:step] range and the model is
+evaluated on the full cross product with NumPy broadcasting.
+
+Examples
+  # The three synthesized designs at 1024x1024
+  python3 perf_model.py
+
+  # DRAM exploration: wider DQ, longer bursts, gaps between bursts
+  python3 perf_model.py --depth 0,2,4 --dq-bits 8,16,32 --burst 4,8,16 --dram-gap 0:4
+
+  # Big sweep to CSV, print the 5 best
+  python3 perf_model.py --dims 256x256,1024x1024,4096x4096 --depth 0:8 \
+      --sram-bits 32,64,128 --burst 2:33:2 --dq-bits 8,16,32,64 --top 5 --csv sweep.csv
+"""
+
+import os, re, time, argparse
+from typing import Dict, List, Tuple
+import numpy as np
+
+from synth_db import parse_timing_report
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REPORT_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, "..", "..", "..", "Results", "Timing_Reports"))
+
+# README Perf/Area table, used when the reports are not available
+README_CLOCK_NS = {0: 6.36, 2: 4.00, 4: 3.40}
+
+KERNEL = 4              # kernel height/width (fixed at synthesis)
+CTRL_STALL = 3          # Controller STALL state before COUNTING
+MAC_CTRL_STALL = 4      # MAC_controller STALL state before COUNTING
+COLLECT_BYTES = 8       # MAC_collector width / DRAM_out capture size
+OUT_STAGE = 4           # DRAM_out i-counter between capture and first beat
+
+BOUNDS = ("dram_in", "staging", "mac", "dram_out")
+
+# ----------------------------
+# Timing reports
+# ----------------------------
+
+_REPORT_RE = re.compile(r"dut_(\d+)stage\.rpt$")
+
+def load_clock_periods(report_dir: str) -> Dict[int, float]:
+    """{pipeline depth: clock ns} from dut_<N>stage.rpt files, else README values."""
+    periods = {}
+    if os.path.isdir(report_dir):
+        for name in sorted(os.listdir(report_dir)):
+            m = _REPORT_RE.search(name)
+            if m:
+                periods[int(m.group(1))] = round(parse_timing_report(os.path.join(report_dir, name))["period_ns"], 4)
+    return periods or dict(README_CLOCK_NS)
+
+def clock_for_depth(depth: np.ndarray, periods: Dict[int, float]) -> np.ndarray:
+    d = sorted(periods)
+    return np.interp(depth, d, [periods[k] for k in d])
+
+# ----------------------------
+# Model
+# ----------------------------
+
+def model(H, W, depth, sram_bits, dq_bits, burst, dram_gap, rdlat, clock_ns,
+          dram_gbs=None, reorder=True) -> Dict[str, np.ndarray]:
+    """
+    Evaluate the model; all arguments broadcast against each other.
+    dram_gbs optionally caps each DRAM port's bandwidth (GB/s == bytes/ns).
+    Returns per-stage busy cycles, latency, cycles/frame, frames/s and the bound.
+    """
+    H, W = np.asarray(H, np.float64), np.asarray(W, np.float64)
+    depth = np.asarray(depth, np.float64)
+    burst = np.asarray(burst, np.float64)
+    clock_ns = np.asarray(clock_ns, np.float64)
+    K = KERNEL
+
+    beat_bytes = np.asarray(dq_bits, np.float64) / 8.0
+    if dram_gbs is not None:
+        beat_bytes = np.minimum(beat_bytes, np.asarray(dram_gbs, np.float64) * clock_ns)
+    burst_bytes = beat_bytes * burst
+    burst_cycles = burst + np.asarray(dram_gap, np.float64)
+
+    in_bytes = K * K + H * W
+    out_rows = np.maximum(H - K + 1, 0)
+    out_bytes = out_rows * W
+    word_bytes = np.asarray(sram_bits, np.float64) / 8.0
+
+    busy = {
+        "dram_in":  np.ceil(in_bytes / burst_bytes) * burst_cycles,
+        "staging":  np.ceil(H * W / word_bytes) * K,
+        "mac":      out_rows * W,
+        "dram_out": np.ceil(out_bytes / burst_bytes) * burst_cycles,
+    }
+    in_rate = burst_cycles / burst_bytes            # cycles per input byte
+
+    # Stage start offsets: each stage waits for the first data it needs
+    reorder_cycles = burst if reorder else 0.0
+    start_in = np.zeros_like(in_rate)
+    start_stage = np.asarray(rdlat, np.float64) + reorder_cycles + K * K * in_rate
+    rows_ready = (K - 1) * W * np.maximum(in_rate, K / word_bytes)
+    start_mac = start_stage + rows_ready + CTRL_STALL
+    start_out = start_mac + depth + MAC_CTRL_STALL + COLLECT_BYTES + OUT_STAGE
+
+    starts = (start_in, start_stage, start_mac, start_out)
+    stacked = np.stack(np.broadcast_arrays(*[busy[b] for b in BOUNDS]))
+    finish = np.stack(np.broadcast_arrays(*[s + busy[b] for s, b in zip(starts, BOUNDS)]))
+    cycles = finish.max(axis=0)
+
+    frame_ns = cycles * clock_ns
+    return {
+        **busy,
+        "latency": np.broadcast_to(start_out + burst_cycles, cycles.shape),
+        "mac_start": np.broadcast_to(start_mac, cycles.shape),
+        "cycles": cycles,
+        "frame_us": frame_ns / 1e3,
+        "fps": 1e9 / frame_ns,
+        "bound": np.asarray(BOUNDS)[stacked.argmax(axis=0)],
+        "util_mac": busy["mac"] / cycles,
+    }
+
+# ----------------------------
+# Sweep
+# ----------------------------
+
+def parse_values(s: str, cast=int) -> List:
+    """'1,2,4' or 'lo:hi[:step]' (hi exclusive) or a mix: '2,4,8:17:4'."""
+    out = []
+    for part in str(s).split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if ":" in part:
+            bits = [cast(x) for x in part.split(":")]
+            out.extend(np.arange(*bits).tolist())
+        else:
+            out.append(cast(part))
+    if not out:
+        raise argparse.ArgumentTypeError(f"empty value list '{s}'")
+    return out
+
+def parse_dims_list(s: str) -> List[Tuple[int, int]]:
+    dims = []
+    for part in s.split(","):
+        m = re.fullmatch(r"\s*(\d+)[xX](\d+)\s*", part)
+        if not m:
+            raise argparse.ArgumentTypeError(f"bad dims '{part}', use WxH")
+        dims.append((int(m.group(1)), int(m.group(2))))
+    return dims
+
+def sweep(grid: Dict[str, List], periods: Dict[int, float], clock_ns=None,
+          dram_gbs=None, reorder=True) -> Dict[str, np.ndarray]:
+    """Cross product of the grid (dims, depth, sram_bits, dq_bits, burst, dram_gap, rdlat)."""
+    dims = np.asarray(grid["dims"], np.float64)
+    axes = [np.arange(len(dims))] + [np.asarray(grid[k]) for k in
+            ("depth", "sram_bits", "dq_bits", "burst", "dram_gap", "rdlat")]
+    mesh = [m.ravel() for m in np.meshgrid(*axes, indexing="ij")]
+    di, depth, sram_bits, dq_bits, burst, gap, rdlat = mesh
+    W, H = dims[di, 0], dims[di, 1]
+    clk = np.full(depth.shape, clock_ns, np.float64) if clock_ns else clock_for_depth(depth, periods)
+    res = model(H, W, depth, sram_bits, dq_bits, burst, gap, rdlat, clk,
+                dram_gbs=dram_gbs, reorder=reorder)
+    res.update(W=W.astype(np.int64), H=H.astype(np.int64), depth=depth, sram_bits=sram_bits,
+               dq_bits=dq_bits, burst=burst, dram_gap=gap, rdlat=rdlat, clock_ns=clk)
+    return res
+
+# ----------------------------
+# Output
+# ----------------------------
+
+COLUMNS = ["W", "H", "depth", "sram_bits", "dq_bits", "burst", "dram_gap", "rdlat", "clock_ns",
+           "cycles", "latency", "frame_us", "fps", "bound", "util_mac"]
+
+def fmt(v) -> str:
+    if isinstance(v, (float, np.floating)):
+        return f"{v:.4g}" if not float(v).is_integer() else str(int(v))
+    return str(v)
+
+def print_table(res: Dict[str, np.ndarray], order: np.ndarray):
+    rows = [[fmt(res[c][i]) for c in COLUMNS] for i in order]
+    widths = [max(len(c), *(len(r[j]) for r in rows)) for j, c in enumerate(COLUMNS)]
+    print("  ".join(c.rjust(w) for c, w in zip(COLUMNS, widths)))
+    for r in rows:
+        print("  ".join(v.rjust(w) for v, w in zip(r, widths)))
+
+def write_csv(path: str, res: Dict[str, np.ndarray]):
+    cols = [np.asarray(res[c]).astype(str) for c in COLUMNS]
+    with open(path, "w") as f:
+        f.write(",".join(COLUMNS) + "\n")
+        f.write("\n".join(",".join(row) for row in zip(*cols)))
+        f.write("\n")
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Analytic throughput/latency model of the conv DUT.")
+    ap.add_argument("--dims", type=parse_dims_list, default=[(1024, 1024)],
+                    help="image WxH list (default 1024x1024)")
+    ap.add_argument("--depth", type=parse_values, default=[0, 2, 4], help="MAC pipeline depths (default 0,2,4)")
+    ap.add_argument("--sram-bits", type=parse_values, default=[32], help="SRAM word width in bits (default 32)")
+    ap.add_argument("--dq-bits", type=parse_values, default=[8], help="DRAM DQ width in bits (default 8)")
+    ap.add_argument("--burst", type=parse_values, default=[8], help="DRAM burst length in beats (default 8)")
+    ap.add_argument("--dram-gap", type=parse_values, default=[0], help="idle cycles between bursts (default 0)")
+    ap.add_argument("--rdlat", type=parse_values, default=[5], help="DRAM read latency in cycles (default 5)")
+    ap.add_argument("--dram-gbs", type=float, default=None, help="cap each DRAM port at this many GB/s")
+    ap.add_argument("--clock-ns", type=float, default=None, help="override clock period for every depth")
+    ap.add_argument("--reports", default=DEFAULT_REPORT_DIR, help="Timing_Reports directory")
+    ap.add_argument("--no-reorder", action="store_true",
+                    help="model reading from the latest address (no MSB-first flip buffer)")
+    ap.add_argument("--top", type=int, default=20, help="print the N configs with the highest frames/s")
+    ap.add_argument("--csv", default=None, help="write every evaluated config to this CSV")
+    args = ap.parse_args()
+
+    periods = load_clock_periods(args.reports)
+    grid = {"dims": args.dims, "depth": args.depth, "sram_bits": args.sram_bits, "dq_bits": args.dq_bits,
+            "burst": args.burst, "dram_gap": args.dram_gap, "rdlat": args.rdlat}
+
+    t0 = time.perf_counter()
+    res = sweep(grid, periods, clock_ns=args.clock_ns, dram_gbs=args.dram_gbs, reorder=not args.no_reorder)
+    dt = time.perf_counter() - t0
+    n = res["cycles"].size
+
+    print("clock periods (ns): " + ", ".join(f"{d}-stage {p:.4g}" for d, p in sorted(periods.items())))
+    print(f"evaluated {n} configs in {dt * 1e3:.1f} ms")
+    order = np.argsort(-res["fps"], kind="stable")[:max(0, args.top)]
+    if len(order):
+        print_table(res, order)
+    bounds, counts = np.unique(res["bound"], return_counts=True)
+    print("limiting bound: " + ", ".join(f"{b} {c}" for b, c in zip(bounds, counts)))
+    if args.csv:
+        write_csv(args.csv, res)
+        print(f"Wrote {args.csv}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+svmb.py — Convert DRAM images between @ADDR HEX text (.dat) and the SVMB
+binary format (.bin), both ways, losslessly.
+
+SVMB is the hexdump's words as raw little-endian memory behind a 32-byte
+header (version, segment table of base address + length, and the text
+layout the file came from); see conv.py, "SVMB binary DRAM images". A
+1024x1024 frame is 1 MB instead of 3.6 MB of text, conv.py memory-maps it
+instead of parsing, and tb.sv reads it with $fread (+stim=bin).
+
+img2svmem.py and conv.py write SVMB directly when an output path ends in
+.bin, and read it wherever they read a .dat.
+
+pack/unpack keep every word and address; only '//' comments are dropped.
+A file whose records all use one of the two layouts (img2svmem.py inputs or
+conv.py goldens) unpacks to byte-identical text.
+
+Examples
+  # Every stimulus and golden next to its text version
+  python3 svmb.py pack ../inputs/*.dat ../outputs/*.dat
+
+  # Back to text
+  python3 svmb.py unpack ../inputs/input0.bin -o /tmp/input0.dat
+
+  # Header and segments
+  python3 svmb.py info ../inputs/input0.bin
+"""
+
+import os, sys, time, argparse
+
+import conv
+
+# ----------------------------
+# Commands
+# ----------------------------
+
+def out_path(src: str, out: str, ext: str, many: bool) -> str:
+    if out and not many:
+        return out
+    root = os.path.splitext(src)[0]
+    return os.path.join(out, os.path.basename(root) + ext) if out else root + ext
+
+def cmd_convert(args, ext: str, fn):
+    many = len(args.files) > 1
+    if args.out and many and not os.path.isdir(args.out):
+        sys.exit("error: -o must be a directory with several inputs")
+    for src in args.files:
+        dst = out_path(src, args.out, ext, many)
+        t0 = time.perf_counter()
+        fn(src, dst)
+        dt = time.perf_counter() - t0
+        a, b = os.path.getsize(src), os.path.getsize(dst)
+        print(f"[OK] {src} -> {dst}  {a / 2**20:.2f} -> {b / 2**20:.2f} MiB ({a / max(b, 1):.2f}x, {dt * 1e3:.0f} ms)")
+
+def cmd_info(args):
+    for path in args.files:
+        style, segs = conv.read_svmb_header(path)
+        total = sum(n for _, n, _ in segs)
+        print(f"{path}: SVMB v{conv.SVMB_VERSION}, {len(segs)} segment(s), {total} bytes, "
+              f"text style {style} ({conv.SVMB_STYLES[style]['prefix'].strip()}%0{conv.SVMB_STYLES[style]['addr_digits']}x)")
+        for b, n, off in segs[:args.max_segments]:
+            print(f"  0x{b:08x} .. 0x{b + n:08x}  {n:10d} bytes  (file offset 0x{off:x})")
+        if len(segs) > args.max_segments:
+            print(f"  ... {len(segs) - args.max_segments} more")
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Convert DRAM images between hexdump text and SVMB binary.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name, help_ in (("pack", "hexdump .dat -> SVMB .bin"), ("unpack", "SVMB .bin -> hexdump .dat")):
+        p = sub.add_parser(name, help=help_)
+        p.add_argument("files", nargs="+", help="input files")
+        p.add_argument("-o", "--out", default=None,
+                       help="output file (one input) or directory (default: next to each input)")
+    p = sub.add_parser("info", help="print the header and segment table")
+    p.add_argument("files", nargs="+", help="SVMB files")
+    p.add_argument("--max-segments", type=int, default=16, help="segments to list per file (default 16)")
+    args = ap.parse_args()
+
+    if args.cmd == "pack":
+        cmd_convert(args, ".bin", conv.hexdump_to_svmb)
+    elif args.cmd == "unpack":
+        cmd_convert(args, ".dat", conv.svmb_to_hexdump)
+    else:
+        cmd_info(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+synth_db.py — Parse Design Compiler timing/cell reports into a SQLite table and
+regenerate the README perf-per-area comparison from it.
+
+Reports are paired by file name: <dir>/Timing_Reports/<name>.rpt with
+<dir>/Cell_Reports/<name>.rpt (e.g. dut_2stage). The pipeline depth is taken
+from a '<N>stage' suffix in the name. Ingest is incremental: a pair is only
+re-parsed when either file's size or mtime changed, so it is cheap to run
+after every synthesis.
+
+Tables (see SCHEMA):
+  runs      one row per config: clock period, slack, area split, endpoints
+  points    critical path points: pin, cell type, incr, path, edge
+  cells     per-reference cell count and area (seq = noncombinational)
+
+Performance/Area follows the README: MHz / area(µm²) * 1000, with the
+zero-slack period (clock edge - slack) rounded to 0.01 ns.
+
+Examples
+  # Ingest ../../../Results and print the table
+  python3 synth_db.py ingest
+  python3 synth_db.py table
+
+  # A new run that landed somewhere else
+  python3 synth_db.py ingest --timing run7/reports/timing_max_slow.rpt \
+      --cell run7/reports/cell.rpt --name dut_3stage
+
+  # Critical path of one config, or any SQL
+  python3 synth_db.py path dut_2stage
+  python3 synth_db.py query "SELECT config, seq_area, comb_area FROM runs ORDER BY seq_area"
+"""
+
+import os, re, sys, sqlite3, argparse
+from typing import Dict, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.normpath(os.path.join(SCRIPT_DIR, "..", "..", "..", "Results"))
+DEFAULT_DB = os.path.join(DEFAULT_RESULTS, "synth.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    config       TEXT PRIMARY KEY,
+    depth        INTEGER,
+    timing_path  TEXT, timing_size INTEGER, timing_mtime_ns INTEGER,
+    cell_path    TEXT, cell_size INTEGER, cell_mtime_ns INTEGER,
+    design       TEXT,
+    library      TEXT,
+    startpoint   TEXT,
+    endpoint     TEXT,
+    path_group   TEXT,
+    clock_edge   REAL,
+    uncertainty  REAL,
+    setup        REAL,
+    arrival      REAL,
+    required     REAL,
+    slack        REAL,
+    period_ns    REAL,
+    n_cells      INTEGER,
+    n_seq        INTEGER,
+    total_area   REAL,
+    seq_area     REAL,
+    comb_area    REAL
+);
+CREATE TABLE IF NOT EXISTS points (
+    config   TEXT,
+    idx      INTEGER,
+    point    TEXT,
+    cell     TEXT,
+    incr     REAL,
+    path     REAL,
+    edge     TEXT,
+    PRIMARY KEY (config, idx)
+);
+CREATE TABLE IF NOT EXISTS cells (
+    config     TEXT,
+    reference  TEXT,
+    count      INTEGER,
+    area       REAL,
+    seq        INTEGER,
+    PRIMARY KEY (config, reference)
+);
+"""
+
+# ----------------------------
+# Timing report
+# ----------------------------
+
+_NUM = r"-?\d+(?:\.\d+)?"
+# "<point>   <incr> [annotation]   <path> [r|f]"; point may be empty (wrapped line)
+_POINT_RE = re.compile(rf"^\s*(.*?)\s*({_NUM})\s*[#*&H]?\s+({_NUM})(?:\s+([rf]))?\s*$")
+_PIN_CELL_RE = re.compile(r"^(.*?) \((\S+)\)$")
+_SCALAR_RE = re.compile(rf"^\s*(data arrival time|data required time|slack \(\w+[^)]*\))\s+({_NUM})\s*$")
+
+def _header(text: str, key: str) -> Optional[str]:
+    m = re.search(rf"^\s*{re.escape(key)}:?\s*(.+?)\s*$", text, re.M)
+    return m.group(1) if m else None
+
+def parse_timing_report(path: str) -> Dict:
+    """First (worst) path of a report_timing -path full file."""
+    with open(path, "r") as f:
+        text = f.read()
+    info = {
+        "design": _header(text, "Design"),
+        "library": (re.search(r"Library:\s*(\S+)", text) or [None, None])[1],
+        "startpoint": _header(text, "Startpoint"),
+        "endpoint": _header(text, "Endpoint"),
+        "path_group": _header(text, "Path Group"),
+        "clock_edge": None, "uncertainty": 0.0, "setup": 0.0,
+        "arrival": None, "required": None, "slack": None,
+    }
+    lines = text.splitlines()
+    try:
+        start = next(i for i, l in enumerate(lines) if l.strip().startswith("Point") and "Incr" in l) + 2
+    except StopIteration:
+        raise ValueError(f"{path}: no 'Point Incr Path' table")
+
+    points: List[Tuple] = []
+    pending = ""
+    launch = True                       # before 'data arrival time'
+    for line in lines[start:]:
+        s = _SCALAR_RE.match(line)
+        if s:
+            key, val = s.group(1), float(s.group(2))
+            if key == "data arrival time" and info["arrival"] is None:
+                info["arrival"] = val
+                launch = False
+            elif key == "data required time":
+                info["required"] = val
+            elif key.startswith("slack"):
+                info["slack"] = val
+                break
+            continue
+        m = _POINT_RE.match(line)
+        if not m:
+            if line.strip() and not line.strip().startswith("-"):
+                pending = line.strip()
+            continue
+        name = m.group(1) or pending
+        pending = ""
+        incr, total = float(m.group(2)), float(m.group(3))
+        if name.startswith("clock ") and "edge" in name:
+            if not launch:
+                info["clock_edge"] = incr
+            continue
+        if name == "clock uncertainty":
+            info["uncertainty"] = incr
+        elif name == "library setup time":
+            info["setup"] = incr
+        if launch and not name.startswith("clock "):
+            pc = _PIN_CELL_RE.match(name)
+            pin, cell = (pc.group(1), pc.group(2)) if pc else (name, None)
+            points.append((pin, cell, incr, total, m.group(4)))
+
+    if info["slack"] is None or info["clock_edge"] is None:
+        raise ValueError(f"{path}: no clock edge / slack found")
+    info["period_ns"] = info["clock_edge"] - info["slack"]
+    info["points"] = points
+    return info
+
+# ----------------------------
+# Cell report
+# ----------------------------
+
+# name on its own line or followed by reference/library; area + attributes last
+_CELL_RE = re.compile(rf"^(\S+)\s+(\S+)\s+(\S+)\s+({_NUM})[ \t]*([a-z, ]*?)[ \t]*$", re.M)
+_TOTAL_RE = re.compile(rf"^Total\s+(\d+)\s+cells\s+({_NUM})", re.M)
+
+def parse_cell_report(path: str) -> Dict:
+    """report_cell: total/sequential/combinational area and per-reference counts."""
+    with open(path, "r") as f:
+        text = f.read()
+    body_start = text.find("\n---")
+    if body_start < 0:
+        raise ValueError(f"{path}: no cell table")
+    body = text[text.index("\n", body_start + 1) + 1:]
+    total = _TOTAL_RE.search(body)
+    if total:
+        body = body[:total.start()]
+
+    refs: Dict[str, List] = {}
+    n = n_seq = 0
+    seq_area = comb_area = 0.0
+    for m in _CELL_RE.finditer(body):
+        ref, area, attrs = m.group(2), float(m.group(4)), m.group(5)
+        if "h" in attrs:                # hierarchical: area already in its leaves
+            continue
+        seq = "n" in attrs
+        r = refs.setdefault(ref, [0, 0.0, seq])
+        r[0] += 1
+        r[1] += area
+        n += 1
+        if seq:
+            n_seq += 1
+            seq_area += area
+        else:
+            comb_area += area
+
+    total_area = float(total.group(2)) if total else seq_area + comb_area
+    return {
+        "n_cells": int(total.group(1)) if total else n,
+        "n_seq": n_seq,
+        "total_area": total_area,
+        "seq_area": round(seq_area, 4),
+        "comb_area": round(comb_area, 4),
+        "refs": refs,
+    }
+
+# ----------------------------
+# Database
+# ----------------------------
+
+def open_db(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+def _stat(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def config_depth(name: str) -> Optional[int]:
+    m = re.search(r"(\d+)stage", name)
+    return int(m.group(1)) if m else None
+
+def ingest_pair(db: sqlite3.Connection, name: str, timing_path: str, cell_path: str,
+                force: bool = False) -> bool:
+    """Parse one timing/cell pair into the db; returns False if it was up to date."""
+    ts, tm = _stat(timing_path)
+    cs, cm = _stat(cell_path)
+    row = db.execute("SELECT timing_path, timing_size, timing_mtime_ns, cell_path, cell_size, cell_mtime_ns "
+                     "FROM runs WHERE config=?", (name,)).fetchone()
+    if not force and row == (timing_path, ts, tm, cell_path, cs, cm):
+        return False
+
+    t = parse_timing_report(timing_path)
+    c = parse_cell_report(cell_path)
+    with db:
+        db.execute("DELETE FROM points WHERE config=?", (name,))
+        db.execute("DELETE FROM cells WHERE config=?", (name,))
+        db.execute("INSERT OR REPLACE INTO runs VALUES "
+                   "(?,?, ?,?,?, ?,?,?, ?,?,?,?,?, ?,?,?,?,?,?,?, ?,?,?,?,?)",
+                   (name, config_depth(name), timing_path, ts, tm, cell_path, cs, cm,
+                    t["design"], t["library"], t["startpoint"], t["endpoint"], t["path_group"],
+                    t["clock_edge"], t["uncertainty"], t["setup"], t["arrival"], t["required"],
+                    t["slack"], t["period_ns"],
+                    c["n_cells"], c["n_seq"], c["total_area"], c["seq_area"], c["comb_area"]))
+        db.executemany("INSERT INTO points VALUES (?,?,?,?,?,?,?)",
+                       [(name, i) + p for i, p in enumerate(t["points"])])
+        db.executemany("INSERT INTO cells VALUES (?,?,?,?,?)",
+                       [(name, ref, v[0], v[1], int(v[2])) for ref, v in c["refs"].items()])
+    return True
+
+def discover_pairs(results_dir: str) -> List[Tuple[str, str, str]]:
+    tdir = os.path.join(results_dir, "Timing_Reports")
+    cdir = os.path.join(results_dir, "Cell_Reports")
+    pairs = []
+    if os.path.isdir(tdir):
+        for fn in sorted(os.listdir(tdir)):
+            if fn.endswith(".rpt") and os.path.isfile(os.path.join(cdir, fn)):
+                pairs.append((fn[:-4], os.path.join(tdir, fn), os.path.join(cdir, fn)))
+    return pairs
+
+# ----------------------------
+# Perf/Area table
+# ----------------------------
+
+def perf_area_rows(db: sqlite3.Connection) -> List[Dict]:
+    rows = []
+    prev = None
+    for config, depth, area, period in db.execute(
+            "SELECT config, depth, total_area, period_ns FROM runs "
+            "ORDER BY depth IS NULL, depth, config"):
+        period = round(period, 2)
+        mhz = 1000.0 / period
+        ppa = mhz / area * 1000.0
+        delta = None if prev is None else (ppa / prev - 1.0) * 100.0
+        rows.append({"config": config, "depth": depth, "area": area, "period": period,
+                     "mhz": mhz, "ppa": ppa, "delta": delta})
+        prev = ppa
+    return rows
+
+def format_markdown_table(rows: List[Dict]) -> str:
+    out = ["| Configuration | Pipeline Stages | Area (µm²) | Clock Period (ns) | Frequency (MHz) "
+           "| Performance / Area | Δ Perf/Area vs Previous |",
+           "|---------------|------------------|------------|-------------------|------------------"
+           "|--------------------|--------------------------|"]
+    for r in rows:
+        delta = "—" if r["delta"] is None else f"{r['delta']:+.1f}%".replace("-", "−")
+        depth = "—" if r["depth"] is None else str(r["depth"])
+        out.append(f"| {r['config']:<13} | {depth:<16} | {r['area']:<10,.2f} | {r['period']:<17.2f} "
+                   f"| {r['mhz']:<16.1f} | {r['ppa']:<18.2f} | {delta:<24} |")
+    return "\n".join(out)
+
+# ----------------------------
+# CLI
+# ----------------------------
+
+def cmd_ingest(db, args):
+    pairs = discover_pairs(args.results) if not args.timing else []
+    if args.timing or args.cell:
+        if not (args.timing and args.cell):
+            sys.exit("ERROR: --timing and --cell go together")
+        name = args.name or os.path.splitext(os.path.basename(args.timing))[0]
+        pairs = [(name, args.timing, args.cell)]
+    if not pairs:
+        sys.exit(f"ERROR: no report pairs found under {args.results}")
+    for name, tp, cp in pairs:
+        changed = ingest_pair(db, name, os.path.abspath(tp), os.path.abspath(cp), force=args.force)
+        print(f"[{'ingested' if changed else 'up to date'}] {name}")
+
+def cmd_table(db, args):
+    rows = perf_area_rows(db)
+    if not rows:
+        sys.exit("ERROR: database is empty, run 'ingest' first")
+    print(format_markdown_table(rows))
+
+def cmd_path(db, args):
+    run = db.execute("SELECT startpoint, endpoint, arrival, required, slack, period_ns "
+                     "FROM runs WHERE config=?", (args.config,)).fetchone()
+    if run is None:
+        sys.exit(f"ERROR: unknown config '{args.config}'")
+    print(f"{args.config}: {run[0]} -> {run[1]}")
+    print(f"  arrival {run[2]:.4f}  required {run[3]:.4f}  slack {run[4]:+.4f}  period {run[5]:.4f} ns")
+    for point, cell, incr, path, edge in db.execute(
+            "SELECT point, cell, incr, path, edge FROM points WHERE config=? ORDER BY idx", (args.config,)):
+        print(f"  {point:<60} {cell or '':<10} {incr:8.4f} {path:8.4f} {edge or ''}")
+
+def cmd_query(db, args):
+    cur = db.execute(args.sql)
+    if cur.description:
+        print("\t".join(d[0] for d in cur.description))
+        for row in cur:
+            print("\t".join("" if v is None else str(v) for v in row))
+
+def main():
+    ap = argparse.ArgumentParser(description="Synopsys report database and perf/area table.")
+    ap.add_argument("--db", default=DEFAULT_DB, help="SQLite database (default Results/synth.db)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("ingest", help="parse reports into the database")
+    p.add_argument("--results", default=DEFAULT_RESULTS, help="dir with Timing_Reports/ and Cell_Reports/")
+    p.add_argument("--timing", default=None, help="single timing report (with --cell)")
+    p.add_argument("--cell", default=None, help="single cell report (with --timing)")
+    p.add_argument("--name", default=None, help="config name for --timing/--cell (default: file stem)")
+    p.add_argument("--force", action="store_true", help="re-parse even if unchanged")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("table", help="print the perf/area comparison as a markdown table")
+    p.set_defaults(func=cmd_table)
+
+    p = sub.add_parser("path", help="print a config's critical path")
+    p.add_argument("config")
+    p.set_defaults(func=cmd_path)
+
+    p = sub.add_parser("query", help="run an SQL query against the database")
+    p.add_argument("sql")
+    p.set_defaults(func=cmd_query)
+
+    args = ap.parse_args()
+    db = open_db(args.db)
+    try:
+        args.func(db, args)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,7 @@ module tb;
   string log_file;
   string class_type = "ECE546";
   int debug_run = 0;
+  string stim = "dat";          // +stim=bin: read SVMB .bin images (scripts/svmb.py) with $fread
 
   //--------------------------------------------------------------------------
   // Runtime-config knobs (read from +plusargs)
@@ -170,6 +171,40 @@ module tb;
     .write_enable         (write_enable         ) 
   );
 
+  //--------------------------------------------------------------------------
+  // SVMB binary DRAM image (scripts/conv.py, "SVMB binary DRAM images"):
+  //   32-byte little-endian header, (base, length) per segment, then raw
+  //   little-endian bytes. Word k of a segment lands at index base + 8*k,
+  //   the same index $readmemh gives the matching @ADDR line.
+  //--------------------------------------------------------------------------
+  task automatic load_svmb(input string path, ref logic [MEM_WORD_WIDTH-1:0] m [longint]);
+    int fd, r;
+    logic [255:0] hdr;
+    logic [127:0] seg;
+    logic [63:0]  w;
+    longint unsigned base[$], len[$];
+    fd = $fopen(path, "rb");
+    if (fd == 0) $fatal(1, "Error: cannot open %s", path);
+    r = $fread(hdr, fd);
+    hdr = {<<8{hdr}};                                   // file byte order -> LE fields
+    if (r != 32 || {<<8{hdr[31:0]}} != "SVMB" || hdr[47:32] != 1)
+      $fatal(1, "Error: %s is not an SVMB v1 image", path);
+    r = $fseek(fd, hdr[63:48], 0);
+    for (int i = 0; i < hdr[95:64]; i++) begin
+      r = $fread(seg, fd);
+      seg = {<<8{seg}};
+      base.push_back(seg[63:0]);
+      len.push_back(seg[127:64]);
+    end
+    m.delete();
+    foreach (base[s])
+      for (longint unsigned k = 0; k < len[s] / 8; k++) begin
+        r = $fread(w, fd);
+        m[base[s] + 8 * k] = {<<8{w}};                  // LE bytes -> word as printed by $readmemh
+      end
+    $fclose(fd);
+  endtask
+
   function automatic bit compare_mem();
     if(tb.mem_block[DRAM1].mem_inst.mem.size() != ref_mem.size()) return 0;
     foreach (ref_mem[k]) begin
@@ -189,25 +224,37 @@ module tb;
     $fdisplay(file_handle, "INFO[TB]: ######## CLASS: %0s ########",class_type);
     tb.mem_block[DRAM1].mem_inst.mem.delete();
     tb.mem_block[DRAM0].mem_inst.mem.delete();
-    if(class_type == "ECE564")
-      if(debug_run == 0)
-        $readmemh($sformatf("%s/output%0d.564.dat",output_dir,testNum),ref_mem);
+    if(stim == "bin") begin
+      logic [MEM_WORD_WIDTH-1:0] stim_mem [longint];
+      string cls = (class_type == "ECE564") ? "564" : (class_type == "ECE464") ? "464" : "";
+      string name = (debug_run == 0) ? "output" : "debug";
+      if(cls == "")
+        $fatal(1,"Error: Must be -DCLASS=ECE[564,464]");
+      load_svmb($sformatf("%s/%s%0d.%s.bin",output_dir,name,testNum,cls), ref_mem);
+      load_svmb($sformatf("%s/%s%0d.bin",input_dir,(debug_run == 0) ? "input" : "debug",testNum), stim_mem);
+      foreach (stim_mem[k])
+        tb.mem_block[DRAM0].mem_inst.mem[k] = stim_mem[k];
+    end else begin
+      if(class_type == "ECE564")
+        if(debug_run == 0)
+          $readmemh($sformatf("%s/output%0d.564.dat",output_dir,testNum),ref_mem);
+        else
+          $readmemh($sformatf("%s/debug%0d.564.dat",output_dir,testNum),ref_mem);
+      else if(class_type == "ECE464")
+        if(debug_run == 0) begin
+          $readmemh($sformatf("%s/output%0d.464.dat",output_dir,testNum),ref_mem);
+        end else begin
+          $readmemh($sformatf("%s/debug%0d.464.dat",output_dir,testNum),ref_mem);
+          $display("INFO[TB]: Reading ref memory file: %s",$sformatf("%s/debug%0d.464.dat",output_dir,testNum));
+        end
       else
-        $readmemh($sformatf("%s/debug%0d.564.dat",output_dir,testNum),ref_mem);
-    else if(class_type == "ECE464")
-      if(debug_run == 0) begin
-        $readmemh($sformatf("%s/output%0d.464.dat",output_dir,testNum),ref_mem);
-      end else begin
-        $readmemh($sformatf("%s/debug%0d.464.dat",output_dir,testNum),ref_mem);
-        $display("INFO[TB]: Reading ref memory file: %s",$sformatf("%s/debug%0d.464.dat",output_dir,testNum));
-      end
-    else
-      $fatal(1,"Error: Must be -DCLASS=ECE[564,464]");
+        $fatal(1,"Error: Must be -DCLASS=ECE[564,464]");
 
-    if(debug_run == 0)
-      tb.mem_block[DRAM0].mem_inst.loadMem($sformatf("%s/input%0d.dat",input_dir,testNum));
-    else
-      tb.mem_block[DRAM0].mem_inst.loadMem($sformatf("%s/debug%0d.dat",input_dir,testNum));
+      if(debug_run == 0)
+        tb.mem_block[DRAM0].mem_inst.loadMem($sformatf("%s/input%0d.dat",input_dir,testNum));
+      else
+        tb.mem_block[DRAM0].mem_inst.loadMem($sformatf("%s/debug%0d.dat",input_dir,testNum));
+    end
 
 
     ->ev_start_test;
@@ -280,6 +327,7 @@ module tb;
     if($value$plusargs("class=%s",class_type));
     if($value$plusargs("debug_run=%d",debug_run));
     if($value$plusargs("sim_output_dir=%s",sim_dir));
+    if($value$plusargs("stim=%s",stim));
 
     startTime=$time;
 